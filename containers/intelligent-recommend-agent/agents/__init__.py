@@ -1,18 +1,15 @@
-from .base import agent_manager
-from .chatbot import ChatbotAgent
-from .planning import PlanningAgent
-from .travel import TravelAgent
-from .travel_itinerary_suggestion import TravelItinerarySuggestionAgent
-from .travel_profile import TravelProfileAgent
-from .travel_recommend import TravelRecommendAgent
-from .travel_summary import TravelSummaryAgent
-from .triage import TriageAgent
-from .weather import WeatherAgent
-from .web_search import WebSearchAgent
+from .base import agent_manager, prompt_registry
+from common import console
 
 
 __all__ = [agent_manager]
 
 
 async def load_agents() -> None:
-    await TravelProfileAgent.load_agent()
\ No newline at end of file
+    # agent module 은 처음 사용할 때 agent_manager 가 import 하므로 여기서는 prompt 만 미리 컴파일한다.
+    prompt_registry.load()
+    report = agent_manager.get_startup_report()
+    console.log(
+        f"🚀 Agent registry ready in {report['since_registry_ms']:.0f}ms "
+        f"({report['loaded_agents']}/{report['registered_agents']} agents loaded)"
+    )
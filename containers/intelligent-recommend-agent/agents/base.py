@@ -1,29 +1,100 @@
 import abc
+import asyncio
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+import importlib
 import json
-from typing import Any
+from pathlib import Path
+import time
+from typing import Any, AsyncIterator, Callable, Collection, Iterator, Optional
 from uuid import uuid4
 
-from langchain_core.chat_history import InMemoryChatMessageHistory
+import httpx
+from jinja2 import Template
+from jinja2.sandbox import SandboxedEnvironment
+from pydantic import BaseModel, PrivateAttr
+
+from langchain_core.caches import BaseCache
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.history import RunnableWithMessageHistory
+from langchain_core.tools import BaseTool
 from langchain_openai import AzureChatOpenAI
 from langchain.agents import create_openai_tools_agent, AgentExecutor
 from langchain.callbacks.base import BaseCallbackHandler
-from langchain.schema import AIMessage, AgentFinish
+from langchain.schema import AIMessage, AgentAction, AgentFinish
+from langchain_core.agents import AgentStep
+from langgraph.config import get_stream_writer
 from rich.panel import Panel
 from rich.syntax import Syntax
 
 from agents.schema import AgentGraphStateBase, AgentProfile
+from capabilities.cache import get_response_cache
+from capabilities.history import create_history_store
+from capabilities.ratelimit import RateLimitedTransport
+from capabilities.replay import ReplayChatModel, ReplayRecorder, get_replay_store
+from capabilities.routing import HedgedAzureChatOpenAI, complexity_router, get_tool_selector
 from common import console, settings
 
 
 class AgentManager:
+    """Registry of agents by name whose modules are imported only when an agent is first used."""
+
+    # agent 이름 → "module:ClassName". graphrag, pandas, SQL toolkit 등 무거운 의존성은 해당 module 을 처음 쓸 때 로드된다.
+    registry: dict[str, str] = {
+        "ChatbotAgent": "agents.chatbot:ChatbotAgent",
+        "PlanningAgent": "agents.planning:PlanningAgent",
+        "TravelAgent": "agents.travel:TravelAgent",
+        "TravelItinerarySuggestionAgent": "agents.travel_itinerary_suggestion:TravelItinerarySuggestionAgent",
+        "TravelPrefetchAgent": "agents.travel_prefetch:TravelPrefetchAgent",
+        "TravelProfileAgent": "agents.travel_profile:TravelProfileAgent",
+        "TravelRecommendAgent": "agents.travel_recommend:TravelRecommendAgent",
+        "TravelSummaryAgent": "agents.travel_summary:TravelSummaryAgent",
+        "TriageAgent": "agents.triage:TriageAgent",
+        "WeatherAgent": "agents.weather:WeatherAgent",
+        "WebSearchAgent": "agents.web_search:WebSearchAgent",
+    }
+
     def __init__(self):
-        self.all_agents: list = []
+        self.created_at = time.perf_counter()
+        self.loaded: dict[str, type] = {}
+        self.import_seconds: dict[str, float] = {}
+
+    def register(self, agent_class: type) -> None:
+        self.loaded[agent_class.profile.name] = agent_class
+
+    def get_agent_class(self, name: str) -> type:
+        if name not in self.loaded:
+            module_name, class_name = self.registry[name].split(":")
+            start_time = time.perf_counter()
+            getattr(importlib.import_module(module_name), class_name)
+            self.import_seconds[name] = time.perf_counter() - start_time
+        return self.loaded[name]
+
+    @property
+    def all_agents(self) -> list:
+        return [self.get_agent_class(name) for name in self.registry]
 
     def get_agent(self, index: int) -> Any:
         return self.all_agents[index]
 
+    def get_startup_report(self) -> dict[str, Any]:
+        # import_ms 는 registry 를 통해 처음 import 할 때 걸린 시간이며, 이미 다른 module 이 끌어온 의존성은 포함되지 않는다.
+        report: dict[str, Any] = {
+            "registered_agents": len(self.registry),
+            "loaded_agents": len(self.loaded),
+            "since_registry_ms": (time.perf_counter() - self.created_at) * 1000,
+        }
+        for name in self.registry:
+            if name in self.import_seconds:
+                report[f"import_ms[{name}]"] = self.import_seconds[name] * 1000
+            elif name in self.loaded:
+                report[f"import_ms[{name}]"] = "(imported directly)"
+        return report
+
 
 agent_manager = AgentManager()
 
@@ -53,11 +124,267 @@ class DebugCallbackHandler(BaseCallbackHandler):
         console.rule("[bold cyan]End LLM End[/bold cyan]\n")
 
 
+class PromptRegistry:
+    """Compiles every prompt template once and re-compiles it only when the file changes."""
+
+    def __init__(self, path: Path = Path(__file__).parent / "prompts") -> None:
+        self.path = path
+        self.environment = SandboxedEnvironment()
+        self.templates: dict[str, tuple[float, Template]] = {}
+        self.renders: int = 0
+        self.compiles: int = 0
+        self.reloads: int = 0
+        self.render_seconds: float = 0.0
+
+    def load(self) -> None:
+        for filepath in sorted(self.path.glob("*.jinja")):
+            self.get_template(filepath.name)
+
+    def get_template(self, filename: str) -> Template:
+        filepath = self.path / filename
+        mtime = filepath.stat().st_mtime
+        if cached := self.templates.get(filename):
+            if cached[0] == mtime:
+                return cached[1]
+            self.reloads += 1
+
+        template = self.environment.from_string(filepath.read_text(encoding="utf-8"))
+        self.templates[filename] = (mtime, template)
+        self.compiles += 1
+        return template
+
+    def get_version(self, filename: str) -> int:
+        # template 을 compile 하지 않고 파일이 바뀌었는지만 확인할 때 쓴다.
+        return (self.path / filename).stat().st_mtime_ns
+
+    def render(self, filename: str, **kwargs) -> str:
+        start_time = time.perf_counter()
+        prompt = self.get_template(filename).render(**kwargs)
+        self.render_seconds += time.perf_counter() - start_time
+        self.renders += 1
+        return prompt
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "templates": len(self.templates),
+            "renders": self.renders,
+            "compiles": self.compiles,
+            "reloads": self.reloads,
+            "avg_render_ms": self.render_seconds * 1000 / self.renders if self.renders else 0.0,
+        }
+
+
+prompt_registry = PromptRegistry()
+
+
+class ModelClientPool:
+    """Process-wide pool of AzureChatOpenAI clients sharing keep-alive HTTP connections.
+
+    Async calls go through the RateLimitedTransport, so every pooled model is subject to
+    the per-deployment RPM/TPM and concurrency limits.
+    """
+
+    def __init__(self) -> None:
+        self.models: dict[tuple, AzureChatOpenAI] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.http_requests: int = 0
+        self.http_connections: int = 0
+        self._http_client: httpx.Client | None = None
+        self._replay_recorder: ReplayRecorder | None = None
+        self._http_async_client: httpx.AsyncClient | None = None
+
+    def _get_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.AZURE_OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.AZURE_OPENAI_KEEPALIVE_EXPIRY,
+        )
+
+    def _on_request(self, request: httpx.Request) -> None:
+        self.http_requests += 1
+        request.extensions["trace"] = self._on_trace
+
+    async def _on_async_request(self, request: httpx.Request) -> None:
+        self.http_requests += 1
+        request.extensions["trace"] = self._on_async_trace
+
+    def _on_trace(self, event_name: str, info: dict) -> None:
+        # httpcore는 새 연결을 열 때만 connect_tcp 이벤트를 발생시킨다.
+        if event_name == "connection.connect_tcp.complete":
+            self.http_connections += 1
+
+    async def _on_async_trace(self, event_name: str, info: dict) -> None:
+        self._on_trace(event_name, info)
+
+    def get_replay_recorder(self) -> ReplayRecorder:
+        if self._replay_recorder is None:
+            self._replay_recorder = ReplayRecorder(get_replay_store())
+        return self._replay_recorder
+
+    def get_http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(
+                limits=self._get_limits(),
+                event_hooks={"request": [self._on_request]},
+            )
+        return self._http_client
+
+    def get_http_async_client(self) -> httpx.AsyncClient:
+        if self._http_async_client is None:
+            self._http_async_client = httpx.AsyncClient(
+                transport=RateLimitedTransport(httpx.AsyncHTTPTransport(limits=self._get_limits())),
+                event_hooks={"request": [self._on_async_request]},
+            )
+        return self._http_async_client
+
+    def get_model(
+        self,
+        deployment_name: str,
+        response_format: Any = None,
+        callbacks: list[BaseCallbackHandler] | None = None,
+        cache: BaseCache | None = None,
+        fallback_deployments: list[str] | None = None,
+        hedge: bool = False,
+    ) -> AzureChatOpenAI:
+        fallback_deployments = tuple(d for d in fallback_deployments or [] if d != deployment_name)
+        key = (
+            deployment_name,
+            response_format,
+            tuple(type(cb) for cb in callbacks or []),
+            cache,
+            fallback_deployments,
+            hedge,
+        )
+        if model := self.models.get(key):
+            self.hits += 1
+            return model
+
+        self.misses += 1
+        if settings.LLM_BACKEND == "replay":
+            # 오프라인 실행에서는 fallback/hedging 없이 기록된 응답만 돌려준다.
+            model = ReplayChatModel(
+                deployment_name=deployment_name,
+                response_format=response_format,
+                store=get_replay_store(),
+                latency_seconds=settings.LLM_REPLAY_LATENCY_SECONDS,
+                token_latency_seconds=settings.LLM_REPLAY_TOKEN_LATENCY_SECONDS,
+                callbacks=callbacks,
+                cache=cache,
+            )
+            self.models[key] = model
+            return model
+        if settings.LLM_BACKEND == "record":
+            callbacks = [*(callbacks or []), self.get_replay_recorder()]
+
+        kwargs = {
+            "azure_endpoint": settings.AZURE_OPENAI_ENDPOINT,
+            "openai_api_key": settings.AZURE_OPENAI_API_KEY,
+            "openai_api_version": settings.AZURE_OPENAI_API_VERSION,
+            "deployment_name": deployment_name,
+            "http_client": self.get_http_client(),
+            "http_async_client": self.get_http_async_client(),
+        }
+        if response_format:
+            kwargs["model_kwargs"] = {"response_format": response_format}
+        if callbacks:
+            kwargs["callbacks"] = callbacks
+        if cache:
+            kwargs["cache"] = cache
+
+        if fallback_deployments:
+            model = HedgedAzureChatOpenAI(
+                alternates=[self.get_model(d, response_format=response_format) for d in fallback_deployments],
+                hedge=hedge,
+                attempt_timeout=settings.AZURE_OPENAI_ATTEMPT_TIMEOUT_SECONDS,
+                **kwargs,
+            )
+        else:
+            model = AzureChatOpenAI(**kwargs)
+        self.models[key] = model
+        return model
+
+    def get_stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "pooled_models": len(self.models),
+            "pool_hits": self.hits,
+            "pool_misses": self.misses,
+            "pool_hit_rate": self.hits / lookups if lookups else 0.0,
+            "http_requests": self.http_requests,
+            "http_connections_opened": self.http_connections,
+            "http_connections_reused": max(self.http_requests - self.http_connections, 0),
+        }
+
+
+model_pool = ModelClientPool()
+
+
+class ToolCallStats:
+    """Per agent, how long the tool calls of each step took in total versus on the wall clock."""
+
+    def __init__(self) -> None:
+        self.agents: dict[str, dict[str, Any]] = {}
+
+    def record(self, agent_name: str, durations: list[float], wall_seconds: float) -> None:
+        stats = self.agents.setdefault(agent_name, {
+            "steps": 0, "parallel_steps": 0, "tool_calls": 0, "serial_s": 0.0, "wall_s": 0.0, "saved_s": 0.0,
+        })
+        stats["steps"] += 1
+        stats["parallel_steps"] += len(durations) > 1
+        stats["tool_calls"] += len(durations)
+        stats["serial_s"] += sum(durations)
+        stats["wall_s"] += wall_seconds
+        stats["saved_s"] += max(sum(durations) - wall_seconds, 0.0)
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return self.agents
+
+
+tool_call_stats = ToolCallStats()
+
+
+class ConcurrentAgentExecutor(AgentExecutor):
+    """AgentExecutor whose tool calls from one model response run concurrently, at most max_concurrency at a time.
+
+    Results are still returned in the order the model requested them.
+    """
+
+    max_concurrency: int = 4
+    _semaphore: Optional[asyncio.Semaphore] = PrivateAttr(default=None)
+    _durations: dict[int, float] = PrivateAttr(default_factory=dict)
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _aiter_next_step(self, *args, **kwargs) -> AsyncIterator[AgentFinish | AgentAction | AgentStep]:
+        # 부모 구현은 action 을 모두 내보낸 뒤 tool 호출을 asyncio.gather 로 실행하고, 끝나면 step 을 순서대로 내보낸다.
+        started_at, durations = None, []
+        async for chunk in super()._aiter_next_step(*args, **kwargs):
+            if isinstance(chunk, AgentAction) and started_at is None:
+                started_at = time.monotonic()
+            elif isinstance(chunk, AgentStep) and started_at is not None:
+                durations.append(self._durations.pop(id(chunk.action), 0.0))
+            yield chunk
+        if durations:
+            tool_call_stats.record(self.name or "AgentExecutor", durations, time.monotonic() - started_at)
+
+    async def _aperform_agent_action(self, name_to_tool_map, color_mapping, agent_action, run_manager=None) -> AgentStep:
+        async with self.get_semaphore():
+            start_time = time.monotonic()
+            try:
+                return await super()._aperform_agent_action(name_to_tool_map, color_mapping, agent_action, run_manager)
+            finally:
+                self._durations[id(agent_action)] = time.monotonic() - start_time
+
+
 class AgentBaseMeta(type):
     def __new__(cls, name, bases, attrs):
         new_class = super().__new__(cls, name, bases, attrs)
         if name != "AgentBase":
-            agent_manager.all_agents.append(new_class)
+            agent_manager.register(new_class)
         return new_class
 
 
@@ -66,57 +393,138 @@ class AgentBase(metaclass=AgentBaseMeta):
 
     def __init__(self, session_id: str = None) -> None:
         self.session_id = session_id if session_id else uuid4().hex
-        self.history: InMemoryChatMessageHistory = InMemoryChatMessageHistory()
+        self.history: BaseChatMessageHistory = create_history_store(
+            session_id=self.session_id,
+            namespace=self.profile.name,
+            summarizer=self.summarize_history if self.profile.summarize_history else None,
+        )
+        self.initialized_key: tuple | None = None
+        self.tools: list[BaseTool] = []
+        # tool subset 별 executor. subset 이 바뀔 때마다 agent 를 다시 만들지 않도록 보관한다.
+        self.executors: dict[tuple[str, ...], AgentExecutor] = {}
 
     async def initialize(
         self,
         deployment_name: str = None,
         response_format: Any = None,
         system_prompt_kwargs: dict = {},
-    ) -> None:
-        kwargs = {
-            "azure_endpoint": settings.AZURE_OPENAI_ENDPOINT,
-            "openai_api_key": settings.AZURE_OPENAI_API_KEY,
-            "openai_api_version": settings.AZURE_OPENAI_API_VERSION,
-        }
-        if deployment_name:
-            kwargs["deployment_name"] = deployment_name
+    ) -> bool:
+        # profile, 인자, system prompt 파일이 바뀌지 않았다면 model, prompt, tools, executor 를 다시 만들지 않는다.
+        key = (
+            self.profile.version,
+            self.get_system_prompt_version(),
+            deployment_name,
+            response_format,
+            json.dumps(system_prompt_kwargs, sort_keys=True, ensure_ascii=False, default=str),
+        )
+        if key == self.initialized_key:
+            return False
+
+        self.deployment_name = deployment_name or self.profile.deployment_name
+        self.model = model_pool.get_model(
+            deployment_name=self.deployment_name,
+            response_format=response_format,
+            callbacks=[DebugCallbackHandler()] if self.profile.enable_debugging else None,
+            cache=get_response_cache() if self.profile.enable_response_cache else None,
+            fallback_deployments=self.profile.fallback_deployments,
+            hedge=self.profile.hedge_requests,
+        )
+
+        self.system_prompt = self.generate_system_prompt(**system_prompt_kwargs)
+
+        self.tools = await self.get_tools()
+        self.executors = {}
+        if self.tools:
+            self.agent = self.get_executor(self.tools)
         else:
-            kwargs["deployment_name"] = self.profile.deployment_name
-        if response_format:
-            kwargs["model_kwargs"] = {"response_format": response_format}
-        if self.profile.enable_debugging:
-            kwargs["callbacks"] = [DebugCallbackHandler()]
+            self.agent = self.get_chat_prompt_template() | self.model
 
-        self.model = AzureChatOpenAI(**kwargs)
+        self.initialized_key = key
+        return True
 
-        self.system_prompt = self.generate_system_prompt(**system_prompt_kwargs)
+    def get_system_prompt_version(self) -> Optional[int]:
+        if not self.profile.prompts or not self.profile.prompts.system:
+            return None
+        return prompt_registry.get_version(self.profile.prompts.get_selected_prompt("system").filename)
 
-        if tools := await self.get_tools():
-            self.agent: AgentExecutor = AgentExecutor(
+    def get_executor(self, tools: list[BaseTool]) -> AgentExecutor:
+        key = tuple(tool.name for tool in tools)
+        if (executor := self.executors.get(key)) is None:
+            executor = self.executors[key] = ConcurrentAgentExecutor(
                 agent=create_openai_tools_agent(
                     self.model,
                     tools=tools,
                     prompt=self.get_chat_prompt_template(additional_messages=[MessagesPlaceholder("agent_scratchpad")]),
                 ),
                 tools=tools,
+                name=self.profile.name,
+                max_concurrency=self.profile.tool_concurrency or settings.TOOL_CALL_MAX_CONCURRENCY,
                 # verbose=enable_debugging or False,
             )
-        else:
-            self.agent = self.get_chat_prompt_template() | self.model
+        return executor
+
+    async def select_runnable(self, query: str, exclude_tools: Collection[str] = ()) -> Any:
+        # 이미 결과를 받은 tool(exclude_tools) 은 빼고 보내 같은 조회를 다시 하지 않게 한다.
+        tools = [tool for tool in self.tools if tool.name not in exclude_tools]
+        if not tools:
+            return self.get_chat_prompt_template() | self.model if self.tools else self.agent
+        # tool 이 많은 agent 는 요청과 관련된 tool 의 schema 만 보내 prompt token 과 첫 token 지연을 줄인다.
+        if self.profile.tool_selection_top_k:
+            tools = await get_tool_selector().select(
+                self.profile.name, tools, query, self.profile.tool_selection_top_k, pinned=self.profile.pinned_tools,
+            )
+        return self.agent if len(tools) == len(self.tools) else self.get_executor(tools)
 
-    async def run(self, user_prompt: str) -> Any:
-        chain = RunnableWithMessageHistory(
-            self.agent,
-            self.get_history_store,
+    def get_chain(self, runnable: Any = None, history: Optional[BaseChatMessageHistory] = None) -> RunnableWithMessageHistory:
+        return RunnableWithMessageHistory(
+            runnable or self.agent,
+            (lambda session_id: history) if history is not None else self.get_history_store,
             input_messages_key="input",
             history_messages_key="history",
         )
 
-        return await chain.ainvoke(
+    def select_deployment(self, question: str, routed_agent: str = None) -> str | None:
+        # routed_deployments 가 없으면 None 을 돌려주어 profile 의 deployment_name 을 그대로 쓴다.
+        return complexity_router.select_deployment(self.profile.routed_deployments, question, routed_agent)
+
+    async def run(
+        self,
+        user_prompt: str,
+        exclude_tools: Collection[str] = (),
+        history: Optional[BaseChatMessageHistory] = None,
+        query: Optional[str] = None,
+    ) -> Any:
+        """Runs one turn.
+
+        `query` is the user's own question, used to select tools instead of the rendered prompt;
+        pass `history` to read and record the turn there instead of the agent's own history.
+        """
+        start_time = time.monotonic()
+        runnable = await self.select_runnable(query or user_prompt, exclude_tools)
+        response = await self.get_chain(runnable, history).ainvoke(
             {"input": user_prompt},
             config={"configurable": {"session_id": self.session_id}}
         )
+        complexity_router.record(self.profile.name, self.deployment_name, time.monotonic() - start_time)
+        return response
+
+    async def run_stream(
+        self,
+        user_prompt: str,
+        exclude_tools: Collection[str] = (),
+        query: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        # AgentExecutor 는 astream 시 step 단위로만 내보내므로 chat model 의 token 이벤트를 직접 구독한다.
+        start_time = time.monotonic()
+        async for event in self.get_chain(await self.select_runnable(query or user_prompt, exclude_tools)).astream_events(
+            {"input": user_prompt},
+            config={"configurable": {"session_id": self.session_id}},
+            version="v2",
+        ):
+            if event["event"] == "on_chat_model_stream":
+                if token := event["data"]["chunk"].content:
+                    yield token
+        complexity_router.record(self.profile.name, self.deployment_name, time.monotonic() - start_time)
 
     @abc.abstractmethod
     def generate_system_prompt(self, **kwargs) -> str:
@@ -141,9 +549,16 @@ class AgentBase(metaclass=AgentBaseMeta):
 
         return ChatPromptTemplate.from_messages(messages)
 
-    def get_history_store(self, session_id: str) -> InMemoryChatMessageHistory:
+    def get_history_store(self, session_id: str) -> BaseChatMessageHistory:
         return self.history
 
+    async def summarize_history(self, messages: list[BaseMessage], summary: str | None) -> str:
+        model = model_pool.get_model(deployment_name=settings.AZURE_OPENAI_CHAT_MINI_DEPLOYMENT)
+        response = await model.ainvoke(
+            prompt_registry.render("history_summary_prompt.jinja", messages=messages, summary=summary),
+        )
+        return response.content
+
     @staticmethod
     def extract_answer(answer: Any) -> str:
         # 1) answer가 LangChain 메시지 리스트로 들어온 경우
@@ -183,18 +598,148 @@ class AgentBase(metaclass=AgentBaseMeta):
         return str(answer)
 
 
+# 요청 전체의 마감 시각(time.monotonic 기준). 중첩 graph 의 node 도 같은 요청의 budget 을 나눠 쓴다.
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline_scope(timeout_seconds: Optional[float] = None) -> Iterator[None]:
+    # 이미 바깥 요청의 마감 시각이 있으면(예: triage 안에서 실행되는 travel graph) 그대로 따른다.
+    if request_deadline.get() is not None:
+        yield
+        return
+    token = request_deadline.set(time.monotonic() + (timeout_seconds or settings.REQUEST_TIMEOUT_SECONDS))
+    try:
+        yield
+    finally:
+        request_deadline.reset(token)
+
+
 class TaskOperator:
+    # 사용자에게 답변 token 을 스트리밍하는 operator 는 spinner 가 출력과 섞이지 않도록 status 를 띄우지 않는다.
+    streaming: bool = False
+    # (agent name, elapsed seconds) 를 받는 callback. benchmark 등에서 node 별 latency 를 수집할 때 사용한다.
+    timing_hooks: list[Callable[[str, float], None]] = []
+    # agent name 별로 time budget 을 넘겨 degraded 상태로 진행한 횟수
+    timeouts: dict[str, int] = {}
+    timeout_notice: str = "\n\n⏱️ (응답 시간 제한을 넘어 답변이 중간에 중단되었습니다.)"
+
     def __init__(self, agent: AgentBase) -> None:
         self.agent = agent
-
-    async def run_node(self, state: AgentGraphStateBase) -> str:
-        with console.status(f"[blue] {self.agent.profile.name} is processing...[/]"):
-            start_time = console.get_datetime()
-            await self.exec(state)
-            elapsed_time = console.get_datetime() - start_time
+        # workflow task 처럼 여러 operator 가 동시에 답변을 만들 때는 token 이 섞이지 않도록 끈다.
+        self.emit_tokens: bool = True
+        # 시간 제한으로 중단됐을 때 그때까지 스트리밍한 답변을 살리기 위해 보관한다.
+        self.partial_tokens: list[str] = []
+
+    def get_time_budget(self) -> float:
+        budget = self.agent.profile.timeout_seconds or settings.NODE_TIMEOUT_SECONDS
+        if (deadline := request_deadline.get()) is not None:
+            budget = min(budget, deadline - time.monotonic())
+        return budget
+
+    async def run_node(self, state: AgentGraphStateBase) -> dict[str, Any]:
+        before = state.model_copy(deep=True)
+        start_time = console.get_datetime()
+        self.partial_tokens = []
+        budget = self.get_time_budget()
+        try:
+            if budget <= 0:
+                raise TimeoutError()
+            # 시간이 다 되면 exec 를 취소하므로 진행 중인 LLM / tool 호출도 함께 취소된다.
+            async with asyncio.timeout(budget):
+                if self.streaming:
+                    console.log(f"[blue] {self.agent.profile.name} is processing...[/]")
+                    await self.exec(state)
+                else:
+                    with console.status(f"[blue] {self.agent.profile.name} is processing...[/]"):
+                        await self.exec(state)
+        except TimeoutError:
+            self.timeouts[self.agent.profile.name] = self.timeouts.get(self.agent.profile.name, 0) + 1
+            console.log(
+                f"⏱️ {self.agent.profile.name} exceeded its time budget ({max(budget, 0.0):.1f}s), continuing with degraded context."
+            )
+            await self.degrade(state)
+        elapsed_time = console.get_datetime() - start_time
+        for hook in self.timing_hooks:
+            hook(self.agent.profile.name, elapsed_time.total_seconds())
         console.log(f"[green] ✅ ({elapsed_time.total_seconds():.2f}s) {self.agent.profile.name} is completed. [/]")
-        return state
+        return self.get_updates(before, state)
+
+    async def degrade(self, state: AgentGraphStateBase) -> None:
+        """Called when the node runs out of time; fields it did not fill are left empty for the next nodes."""
+        # 답변을 만드는 node 는 그때까지 스트리밍한 답변에 중단 안내를 붙여 돌려준다.
+        if self.streaming:
+            self.get_stream_writer()(self.timeout_notice)
+            state.answer = "".join(self.partial_tokens) + self.timeout_notice
+
+    @staticmethod
+    def get_updates(before: AgentGraphStateBase, after: AgentGraphStateBase) -> dict[str, Any]:
+        # 바뀐 필드만 돌려주어야 병렬 branch 가 같은 key 를 동시에 쓰는 충돌이 생기지 않는다.
+        updates = {}
+        for name in type(after).model_fields:
+            old, new = getattr(before, name), getattr(after, name)
+            if name == "context" and isinstance(new, BaseModel) and type(old) is type(new):
+                if changed := {k: getattr(new, k) for k in type(new).model_fields if getattr(old, k) != getattr(new, k)}:
+                    updates[name] = type(new).model_construct(**changed)
+            elif old != new:
+                updates[name] = new
+        return updates
+
+    def get_stream_writer(self) -> Callable[[Any], None]:
+        if self.emit_tokens:
+            try:
+                return get_stream_writer()
+            except RuntimeError:
+                # graph 밖에서 직접 실행된 경우
+                pass
+        return lambda chunk: None
+
+    async def stream_answer(self, user_prompt: str) -> str:
+        writer = self.get_stream_writer()
+        tokens = self.partial_tokens = []
+        async for token in self.agent.run_stream(user_prompt):
+            tokens.append(token)
+            writer(token)
+        return "".join(tokens)
 
     @abc.abstractmethod
     async def exec(self, state: AgentGraphStateBase) -> None:
-        raise NotImplementedError()
\ No newline at end of file
+        raise NotImplementedError()
+
+
+class SessionDispatcher:
+    """Graph node that runs the task operator of the session given in the invoke config.
+
+    Compiled graphs are shared by every session, so per-session state (agent history,
+    operator fields) lives in operators created on first use and kept in an LRU.
+    """
+
+    def __init__(self, agent_name: str, max_sessions: Optional[int] = None) -> None:
+        self.agent_name = agent_name
+        self.max_sessions = max_sessions or settings.SESSION_OPERATOR_CACHE_SIZE
+        self.operators: OrderedDict[str, TaskOperator] = OrderedDict()
+        self.created: int = 0
+        self.evictions: int = 0
+
+    def get_operator(self, session_id: str) -> TaskOperator:
+        if operator := self.operators.get(session_id):
+            self.operators.move_to_end(session_id)
+            return operator
+
+        agent_cls = agent_manager.get_agent_class(self.agent_name)
+        operator = agent_cls.profile.task_operator(agent_cls(session_id))
+        self.operators[session_id] = operator
+        self.created += 1
+        while len(self.operators) > self.max_sessions:
+            self.operators.popitem(last=False)
+            self.evictions += 1
+        return operator
+
+    def discard(self, session_id: str) -> None:
+        self.operators.pop(session_id, None)
+
+    async def __call__(self, state: AgentGraphStateBase, config: RunnableConfig) -> dict[str, Any]:
+        return await self.get_operator(config["configurable"]["session_id"]).run_node(state)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"sessions": len(self.operators), "created": self.created, "evictions": self.evictions}
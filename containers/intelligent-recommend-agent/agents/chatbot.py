@@ -1,12 +1,18 @@
 from agents.base import AgentBase, TaskOperator
 from agents.schema import AgentGraphStateBase, AgentProfile
+from common import settings
 
 
 class ChatbotOperator(TaskOperator):
+    streaming = True
+
     async def exec(self, state: AgentGraphStateBase) -> None:
-        await self.agent.initialize()
-        response = await self.agent.run(state.question)
-        state.answer = self.agent.extract_answer(response)
+        await self.agent.initialize(
+            deployment_name=self.agent.select_deployment(
+                state.question, getattr(state.context, "selected_agent_name", None),
+            ),
+        )
+        state.answer = await self.stream_answer(state.question)
 
 
 class ChatbotAgent(AgentBase):
@@ -14,4 +20,12 @@ class ChatbotAgent(AgentBase):
         name="ChatbotAgent",
         description="단순 인사, 잡담, 일반 지식 질문, 설명 요청 등 범용 대화에 답변하는 에이전트",
         task_operator=ChatbotOperator,
+        summarize_history=True,
+        deployment_name=settings.AZURE_OPENAI_CHAT_MINI_DEPLOYMENT,
+        fallback_deployments=[settings.AZURE_OPENAI_CHAT_DEPLOYMENT],
+        routed_deployments={
+            "simple": settings.AZURE_OPENAI_CHAT_MINI_DEPLOYMENT,
+            "standard": settings.AZURE_OPENAI_CHAT_MINI_DEPLOYMENT,
+            "complex": settings.AZURE_OPENAI_CHAT_DEPLOYMENT,
+        },
     )
\ No newline at end of file
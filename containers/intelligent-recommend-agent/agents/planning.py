@@ -1,14 +1,13 @@
 import json
-from pathlib import Path
 from textwrap import dedent
 
-from langchain_core.prompts import PromptTemplate
 from langchain_core.tools import tool
 from rich.table import Table
 
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, TaskOperator, prompt_registry
 from agents.schema import AgentProfile, PlanningStepsArgument, PlannedAgentGraphState, Task, Workflow
-from common import console
+from agents.workflow import WorkflowExecutor
+from common import console, settings
 
 
 @tool(
@@ -22,6 +21,7 @@ from common import console
         - description: what to do in this step
         - agent: which agent or tool to call
         - question: question or input for this step
+        - use_answers_from: indices of earlier steps whose answers this step needs
 	"""
     ),
     args_schema=PlanningStepsArgument,
@@ -34,7 +34,7 @@ async def plan(steps: list) -> PlanningStepsArgument:
 class PlanningOperator(TaskOperator):
     async def exec(self, state: PlannedAgentGraphState) -> None:
         await self.agent.initialize(
-            deployment_name="gpt-5",
+            deployment_name=self.agent.select_deployment(state.question),
             response_format=PlanningStepsArgument,
             system_prompt_kwargs={
                 "agents": [{
@@ -64,13 +64,31 @@ class PlanningOperator(TaskOperator):
                     str(idx),
                     task.agent,
                     task.question,
-                    "".join([str(i) for i in task.use_answers_from]),
+                    ", ".join([str(i) for i in task.use_answers_from]),
                 )
             console.print(table)
         else:
             console.log(f"⚠️ [PlanningAgent] No steps found in the generated plan.")
             return
 
+        await WorkflowExecutor(self.agent.session_id).run(state.workflow)
+        state.answer = WorkflowExecutor.get_final_answer(state.workflow)
+
+        table = Table(
+            title="📝 [PlanningAgent] Executed workflow.", show_lines=False
+        )
+        table.add_column("#", style="cyan", justify="right")
+        table.add_column("Agent", style="magenta")
+        table.add_column("Elapsed", style="cyan", justify="right")
+        table.add_column("Result", style="green")
+        for idx, task in enumerate(state.workflow.tasks):
+            elapsed = (
+                f"{(task.finished_at - task.started_at).total_seconds():.2f}s"
+                if task.started_at and task.finished_at else "-"
+            )
+            table.add_row(str(idx), task.agent, elapsed, task.error or "✅")
+        console.print(table)
+
 
 class PlanningAgent(AgentBase):
     profile: AgentProfile = AgentProfile(
@@ -80,18 +98,19 @@ class PlanningAgent(AgentBase):
         ),
         task_operator=PlanningOperator,
         interactive=False,
+        enable_response_cache=True,
+        deployment_name=settings.AZURE_OPENAI_REASONING_DEPLOYMENT,
+        routed_deployments={
+            "simple": settings.AZURE_OPENAI_REASONING_MINI_DEPLOYMENT,
+            "standard": settings.AZURE_OPENAI_REASONING_DEPLOYMENT,
+            "complex": settings.AZURE_OPENAI_REASONING_DEPLOYMENT,
+        },
+        # 계획한 workflow 까지 실행하므로 workflow deadline 과 계획 시간을 합친 만큼 기다린다.
+        timeout_seconds=settings.NODE_TIMEOUT_SECONDS + settings.WORKFLOW_DEADLINE_SECONDS,
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / "planning_system_prompt.jinja",
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render("planning_system_prompt.jinja", **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / "planning_human_prompt.jinja",
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
\ No newline at end of file
+        return prompt_registry.render("planning_human_prompt.jinja", **kwargs)
\ No newline at end of file
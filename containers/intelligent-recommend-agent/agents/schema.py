@@ -1,5 +1,5 @@
 import datetime
-from typing import Any, Optional, TypedDict
+from typing import Annotated, Any, ClassVar, Optional, TypedDict
 from uuid import uuid4
 
 from pydantic import BaseModel, Field
@@ -35,6 +35,29 @@ class AgentProfile(BaseModel):
     prompts: Optional[AgentPrompt] = Field(default=None, description="Data structure for prompts related to the agent")
     deployment_name: str = Field(default=settings.AZURE_OPENAI_CHAT_DEPLOYMENT, description="Azure OpenAI deployment name for chat models")
     enable_debugging: bool = Field(default=False, description="Whether to enable debugging for the agent")
+    summarize_history: bool = Field(default=False, description="Whether to fold evicted chat history into a rolling summary")
+    enable_response_cache: bool = Field(default=False, description="Whether to serve repeated model calls from the response cache")
+    fallback_deployments: list[str] = Field(default_factory=list, description="Deployments to fail over to on timeouts, 429s and server errors")
+    hedge_requests: bool = Field(default=False, description="Whether to hedge slow requests to the first fallback deployment")
+    routed_deployments: dict[str, str] = Field(default_factory=dict, description="Deployment per request complexity tier (simple, standard, complex)")
+    tool_selection_top_k: Optional[int] = Field(default=None, description="Send only the k tools most relevant to each request, all tools when unset")
+    pinned_tools: list[str] = Field(default_factory=list, description="Tools always sent when tool selection is on; they count towards tool_selection_top_k")
+    tool_concurrency: Optional[int] = Field(default=None, description="Tool calls of one model response run at once, TOOL_CALL_MAX_CONCURRENCY when unset")
+    timeout_seconds: Optional[float] = Field(default=None, description="Time budget of one node run, NODE_TIMEOUT_SECONDS when unset")
+    version: int = Field(default=0, description="Incremented whenever a field that affects agent initialization changes")
+
+    tracked_fields: ClassVar[set[str]] = {
+        "deployment_name", "enable_debugging", "enable_response_cache", "fallback_deployments", "hedge_requests", "routed_deployments", "prompts", "tool_concurrency",
+    }
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self.tracked_fields:
+            self.touch()
+
+    def touch(self) -> None:
+        # 중첩 필드(예: prompts 의 selected) 변경은 감지되지 않으므로 호출 측에서 직접 touch 한다.
+        super().__setattr__("version", self.version + 1)
 
 
 class PlanningStepArgument(BaseModel):
@@ -42,6 +65,7 @@ class PlanningStepArgument(BaseModel):
     description: str = Field(description="What to do in this step")
     agent: str = Field(description="Agent responsible for this step")
     question: str = Field(description="Question or input for this step")
+    use_answers_from: list[int] = Field(description="Indices of earlier steps whose answers this step needs")
 
 
 class PlanningStepsArgument(BaseModel):
@@ -60,6 +84,7 @@ class Task(PlanningStepArgument):
     started_at: Optional[datetime.datetime] = None
     finished_at: Optional[datetime.datetime] = None
     answer: Optional[str] = None
+    error: Optional[str] = None
 
 
 class Workflow(BaseModel):
@@ -88,14 +113,23 @@ class TriageAgentContext(AgentContextBase):
 class TravelAgentContext(AgentContextBase):
     profile: Optional[str] = None
     searched_data: Optional[str] = None
+    # searched_data 에 결과가 들어 있어 뒤의 agent 가 다시 호출할 필요가 없는 tool 이름
+    prefetched_tools: list[str] = Field(default_factory=list)
     itinerary_suggestion: Optional[str] = None
     recommendations: Optional[str] = None
 
 
+def merge_context(left: Any, right: Any) -> Any:
+    # 병렬 branch 가 context 의 서로 다른 필드를 채우므로, 각 update 에서 설정된 필드만 덮어쓴다.
+    if left is None or right is None or type(left) is not type(right):
+        return left if right is None else right
+    return left.model_copy(update={name: getattr(right, name) for name in right.model_fields_set})
+
+
 class AgentGraphStateBase(BaseModel):
     question: str
     answer: Optional[str] = None
-    context: Optional[Any] = None
+    context: Annotated[Optional[Any], merge_context] = None
 
 
 class PlannedAgentGraphState(AgentGraphStateBase):
@@ -1,63 +1,112 @@
+from typing import AsyncIterator, Optional
 from uuid import uuid4
 
-from langgraph.graph import END, StateGraph
+from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, SessionDispatcher, TaskOperator, request_deadline_scope
 from agents.schema import AgentGraphStateBase, AgentProfile, TravelAgentContext
-from agents.travel_itinerary_suggestion import TravelItinerarySuggestionAgent
-from agents.travel_profile import TravelProfileAgent
-from agents.travel_recommend import TravelRecommendAgent
-from agents.travel_summary import TravelSummaryAgent
-from common import console
+from capabilities.checkpoint import get_checkpointer
+from common import console, settings
 
 
 class TravelAgentGraph:
+    # 같은 stage 의 agent 는 병렬로 실행되고, 다음 stage 는 이전 stage 가 모두 끝난 뒤(join) 시작한다.
+    stages = [
+        ["TravelProfileAgent", "TravelPrefetchAgent"],
+        ["TravelItinerarySuggestionAgent"],
+        ["TravelRecommendAgent"],
+        ["TravelSummaryAgent"],
+    ]
+    sub_agents = [name for stage in stages for name in stage]
+    # topology 는 session 과 무관하므로 process 에서 한 번만 compile 하고, session 은 invoke config 로 넘긴다.
+    compiled: Optional[CompiledStateGraph] = None
+    dispatchers: dict[str, SessionDispatcher] = {}
+
     def __init__(self, session_id: str = None) -> None:
         self.session_id: str = uuid4().hex if not session_id else session_id
-        self.sub_agents = [
-            ("TravelProfileAgent", TravelProfileAgent),
-            ("TravelItinerarySuggestionAgent", TravelItinerarySuggestionAgent),
-            ("TravelRecommendAgent", TravelRecommendAgent),
-            ("TravelSummaryAgent", TravelSummaryAgent),
-        ]
-        self.graph = self.build()
-
-    def build(self) -> CompiledStateGraph:
-        graph = StateGraph(AgentGraphStateBase)
+        self.graph = self.get_graph()
+
+    @classmethod
+    def get_graph(cls) -> CompiledStateGraph:
+        if cls.compiled is None or cls.compiled.checkpointer is not get_checkpointer().saver:
+            cls.compiled = cls.build()
+        return cls.compiled
 
-        for name, agent_cls in self.sub_agents:
-            task_operator = agent_cls.profile.task_operator(agent_cls(self.session_id))
-            graph.add_node(name, task_operator.run_node)
+    @classmethod
+    def build(cls) -> CompiledStateGraph:
+        graph = StateGraph(AgentGraphStateBase)
 
-        graph.set_entry_point("TravelProfileAgent")
+        cls.dispatchers = {name: SessionDispatcher(name) for name in cls.sub_agents}
+        for name, dispatcher in cls.dispatchers.items():
+            graph.add_node(name, dispatcher)
 
-        graph.add_edge("TravelProfileAgent", "TravelItinerarySuggestionAgent")
-        graph.add_edge("TravelItinerarySuggestionAgent", "TravelRecommendAgent")
-        graph.add_edge("TravelRecommendAgent", "TravelSummaryAgent")
-        graph.add_edge("TravelSummaryAgent", END)
+        for name in cls.stages[0]:
+            graph.add_edge(START, name)
+        for previous_stage, stage in zip(cls.stages, cls.stages[1:]):
+            for name in stage:
+                graph.add_edge(previous_stage if len(previous_stage) > 1 else previous_stage[0], name)
+        for name in cls.stages[-1]:
+            graph.add_edge(name, END)
 
-        compiled = graph.compile()
+        compiled = graph.compile(checkpointer=get_checkpointer().saver)
         console.log("🛠️ TravelAgent graph compiled successfully.")
         console.log(compiled.get_graph().draw_ascii(), style="dim")
 
         return compiled
 
     async def run(self, question: str) -> str:
-        response = await self.graph.ainvoke(
-            AgentGraphStateBase(context=TravelAgentContext(), question=question)
-        )
+        checkpointer = get_checkpointer()
+        config = checkpointer.get_config(f"{self.session_id}-travel", session_id=self.session_id)
+        with request_deadline_scope():
+            response = await self.graph.ainvoke(
+                await checkpointer.get_input(
+                    self.graph, config, AgentGraphStateBase(question=question, context=TravelAgentContext()),
+                ),
+                config,
+            )
+        await checkpointer.complete(config)
         return response.get("answer")
 
+    async def run_stream(self, question: str) -> AsyncIterator[str]:
+        checkpointer = get_checkpointer()
+        config = checkpointer.get_config(f"{self.session_id}-travel", session_id=self.session_id)
+        streamed, answer = False, None
+        with request_deadline_scope():
+            async for mode, chunk in self.graph.astream(
+                await checkpointer.get_input(
+                    self.graph, config, AgentGraphStateBase(question=question, context=TravelAgentContext()),
+                ),
+                config,
+                stream_mode=["custom", "values"],
+            ):
+                if mode == "custom":
+                    streamed = True
+                    yield chunk
+                else:
+                    answer = chunk.get("answer")
+        await checkpointer.complete(config)
+        if not streamed and answer:
+            yield answer
+
 
 class TravelOperator(TaskOperator):
+    streaming = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.graph = TravelAgentGraph()
+        self.graph: TravelAgentGraph | None = None
 
     async def exec(self, state: AgentGraphStateBase) -> None:
-        response = await self.graph.run(state.question)
-        state.answer = response
+        # 여행 sub-agent 들(graphrag, SQL toolkit 등)은 여행 요청이 처음 들어왔을 때 로드한다.
+        if self.graph is None:
+            self.graph = TravelAgentGraph(self.agent.session_id)
+        writer = self.get_stream_writer()
+        tokens = self.partial_tokens = []
+        async for token in self.graph.run_stream(state.question):
+            tokens.append(token)
+            writer(token)
+        state.answer = "".join(tokens)
 
 
 class TravelAgent(AgentBase):
@@ -65,4 +114,6 @@ class TravelAgent(AgentBase):
         name="TravelAgent",
         description="사용자의 여행 계획을 도와주는 에이전트입니다. 여행 일정, 도시, 인원 정보가 필요합니다.",
         task_operator=TravelOperator,
+        # 하위 travel graph 전체를 감싸는 node 이므로 node 별 budget 대신 요청 전체 budget 을 쓴다.
+        timeout_seconds=settings.REQUEST_TIMEOUT_SECONDS,
     )
\ No newline at end of file
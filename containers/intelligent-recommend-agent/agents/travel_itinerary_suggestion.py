@@ -1,8 +1,4 @@
-from pathlib import Path
-
-from langchain_core.prompts import PromptTemplate
-
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, TaskOperator, prompt_registry
 from agents.schema import AgentGraphStateBase, AgentProfile, AgentPrompt, PromptVariable
 from capabilities.mcp import get_mcp_client
 from capabilities.tools import get_current_weather, get_forecast
@@ -15,11 +11,16 @@ class TravelItinerarySuggestionOperator(TaskOperator):
 
     async def exec(self, state: AgentGraphStateBase) -> None:
         await self.agent.initialize()
+        # 날씨 예보를 이미 사전 조회했다면 날씨 tool 을 빼서 LLM 이 같은 예보를 다시 조회하지 않게 한다.
+        weather_tools = {get_current_weather.name, get_forecast.name}
         response = await self.agent.run(
             self.agent.generate_user_prompt(
                 itinerary_request=state.question,
                 profile=state.context.profile,
+                searched_data=state.context.searched_data,
             ),
+            exclude_tools=weather_tools if get_forecast.name in state.context.prefetched_tools else (),
+            query=state.question,
         )
         state.context.itinerary_suggestion = self.agent.extract_answer(response)
 
@@ -29,6 +30,8 @@ class TravelItinerarySuggestionAgent(AgentBase):
         name="TravelItinerarySuggestionAgent",
         description="사용자의 여행 프로필, 여행 목적,同行 인원 구성, 도시 정보, 체류 기간을 기반으로 가장 최적화된 여행 일정을 설계하는 전문 AI 플래너",
         task_operator=TravelItinerarySuggestionOperator,
+        tool_selection_top_k=4,
+        pinned_tools=["search_webkr", "get_forecast"],
         prompts=AgentPrompt(
             system=[
                 PromptVariable(
@@ -53,18 +56,10 @@ class TravelItinerarySuggestionAgent(AgentBase):
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
 
     async def get_tools(self) -> list:
         tools = await get_mcp_client().get_tools(server_name="naver-web")
@@ -0,0 +1,151 @@
+import asyncio
+from collections import Counter, defaultdict
+import json
+import re
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool
+
+from agents.base import AgentBase, TaskOperator
+from agents.schema import AgentGraphStateBase, AgentProfile
+from capabilities.mcp import get_mcp_client
+from capabilities.tools import get_forecast
+from common import console, settings
+
+
+# 목적지 이름(질문에 나오는 형태) → OpenWeatherMap 도시 query
+DESTINATIONS: dict[str, str] = {
+    "서울": "Seoul,KR",
+    "부산": "Busan,KR",
+    "제주": "Jeju,KR",
+    "인천": "Incheon,KR",
+    "강릉": "Gangneung,KR",
+    "속초": "Sokcho,KR",
+    "경주": "Gyeongju,KR",
+    "여수": "Yeosu,KR",
+    "전주": "Jeonju,KR",
+    "대구": "Daegu,KR",
+    "대전": "Daejeon,KR",
+    "도쿄": "Tokyo,JP",
+    "오사카": "Osaka,JP",
+    "교토": "Kyoto,JP",
+    "후쿠오카": "Fukuoka,JP",
+    "삿포로": "Sapporo,JP",
+    "오키나와": "Okinawa,JP",
+    "타이베이": "Taipei,TW",
+    "홍콩": "Hong Kong,HK",
+    "방콕": "Bangkok,TH",
+    "다낭": "Da Nang,VN",
+    "하노이": "Hanoi,VN",
+    "싱가포르": "Singapore,SG",
+    "파리": "Paris,FR",
+    "런던": "London,GB",
+    "로마": "Rome,IT",
+    "바르셀로나": "Barcelona,ES",
+    "뉴욕": "New York,US",
+}
+
+
+def find_destination(question: str) -> Optional[tuple[str, str]]:
+    """Returns (name, forecast city query) of the destination the question is about, or None when unsure."""
+    matched = []
+    for name, city in DESTINATIONS.items():
+        english_name = re.escape(city.split(",")[0])
+        if match := re.search(rf"{re.escape(name)}|\b{english_name}\b", question, re.IGNORECASE):
+            matched.append((name, city, match))
+    if len(matched) > 1:
+        # "서울 사는데 제주도 여행" 처럼 여러 도시가 나오면 "~로/~에" 가 붙은 도시나 "여행" 바로 앞의 도시를 목적지로 본다.
+        matched = [
+            (name, city, match) for name, city, match in matched
+            if re.match(r"도?\s*(으로|로|에(?!서)|여행)", question[match.end():], re.IGNORECASE)
+        ]
+    # 목적지를 잘못 고르면 뒤의 agent 가 날씨를 다시 조회하지 않으므로 확실하지 않으면 사전 조회를 건너뛴다.
+    if len(matched) != 1:
+        return None
+    name, city, _ = matched[0]
+    return name, city
+
+
+def summarize_forecast(forecast: dict[str, Any]) -> str:
+    # 3시간 간격 예보(최대 40개)를 날짜별 최저/최고 기온과 가장 많이 나온 날씨 하나로 줄인다.
+    days: dict[str, list[dict]] = defaultdict(list)
+    for item in forecast.get("list", []):
+        days[item["dt_txt"][:10]].append(item)
+    lines = []
+    for day, items in days.items():
+        temp_min = min(item["main"]["temp_min"] for item in items)
+        temp_max = max(item["main"]["temp_max"] for item in items)
+        description = Counter(item["weather"][0]["description"] for item in items if item.get("weather")).most_common(1)
+        lines.append(f"- {day}: {temp_min:.0f}~{temp_max:.0f}°C, {description[0][0] if description else '-'}")
+    return "\n".join(lines)
+
+
+def get_search_args(tool: BaseTool, name: str, city: str, keyword: str) -> Optional[dict[str, Any]]:
+    # google-places MCP 서버 버전에 따라 text 검색(query) 또는 주변 검색(center + keyword) tool 을 제공한다.
+    if "query" in tool.args:
+        return {"query": f"{name} {keyword}"}
+    if "keyword" in tool.args and "center" in tool.args:
+        return {"center": {"value": city, "isCoordinates": False}, "keyword": keyword}
+    return None
+
+
+class TravelPrefetchOperator(TaskOperator):
+    async def exec(self, state: AgentGraphStateBase) -> None:
+        if prefetched := await self.agent.prefetch(state.question):
+            state.context.searched_data, state.context.prefetched_tools = prefetched
+
+
+class TravelPrefetchAgent(AgentBase):
+    """Looks up the destination's forecast and places with plain tool calls, without an LLM."""
+
+    profile: AgentProfile = AgentProfile(
+        name="TravelPrefetchAgent",
+        description="사용자 프로필과 무관한 목적지 정보 (날씨 예보, 주요 명소/호텔/레스토랑) 를 미리 조회하는 에이전트",
+        task_operator=TravelPrefetchOperator,
+        interactive=False,
+        timeout_seconds=settings.TRAVEL_PREFETCH_TIMEOUT_SECONDS,
+    )
+    # benchmark 에서는 외부 API 대신 stub tool 로 바꿔 끼운다.
+    forecast_tool: BaseTool = get_forecast
+    place_keywords: list[str] = ["관광 명소", "호텔", "레스토랑"]
+    max_result_chars: int = 1500
+
+    def generate_system_prompt(self, **kwargs) -> str:
+        return ""
+
+    def generate_user_prompt(self, **kwargs) -> str:
+        return ""
+
+    async def get_tools(self) -> list[BaseTool]:
+        return [self.forecast_tool, *await get_mcp_client().get_tools(server_name="google-places")]
+
+    async def lookup(self, tool: BaseTool, args: dict[str, Any]) -> Optional[str]:
+        # 사전 조회는 best effort 이므로 실패한 조회는 건너뛰고, 필요한 정보는 뒤의 agent 가 직접 조회한다.
+        try:
+            result = await tool.ainvoke(args)
+        except Exception as e:
+            console.log(f"⚠️ Prefetch '{tool.name}' failed: {type(e).__name__}: {e}")
+            return None
+        if tool.name == self.forecast_tool.name:
+            return summarize_forecast(json.loads(result) if isinstance(result, str) else result)
+        return str(result)[: self.max_result_chars]
+
+    async def prefetch(self, question: str) -> Optional[tuple[str, list[str]]]:
+        """Returns the prefetched data as prompt text and the names of the tools whose results it holds."""
+        if (destination := find_destination(question)) is None:
+            return None
+        name, city = destination
+
+        tools = await self.get_tools()
+        lookups = [("🌤️ 날씨 예보", tools[0], {"city": city})]
+        if search_tool := next((tool for tool in tools[1:] if get_search_args(tool, name, city, "") is not None), None):
+            lookups.extend(
+                (f"📍 {keyword}", search_tool, get_search_args(search_tool, name, city, keyword)) for keyword in self.place_keywords
+            )
+
+        results = await asyncio.gather(*(self.lookup(tool, args) for _, tool, args in lookups))
+        sections = [f"#### {title} ({name})\n{result}" for (title, _, _), result in zip(lookups, results) if result]
+        if not sections:
+            return None
+        prefetched_tools = sorted({tool.name for (_, tool, _), result in zip(lookups, results) if result})
+        return "\n\n".join(sections), prefetched_tools
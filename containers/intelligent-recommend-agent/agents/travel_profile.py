@@ -1,20 +1,26 @@
+import asyncio
+import csv
 from datetime import datetime
 import os
 from pathlib import Path
+import re
 import subprocess
+import time
+from typing import TYPE_CHECKING, Any, Optional
 
-from langchain_community.agent_toolkits.sql.base import SQLDatabaseToolkit
+from langchain_core.callbacks import get_usage_metadata_callback
+from langchain_core.chat_history import BaseChatMessageHistory, InMemoryChatMessageHistory
 from langchain_core.prompts import MessagesPlaceholder
 from langchain_core.tools import tool
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain.prompts import PromptTemplate
-import pandas as pd
+from langchain.agents import create_tool_calling_agent
 
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, ConcurrentAgentExecutor, TaskOperator, prompt_registry
 from agents.schema import AgentGraphStateBase, AgentProfile, AgentPrompt, PromptVariable
-from capabilities.db import ReadOnlySQLDatabase
-from capabilities.graphrag import GraphRAG
-from common import console
+from capabilities.cache import ProfileCache, get_profile_cache
+from common import console, settings
+
+if TYPE_CHECKING:
+    from capabilities.graphrag import GraphRAG
 
 
 @tool(
@@ -22,21 +28,138 @@ from common import console
     description="사용자의 여행 활동, 호텔 방문 기록, 선호도, 리뷰 히스토리를 기반으로 개인화된 여행 프로필을 구성하는데 필요한 정보를 Graphrag에서 검색합니다.",
 )
 async def get_travel_profile_from_graphrag(question: str) -> str:
-    return await TravelProfileAgent.graphrag.retrieve_on_global(question)
+    return await TravelProfileAgent.get_graphrag().retrieve_on_global(question)
 
 
 class TravelProfileOperator(TaskOperator):
-    async def exec(self, state: AgentGraphStateBase) -> None:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 이름이 빠진 후속 질문도 같은 사용자의 프로필을 쓰도록 대화에서 마지막으로 확인된 사용자를 기억한다.
+        self.user_key: str = f"session:{self.agent.session_id}"
+
+    async def get_profile(self, question: str, history: Optional[BaseChatMessageHistory] = None) -> Optional[str]:
+        if user_id := self.agent.find_user_id(question):
+            self.user_key = f"user:{user_id}"
+        profile_cache = get_profile_cache()
+        version = profile_cache.get_dataset_version([filename for filename, _ in self.agent.assets])
+        if profile := profile_cache.get(self.user_key, version):
+            console.log(f"⚡ [TravelProfileAgent] Reusing the cached profile of '{self.user_key}'.")
+            return profile
+
         await self.agent.initialize()
-        response = await self.agent.run(self.agent.generate_user_prompt(question=state.question))
-        state.context.profile = self.agent.extract_answer(response)
+        response = await self.agent.run(self.agent.generate_user_prompt(question=question), history=history)
+        profile = self.agent.extract_answer(response)
+        if profile:
+            profile_cache.set(self.user_key, version, profile)
+        return profile
 
+    async def exec(self, state: AgentGraphStateBase) -> None:
+        profile = await get_profile_speculator().claim(self.agent.session_id, state.question)
+        state.context.profile = profile if profile is not None else await self.get_profile(state.question)
 
-class TravelSQLToolkit(SQLDatabaseToolkit):
-    def get_tools(self):
-        tools = super().get_tools()
-        tools.append(get_travel_profile_from_graphrag)
-        return tools
+
+class Speculation:
+    def __init__(self, operator: TravelProfileOperator) -> None:
+        self.operator = operator
+        self.task: Optional[asyncio.Task] = None
+        self.started_at: float = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.tokens: int = 0
+        # 세션 history 의 복사본. 추측 실행의 대화는 여기에만 쌓이고, claim 된 경우에만 세션 history 로 옮긴다.
+        self.history: InMemoryChatMessageHistory = InMemoryChatMessageHistory()
+        self.seeded: int = 0
+
+    async def commit(self) -> None:
+        if turn := self.history.messages[self.seeded:]:
+            await self.operator.agent.history.aadd_messages(turn)
+
+
+class ProfileSpeculator:
+    """Retrieves the travel profile while triage is still deciding, and hands it to the travel graph.
+
+    Profile retrieval is read-only and idempotent, and a speculation runs on a copy of the
+    session history, so one that triage does not route to is simply cancelled without leaving
+    a turn behind; the tokens it spent are reported as wasted.
+    """
+
+    def __init__(self) -> None:
+        self.pending: dict[tuple[str, str], Speculation] = {}
+        self.started: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.cancelled: int = 0
+        self.failures: int = 0
+        self.wasted_tokens: int = 0
+        self.saved_seconds: float = 0.0
+
+    def start(self, session_id: str, question: str, operator: TravelProfileOperator) -> None:
+        key = (session_id, question)
+        if key in self.pending:
+            return
+        speculation = Speculation(operator)
+        speculation.task = asyncio.create_task(self.speculate(speculation, question))
+        self.pending[key] = speculation
+        self.started += 1
+        console.log(f"🔮 [TravelProfileAgent] Speculatively retrieving the profile for session '{session_id}'.")
+
+    async def speculate(self, speculation: Speculation, question: str) -> Optional[str]:
+        with get_usage_metadata_callback() as usage:
+            try:
+                speculation.history.add_messages(await speculation.operator.agent.history.aget_messages())
+                speculation.seeded = len(speculation.history.messages)
+                return await speculation.operator.get_profile(question, history=speculation.history)
+            finally:
+                # 취소되더라도 그때까지 사용한 token 은 낭비로 집계해야 하므로 finally 에서 기록한다.
+                speculation.finished_at = time.monotonic()
+                speculation.tokens = sum(metadata.get("total_tokens", 0) for metadata in usage.usage_metadata.values())
+
+    async def claim(self, session_id: str, question: str) -> Optional[str]:
+        """Returns the speculated profile, or None when there is none and it must be retrieved normally."""
+        if (speculation := self.pending.pop((session_id, question), None)) is None:
+            return None
+
+        self.hits += 1
+        # travel graph 가 profile 을 요청한 시점까지 speculation 이 먼저 진행한 시간만큼 지연이 줄어든다.
+        self.saved_seconds += (speculation.finished_at or time.monotonic()) - speculation.started_at
+        try:
+            profile = await speculation.task
+        except Exception as e:
+            self.failures += 1
+            console.log(f"⚠️ [TravelProfileAgent] Speculative retrieval failed, retrying: {type(e).__name__}: {e}")
+            return None
+        await speculation.commit()
+        return profile
+
+    async def discard(self, session_id: str, question: str) -> None:
+        if (speculation := self.pending.pop((session_id, question), None)) is None:
+            return
+
+        self.misses += 1
+        if not speculation.task.done():
+            self.cancelled += 1
+            speculation.task.cancel()
+        await asyncio.gather(speculation.task, return_exceptions=True)
+        self.wasted_tokens += speculation.tokens
+
+    def get_stats(self) -> dict[str, Any]:
+        resolved = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cancelled": self.cancelled,
+            "failures": self.failures,
+            "hit_rate": self.hits / resolved if resolved else 0.0,
+            "wasted_tokens": self.wasted_tokens,
+            "saved_seconds": self.saved_seconds,
+        }
+
+
+profile_speculator = ProfileSpeculator()
+
+
+def get_profile_speculator() -> ProfileSpeculator:
+    return profile_speculator
 
 
 class TravelProfileAgent(AgentBase):
@@ -71,37 +194,71 @@ class TravelProfileAgent(AgentBase):
         ("./assets/user_hotel_activity.csv", "User-Hotel-Activities"),
         ("./assets/users.csv", "Users"),
     ]
-    graphrag: GraphRAG = GraphRAG(path=Path() / "assets" / "graphrag_travel_profile", force=True, auto_delete=False)
+    graphrag: Optional["GraphRAG"] = None
+    # (Users 테이블의 dataset version, 이름 -> user_id, user_id 목록)
+    users: Optional[tuple[str, dict[str, str], set[str]]] = None
+    # "2박 3일" 같은 숫자를 user_id 로 오인하지 않도록 user_id 는 "사용자 12", "user_id: 12" 처럼 명시된 경우만 찾는다.
+    user_id_pattern = re.compile(r"(?:user[ _]?id|user|사용자|회원)\s*(?:id|번호)?\s*[:#=]?\s*(\d+)(?:\s*번)?(?!\w)", re.IGNORECASE)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    async def initialize(self):
-        await super().initialize()
-        self.agent = AgentExecutor(
+    async def initialize(self) -> bool:
+        if not await super().initialize():
+            return False
+
+        # pandas, sqlalchemy, SQL toolkit 은 여행 프로필을 처음 조회할 때 로드한다.
+        from langchain_community.agent_toolkits.sql.base import SQLDatabaseToolkit
+
+        from capabilities.db import ReadOnlySQLDatabase
+
+        tools = SQLDatabaseToolkit(db=ReadOnlySQLDatabase(self.assets), llm=self.model).get_tools()
+        tools.append(get_travel_profile_from_graphrag)
+        self.agent = ConcurrentAgentExecutor(
             agent=create_tool_calling_agent(
                 llm=self.model,
-                tools=TravelSQLToolkit(db=ReadOnlySQLDatabase(self.assets), llm=self.model).get_tools(),
+                tools=tools,
                 # verbose=True,
                 prompt=self.get_chat_prompt_template(additional_messages=[MessagesPlaceholder("agent_scratchpad")]),
             ),
-            tools=TravelSQLToolkit(db=ReadOnlySQLDatabase(self.assets), llm=self.model).get_tools(),
+            tools=tools,
+            name=self.profile.name,
+            max_concurrency=self.profile.tool_concurrency or settings.TOOL_CALL_MAX_CONCURRENCY,
         )
+        return True
 
-    def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+    @classmethod
+    def find_user_id(cls, question: str) -> Optional[str]:
+        filename = next((filename for filename, tablename in cls.assets if tablename == "Users"), None)
+        if filename is None or not Path(filename).exists():
+            return None
 
-    def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        version = ProfileCache.get_dataset_version([filename])
+        if cls.users is None or cls.users[0] != version:
+            with open(filename, encoding="utf-8", newline="") as f:
+                rows = [row for row in csv.DictReader(f) if row.get("user_id")]
+            cls.users = (
+                version,
+                {row["name"].strip(): row["user_id"].strip() for row in rows if row.get("name")},
+                {row["user_id"].strip() for row in rows},
+            )
+        _, names, user_ids = cls.users
+        # 질문에 한 명의 사용자만 언급된 경우에만 그 사용자로 본다.
+        matched = {user_id for name, user_id in names.items() if name in question}
+        matched.update(user_id for user_id in cls.user_id_pattern.findall(question) if user_id in user_ids)
+        return matched.pop() if len(matched) == 1 else None
 
     @classmethod
-    async def load_agent(cls) -> None:
-        ...
\ No newline at end of file
+    def get_graphrag(cls) -> "GraphRAG":
+        # GraphRAG 는 project 초기화와 config 로딩이 무거우므로 처음 검색할 때 만든다.
+        if cls.graphrag is None:
+            from capabilities.graphrag import GraphRAG
+
+            cls.graphrag = GraphRAG(path=Path() / "assets" / "graphrag_travel_profile", force=True, auto_delete=False)
+        return cls.graphrag
+
+    def generate_system_prompt(self, **kwargs) -> str:
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
+
+    def generate_user_prompt(self, **kwargs) -> str:
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
@@ -1,8 +1,4 @@
-from pathlib import Path
-
-from langchain_core.prompts import PromptTemplate
-
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, TaskOperator, prompt_registry
 from agents.schema import AgentGraphStateBase, AgentProfile, AgentPrompt, PromptVariable
 from capabilities.mcp import get_mcp_client
 from common import settings
@@ -15,7 +11,9 @@ class TravelRecommendOperator(TaskOperator):
             self.agent.generate_user_prompt(
                 itinerary_suggestion=state.context.itinerary_suggestion,
                 profile=state.context.profile,
+                searched_data=state.context.searched_data,
             ),
+            query=state.question,
         )
         state.context.recommendations = self.agent.extract_answer(response)
 
@@ -25,6 +23,9 @@ class TravelRecommendAgent(AgentBase):
         name="TravelRecommendAgent",
         description="여행 관련 정보 수집 및 예약 (호텔, 항공권, 액티비티, 레스토랑 등)을 담당하는 에이전트",
         task_operator=TravelRecommendOperator,
+        tool_selection_top_k=4,
+        # google-places MCP 서버 버전에 따라 검색 tool 이름이 다르며, 없는 이름은 무시된다.
+        pinned_tools=["search_places", "search_nearby", "get_place_details"],
         prompts=AgentPrompt(
             system=[
                 PromptVariable(
@@ -49,18 +50,10 @@ class TravelRecommendAgent(AgentBase):
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
 
     async def get_tools(self) -> list[callable]:
         return await get_mcp_client().get_tools(server_name="google-places")
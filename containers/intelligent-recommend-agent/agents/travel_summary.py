@@ -1,15 +1,14 @@
-from pathlib import Path
-
-from langchain_core.prompts import PromptTemplate
-
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, TaskOperator, prompt_registry
 from agents.schema import PlannedAgentGraphState, AgentProfile, AgentPrompt, PromptVariable
+from common import settings
 
 
 class TravelSummaryOperator(TaskOperator):
+    streaming = True
+
     async def exec(self, state: PlannedAgentGraphState) -> None:
         await self.agent.initialize()
-        response = await self.agent.run(
+        state.answer = await self.stream_answer(
             self.agent.generate_user_prompt(
                 itinerary_suggestion=state.context.itinerary_suggestion,
                 profile=state.context.profile,
@@ -17,8 +16,6 @@ class TravelSummaryOperator(TaskOperator):
             ),
         )
 
-        state.answer = self.agent.extract_answer(response)
-
 
 class TravelSummaryAgent(AgentBase):
     profile: AgentProfile = AgentProfile(
@@ -42,18 +39,11 @@ class TravelSummaryAgent(AgentBase):
                 ),
             ],
         ),
+        fallback_deployments=[settings.AZURE_OPENAI_CHAT_MINI_DEPLOYMENT],
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
@@ -1,45 +1,74 @@
+import asyncio
 import json
-from pathlib import Path
+from typing import AsyncIterator, Optional
 from uuid import uuid4
 
-from langchain_core.prompts import PromptTemplate
 from langgraph.graph import END, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
-from agents.base import AgentBase, TaskOperator
-from agents.chatbot import ChatbotAgent
-from agents.travel import TravelAgent
+from agents.base import AgentBase, SessionDispatcher, TaskOperator, agent_manager, prompt_registry, request_deadline_scope
 from agents.schema import AgentGraphStateBase, AgentProfile, AgentPrompt, PromptVariable, TriageAgentContext, TriageAgentOutput
-from common import console
+from capabilities.cache import get_profile_cache
+from capabilities.checkpoint import get_checkpointer
+from capabilities.history import get_sqlite_history_store
+from capabilities.routing import get_pre_router
+from common import console, settings
 
 
 class TriageAgentGraph:
+    sub_agents = ["TriageAgent", "TravelAgent", "ChatbotAgent"]
+    # topology 는 session 과 무관하므로 process 에서 한 번만 compile 하고, session 은 invoke config 로 넘긴다.
+    compiled: Optional[CompiledStateGraph] = None
+    dispatchers: dict[str, SessionDispatcher] = {}
+
     def __init__(self, session_id: str = None) -> None:
         self.session_id: str = uuid4().hex if not session_id else session_id
-        self.sub_agents = [
-            ("TriageAgent", TriageAgent),
-            ("TravelAgent", TravelAgent),
-            ("ChatbotAgent", ChatbotAgent),
-        ]
-        self.graph = self.build()
-
-    def route_conditional_loopback(self, state: AgentGraphStateBase) -> str:
+        self.graph = self.get_graph()
+
+    @staticmethod
+    def route_conditional_loopback(state: AgentGraphStateBase) -> str:
         if state.context.selected_agent_name:
             return state.context.selected_agent_name
         return "finalize"
 
-    def build(self) -> CompiledStateGraph:
+    def speculate(self, question: str) -> bool:
+        # 인사처럼 규칙으로 확실히 챗봇으로 가는 질문은 profile 을 미리 조회하지 않는다.
+        if not settings.SPECULATIVE_PROFILE_ENABLED or get_pre_router().match_rules(question) == "ChatbotAgent":
+            return False
+
+        from agents.travel import TravelAgentGraph
+        from agents.travel_profile import get_profile_speculator
+
+        TravelAgentGraph.get_graph()
+        operator = TravelAgentGraph.dispatchers["TravelProfileAgent"].get_operator(self.session_id)
+        get_profile_speculator().start(self.session_id, question, operator)
+        return True
+
+    async def discard_speculation(self, question: str) -> None:
+        from agents.travel_profile import get_profile_speculator
+
+        # travel graph 가 가져가지 않은 speculation 은 triage 가 다른 곳으로 라우팅한 것이므로 취소한다.
+        await get_profile_speculator().discard(self.session_id, question)
+
+    @classmethod
+    def get_graph(cls) -> CompiledStateGraph:
+        if cls.compiled is None or cls.compiled.checkpointer is not get_checkpointer().saver:
+            cls.compiled = cls.build()
+        return cls.compiled
+
+    @classmethod
+    def build(cls) -> CompiledStateGraph:
         graph = StateGraph(AgentGraphStateBase)
 
-        for name, agent_cls in self.sub_agents:
-            task_operator = agent_cls.profile.task_operator(agent_cls(self.session_id))
-            graph.add_node(name, task_operator.run_node)
+        cls.dispatchers = {name: SessionDispatcher(name) for name in cls.sub_agents}
+        for name, dispatcher in cls.dispatchers.items():
+            graph.add_node(name, dispatcher)
 
         graph.set_entry_point("TriageAgent")
 
         graph.add_conditional_edges(
             "TriageAgent",
-            self.route_conditional_loopback,
+            cls.route_conditional_loopback,
             {
                 "TravelAgent": "TravelAgent",
                 "ChatbotAgent": "ChatbotAgent",
@@ -49,29 +78,91 @@ class TriageAgentGraph:
         graph.add_edge("TravelAgent", END)
         graph.add_edge("ChatbotAgent", END)
 
-        compiled = graph.compile()
+        compiled = graph.compile(checkpointer=get_checkpointer().saver)
         console.log("🛠️ TriageAgent graph compiled successfully.")
         console.log(compiled.get_graph().draw_ascii(), style="dim")
 
         return compiled
 
+    async def reset(self) -> None:
+        """Forgets the conversation of this session but keeps its id, which the web terminal stores in the browser."""
+        from agents.travel import TravelAgentGraph
+
+        for graph_cls in (TriageAgentGraph, TravelAgentGraph):
+            for dispatcher in graph_cls.dispatchers.values():
+                dispatcher.discard(self.session_id)
+        get_profile_cache().delete(f"session:{self.session_id}")
+        if history_store := get_sqlite_history_store():
+            await asyncio.to_thread(history_store.delete_session, self.session_id)
+        if saver := get_checkpointer().saver:
+            for thread_id in (self.session_id, f"{self.session_id}-travel"):
+                await saver.adelete_thread(thread_id)
+
     async def run(self, question: str) -> str:
-        response = await self.graph.ainvoke(
-            AgentGraphStateBase(
-                question=question, context=TriageAgentContext(),
-            ),
-        )
+        checkpointer = get_checkpointer()
+        config = checkpointer.get_config(self.session_id, session_id=self.session_id)
+        speculated = self.speculate(question)
+        try:
+            with request_deadline_scope():
+                response = await self.graph.ainvoke(
+                    await checkpointer.get_input(
+                        self.graph, config, AgentGraphStateBase(question=question, context=TriageAgentContext()),
+                    ),
+                    config,
+                )
+        finally:
+            if speculated:
+                await self.discard_speculation(question)
+        await checkpointer.complete(config)
         return response.get("answer")
 
+    async def run_stream(self, question: str) -> AsyncIterator[str]:
+        checkpointer = get_checkpointer()
+        config = checkpointer.get_config(self.session_id, session_id=self.session_id)
+        streamed, answer = False, None
+        speculated = self.speculate(question)
+        try:
+            with request_deadline_scope():
+                async for mode, chunk in self.graph.astream(
+                    await checkpointer.get_input(
+                        self.graph, config, AgentGraphStateBase(question=question, context=TriageAgentContext()),
+                    ),
+                    config,
+                    stream_mode=["custom", "values"],
+                ):
+                    if mode == "custom":
+                        streamed = True
+                        yield chunk
+                    else:
+                        answer = chunk.get("answer")
+        finally:
+            if speculated:
+                await self.discard_speculation(question)
+        await checkpointer.complete(config)
+        # clarify 처럼 스트리밍 없이 결정된 답변은 한 번에 내보낸다.
+        if not streamed and answer:
+            yield answer
+
 
 class TriageOperator(TaskOperator):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # clarify 로 되물은 뒤의 답변(예: "부산")은 대화 맥락 없이 분류할 수 없으므로 항상 LLM triage 로 보낸다.
+        self.awaiting_clarification: bool = False
+
     async def exec(self, state: AgentGraphStateBase) -> None:
+        use_pre_router = settings.PREROUTER_ENABLED and not self.awaiting_clarification
+        if use_pre_router and (agent_name := await get_pre_router().route(state.question)):
+            console.log(f"⚡ [TriageAgent] Routed to {agent_name} locally, skipping the LLM triage.")
+            state.context.selected_agent_name = agent_name
+            return
+
         await self.agent.initialize(
             response_format=TriageAgentOutput,
             system_prompt_kwargs={
                 "agents": [
-                    {"name": ChatbotAgent.profile.name, "description": ChatbotAgent.profile.description},
-                    {"name": TravelAgent.profile.name, "description": TravelAgent.profile.description},
+                    {"name": agent_cls.profile.name, "description": agent_cls.profile.description}
+                    for agent_cls in map(agent_manager.get_agent_class, ["ChatbotAgent", "TravelAgent"])
                 ]
             }
         )
@@ -86,9 +177,16 @@ class TriageOperator(TaskOperator):
                 state.context.selected_agent_name = answer["agent"]
             elif answer["action"] == "clarify":
                 state.answer = answer["question"]
+            if use_pre_router and settings.PREROUTER_LEARNING_ENABLED:
+                await get_pre_router().learn(state.question, answer["agent"] if answer["action"] == "route" else "clarify")
+            self.awaiting_clarification = answer["action"] == "clarify"
         else:
             console.log(f"⚠️ No agent found in the TriageOperator")
 
+    async def degrade(self, state: AgentGraphStateBase) -> None:
+        # 분류가 시간 안에 끝나지 않으면 가장 가벼운 챗봇이 답변하도록 넘긴다.
+        state.context.selected_agent_name = "ChatbotAgent"
+
 
 class TriageAgent(AgentBase):
     profile: AgentProfile = AgentProfile(
@@ -96,6 +194,11 @@ class TriageAgent(AgentBase):
         description="사용자의 에이전트 요청을 분석하고, 적절한 하위 에이전트 (여행 에이전트 또는 챗봇 에이전트) 로 라우팅하는 에이전트",
         task_operator=TriageOperator,
         interactive=False,
+        enable_response_cache=True,
+        # 라우팅은 짧은 분류 작업이므로 mini 로 처리하고, 실패하거나 느릴 때만 full 모델로 넘긴다.
+        deployment_name=settings.AZURE_OPENAI_CHAT_MINI_DEPLOYMENT,
+        fallback_deployments=[settings.AZURE_OPENAI_CHAT_DEPLOYMENT],
+        hedge_requests=True,
         prompts=AgentPrompt(
             system=[
                 PromptVariable(
@@ -115,15 +218,7 @@ class TriageAgent(AgentBase):
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
\ No newline at end of file
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
\ No newline at end of file
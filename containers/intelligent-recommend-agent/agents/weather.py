@@ -1,8 +1,4 @@
-from pathlib import Path
-
-from langchain_core.prompts import PromptTemplate
-
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, TaskOperator, prompt_registry
 from agents.schema import AgentGraphStateBase, AgentProfile, AgentPrompt, PromptVariable
 from capabilities.tools import get_current_weather, get_forecast
 
@@ -40,18 +36,10 @@ class WeatherAgent(AgentBase):
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
 
     async def get_tools(self) -> list[callable]:
         return [get_current_weather, get_forecast]
@@ -1,17 +1,14 @@
-from pathlib import Path
-
-from langchain_core.prompts import PromptTemplate
-
-from agents.base import AgentBase, TaskOperator
+from agents.base import AgentBase, TaskOperator, prompt_registry
 from agents.schema import AgentGraphStateBase, AgentProfile, AgentPrompt, PromptVariable
 from capabilities.mcp import get_mcp_client
 
 
 class WebSearchOperator(TaskOperator):
     async def exec(self, state: AgentGraphStateBase) -> None:
-        self.agent.initialize()
+        await self.agent.initialize()
         response = await self.agent.run(
             self.agent.generate_user_prompt(question=state.question),
+            query=state.question,
         )
         state.answer = self.agent.extract_answer(response)
 
@@ -21,6 +18,8 @@ class WebSearchAgent(AgentBase):
         name="WebSearchAgent",
         description="웹 검색을 담당하는 에이전트",
         task_operator=WebSearchOperator,
+        tool_selection_top_k=4,
+        pinned_tools=["search_webkr"],
         prompts=AgentPrompt(
             system=[
                 PromptVariable(
@@ -40,18 +39,10 @@ class WebSearchAgent(AgentBase):
     )
 
     def generate_system_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("system").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("system").filename, **kwargs)
 
     def generate_user_prompt(self, **kwargs) -> str:
-        return PromptTemplate.from_file(
-            Path(__file__).parent / "prompts" / self.profile.prompts.get_selected_prompt("user").filename,
-            template_format="jinja2",
-            encoding="utf-8",
-        ).format(**kwargs)
+        return prompt_registry.render(self.profile.prompts.get_selected_prompt("user").filename, **kwargs)
 
     async def get_tools(self) -> list[callable]:
         return await get_mcp_client().get_tools(server_name="naver-web")
@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+from typing import Optional
+from uuid import uuid4
+
+from agents.base import agent_manager, prompt_registry
+from agents.schema import AgentGraphStateBase, Task, Workflow
+from common import console, settings
+
+
+class WorkflowExecutor:
+    """Runs the tasks of a planned workflow as a dependency DAG, concurrently where possible."""
+
+    def __init__(
+        self,
+        session_id: str,
+        max_parallelism: Optional[int] = None,
+        deadline_seconds: Optional[float] = None,
+    ) -> None:
+        self.session_id = session_id
+        self.max_parallelism = max_parallelism or settings.WORKFLOW_MAX_PARALLELISM
+        self.deadline_seconds = deadline_seconds or settings.WORKFLOW_DEADLINE_SECONDS
+
+    @staticmethod
+    def get_dependencies(workflow: Workflow) -> dict[int, set[int]]:
+        dependencies = {}
+        for index, task in enumerate(workflow.tasks):
+            dependencies[index] = set()
+            for dependency in task.use_answers_from:
+                if 0 <= dependency < len(workflow.tasks) and dependency != index:
+                    dependencies[index].add(dependency)
+                else:
+                    console.log(f"⚠️ [Workflow] Task #{index} refers to an invalid step #{dependency}, ignored.")
+        return dependencies
+
+    @staticmethod
+    def get_final_answer(workflow: Workflow) -> Optional[str]:
+        # 다른 task 가 참조하지 않는 task(DAG 의 말단)의 답변이 최종 답변이 된다.
+        referenced = {dependency for task in workflow.tasks for dependency in task.use_answers_from}
+        answers = [
+            task.answer for index, task in enumerate(workflow.tasks)
+            if index not in referenced and task.answer
+        ]
+        return "\n\n".join(answers) if answers else None
+
+    def generate_task_prompt(self, workflow: Workflow, task: Task, dependencies: set[int]) -> str:
+        return prompt_registry.render(
+            "workflow_task_human_prompt.jinja",
+            question=task.question,
+            references=[{
+                "index": index,
+                "title": workflow.tasks[index].title,
+                "answer": workflow.tasks[index].answer,
+            } for index in sorted(dependencies)],
+        )
+
+    async def run_task(
+        self, workflow: Workflow, run_id: str, index: int, dependencies: set[int], semaphore: asyncio.Semaphore,
+    ) -> None:
+        task = workflow.tasks[index]
+        async with semaphore:
+            task.started_at = datetime.datetime.now()
+            try:
+                agent_cls = agent_manager.get_agent_class(task.agent)
+                # 같은 agent 에 여러 task 가 동시에 배정될 수 있으므로 task 마다 history 를 분리하고,
+                # history 가 저장되더라도 이전 workflow 의 같은 번호 task 와 섞이지 않도록 run 마다 id 를 붙인다.
+                operator = agent_cls.profile.task_operator(agent_cls(f"{self.session_id}-task-{run_id}-{index}"))
+                operator.emit_tokens = False
+                state = AgentGraphStateBase(question=self.generate_task_prompt(workflow, task, dependencies))
+                await operator.run_node(state)
+                task.answer = state.answer
+            except Exception as e:
+                task.error = f"{type(e).__name__}: {e}"
+                console.log(f"❌ [Workflow] Task #{index} ({task.agent}) failed: {task.error}")
+            finally:
+                task.finished_at = datetime.datetime.now()
+
+    async def run(self, workflow: Workflow) -> Workflow:
+        dependencies = self.get_dependencies(workflow)
+        run_id = uuid4().hex[:8]
+        semaphore = asyncio.Semaphore(self.max_parallelism)
+        pending, done = set(dependencies), set()
+        running: dict[asyncio.Task, int] = {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+
+        while pending or running:
+            for index in sorted(pending):
+                if not dependencies[index] <= done:
+                    continue
+                pending.discard(index)
+                if failed := [i for i in sorted(dependencies[index]) if workflow.tasks[i].error]:
+                    # 앞 단계가 실패하면 그 답변을 참조하는 task 는 실행하지 않는다.
+                    workflow.tasks[index].error = f"Skipped because step {failed} failed"
+                    done.add(index)
+                    break
+                running[asyncio.create_task(self.run_task(workflow, run_id, index, dependencies[index], semaphore))] = index
+            else:
+                if not running:
+                    for index in pending:
+                        workflow.tasks[index].error = "Skipped because of a circular dependency"
+                    console.log(f"⚠️ [Workflow] Circular dependency among steps {sorted(pending)}.")
+                    break
+                finished, _ = await asyncio.wait(
+                    running, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not finished:
+                    await self.cancel(workflow, running, pending)
+                    break
+                for finished_task in finished:
+                    done.add(running.pop(finished_task))
+        return workflow
+
+    async def cancel(self, workflow: Workflow, running: dict[asyncio.Task, int], pending: set[int]) -> None:
+        console.log(f"⏱️ [Workflow] Deadline ({self.deadline_seconds:.0f}s) exceeded, cancelling {len(running)} running task(s).")
+        for running_task, index in running.items():
+            running_task.cancel()
+            workflow.tasks[index].error = "Cancelled because the workflow deadline was exceeded"
+        await asyncio.gather(*running, return_exceptions=True)
+        for index in pending:
+            workflow.tasks[index].error = "Skipped because the workflow deadline was exceeded"
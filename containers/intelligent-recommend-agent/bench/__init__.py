@@ -0,0 +1,4 @@
+from .runner import run_benchmark
+
+
+__all__ = [run_benchmark]
@@ -0,0 +1,185 @@
+from collections import defaultdict
+import json
+import os
+from pathlib import Path
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+
+from bench.stubs import StubGraphRAG, StubMCPClient, StubWeather, write_travel_assets
+from common import console, settings, summarize
+
+
+DATA_PATH = Path(__file__).parent / "data"
+PROJECT_PATH = Path(__file__).parent.parent
+
+
+class NodeTimings:
+    def __init__(self) -> None:
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.enabled: bool = False
+
+    def __call__(self, agent_name: str, seconds: float) -> None:
+        if self.enabled:
+            self.samples[agent_name].append(seconds)
+
+
+def measure_cold_start(runs: int) -> dict[str, Any]:
+    # 이미 import 된 module 이 없는 새 interpreter 에서 entry point 를 import 하는 시간을 잰다.
+    code = (
+        "import time; start_time = time.perf_counter(); "
+        "import cmds.terminal, cmds.web_terminal; "
+        "print(time.perf_counter() - start_time)"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJECT_PATH), os.environ.get("PYTHONPATH")]))}
+    wall_samples, import_samples = [], []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        wall_samples.append(time.perf_counter() - start_time)
+        import_samples.append(float(result.stdout.strip().splitlines()[-1]))
+
+    wall_seconds = statistics.median(wall_samples)
+    return {
+        "runs": runs,
+        "wall_s": wall_seconds,
+        "import_s": statistics.median(import_samples),
+        "budget_s": settings.STARTUP_BUDGET_SECONDS,
+        "within_budget": wall_seconds <= settings.STARTUP_BUDGET_SECONDS,
+    }
+
+
+def configure(
+    replay_path: Path,
+    llm_latency_seconds: float,
+    token_latency_seconds: float,
+    tool_latency_seconds: float,
+) -> tuple[StubMCPClient, StubGraphRAG]:
+    # 외부 서비스 없이 돌도록 LLM 은 replay backend 로, MCP / GraphRAG / SQL 자산은 stub 으로 바꾼다.
+    settings.LLM_BACKEND = "replay"
+    settings.LLM_REPLAY_PATH = str(replay_path)
+    settings.LLM_REPLAY_LATENCY_SECONDS = llm_latency_seconds
+    settings.LLM_REPLAY_TOKEN_LATENCY_SECONDS = token_latency_seconds
+    settings.HISTORY_BACKEND = "memory"
+    # 학습된 triage 결정이 실행마다 달라지지 않도록 pre-router 는 빈 log 에서 시작한다.
+    settings.PREROUTER_LOG_PATH = str(Path(tempfile.mkdtemp(prefix="bench-prerouter-")) / "triage_decisions.jsonl")
+
+    import capabilities.mcp
+    from agents.travel_prefetch import TravelPrefetchAgent
+    from agents.travel_profile import TravelProfileAgent
+
+    mcp_client = StubMCPClient(latency_seconds=tool_latency_seconds)
+    graphrag = StubGraphRAG(latency_seconds=tool_latency_seconds)
+    capabilities.mcp.mcp_client = mcp_client
+    TravelPrefetchAgent.forecast_tool = StubWeather(latency_seconds=tool_latency_seconds).make_tool()
+    TravelProfileAgent.graphrag = graphrag
+    TravelProfileAgent.assets = write_travel_assets(Path(tempfile.mkdtemp(prefix="bench-assets-")))
+    return mcp_client, graphrag
+
+
+async def run_graph(graph_cls: type, name: str, questions: list[str], iterations: int, warmup: int, timings: NodeTimings) -> dict[str, Any]:
+    build_samples, run_samples = [], []
+    for i in range(warmup + iterations):
+        measured = i >= warmup
+        timings.enabled = measured
+
+        start_time = time.perf_counter()
+        graph = graph_cls(session_id=f"bench-{name}-{i}")
+        if measured:
+            build_samples.append(time.perf_counter() - start_time)
+
+        for question in questions:
+            start_time = time.perf_counter()
+            await graph.run(question)
+            if measured:
+                run_samples.append(time.perf_counter() - start_time)
+
+    timings.enabled = False
+    return {
+        "build": summarize(build_samples),
+        "run": summarize(run_samples),
+        "wall_s": sum(build_samples) + sum(run_samples),
+    }
+
+
+async def run_benchmark(
+    iterations: int = 5,
+    warmup: int = 1,
+    questions_path: Path = DATA_PATH / "questions.json",
+    replay_path: Path = DATA_PATH / "replay.jsonl",
+    llm_latency_seconds: float = 0.0,
+    token_latency_seconds: float = 0.0,
+    tool_latency_seconds: float = 0.0,
+    cold_start_runs: int = 3,
+    speculative_profile: bool = False,
+) -> dict[str, Any]:
+    cold_start = measure_cold_start(cold_start_runs) if cold_start_runs else None
+    mcp_client, graphrag = configure(replay_path, llm_latency_seconds, token_latency_seconds, tool_latency_seconds)
+    settings.SPECULATIVE_PROFILE_ENABLED = speculative_profile
+
+    from agents import prompt_registry
+    from agents.base import TaskOperator, tool_call_stats
+    from agents.travel import TravelAgentGraph
+    from agents.travel_profile import get_profile_speculator
+    from agents.triage import TriageAgentGraph
+    from capabilities.routing import get_pre_router, get_tool_selector
+
+    prompt_registry.load()
+    questions = json.loads(Path(questions_path).read_text(encoding="utf-8"))
+    timings = NodeTimings()
+    TaskOperator.timing_hooks.append(timings)
+
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    quiet, console.quiet = console.quiet, True
+    try:
+        graphs = {
+            "triage": await run_graph(TriageAgentGraph, "triage", questions["triage"], iterations, warmup, timings),
+            "travel": await run_graph(TravelAgentGraph, "travel", questions["travel"], iterations, warmup, timings),
+        }
+    finally:
+        console.quiet = quiet
+        TaskOperator.timing_hooks.remove(timings)
+    wall_seconds = time.perf_counter() - start_time
+
+    snapshot = tracemalloc.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    top_allocations = snapshot.statistics("lineno")[:5]
+
+    return {
+        "config": {
+            "iterations": iterations,
+            "warmup": warmup,
+            "llm_latency_s": llm_latency_seconds,
+            "token_latency_s": token_latency_seconds,
+            "tool_latency_s": tool_latency_seconds,
+            "speculative_profile": speculative_profile,
+        },
+        "wall_s": wall_seconds,
+        "cold_start": cold_start,
+        "graphs": graphs,
+        "nodes": {name: summarize(samples) for name, samples in sorted(timings.samples.items())},
+        "memory": {
+            "traced_current_mb": current / 1024 / 1024,
+            "traced_peak_mb": peak / 1024 / 1024,
+            "allocated_blocks": sum(stat.count for stat in snapshot.statistics("filename")),
+            # linux 에서 ru_maxrss 단위는 KB 이다.
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "top_allocations": [
+                {"location": str(stat.traceback[0]), "size_kb": stat.size / 1024, "count": stat.count}
+                for stat in top_allocations
+            ],
+        },
+        "timeouts": dict(TaskOperator.timeouts),
+        "tool_calls": tool_call_stats.get_stats(),
+        "tool_selection": get_tool_selector().get_stats(),
+        "stubs": {"mcp_calls": mcp_client.calls, "graphrag_calls": graphrag.calls},
+        "pre_router": get_pre_router().get_stats() if settings.PREROUTER_ENABLED else None,
+        "speculation": get_profile_speculator().get_stats() if speculative_profile else None,
+    }
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool
+
+
+class StubMCPClient:
+    """Stands in for MultiServerMCPClient with canned tool results and a fixed latency."""
+
+    tool_names = {
+        "naver-web": ["search_webkr"],
+        "google-places": ["search_places"],
+        "openweathermap": ["get_weather"],
+    }
+
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.calls: int = 0
+
+    def make_tool(self, name: str) -> StructuredTool:
+        async def call(query: str) -> str:
+            self.calls += 1
+            await asyncio.sleep(self.latency_seconds)
+            return json.dumps({"tool": name, "query": query, "items": [f"{query} 결과 {i}" for i in range(3)]}, ensure_ascii=False)
+
+        return StructuredTool.from_function(coroutine=call, name=name, description=f"Stub of the '{name}' MCP tool.")
+
+    async def get_tools(self, server_name: str | None = None) -> list[StructuredTool]:
+        servers = [server_name] if server_name else list(self.tool_names)
+        return [self.make_tool(name) for server in servers for name in self.tool_names[server]]
+
+
+class StubGraphRAG:
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.calls: int = 0
+
+    async def retrieve_on_global(self, query: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        return "사용자는 해변 근처의 4성급 호텔을 선호하며, 가족 단위 여행이 많고 평균 2박을 머뭅니다."
+
+
+class StubWeather:
+    """Stands in for the OpenWeatherMap forecast tool with a fixed two-day forecast."""
+
+    def __init__(self, latency_seconds: float = 0.0) -> None:
+        self.latency_seconds = latency_seconds
+        self.calls: int = 0
+
+    def make_tool(self) -> StructuredTool:
+        async def get_forecast(city: str, units: str = "metric") -> dict:
+            self.calls += 1
+            await asyncio.sleep(self.latency_seconds)
+            return {
+                "city": {"name": city},
+                "list": [
+                    {"dt_txt": f"2026-01-0{day} {hour:02d}:00:00", "main": {"temp_min": 3.0 + hour / 6, "temp_max": 8.0 + hour / 6}, "weather": [{"description": "맑음"}]}
+                    for day in (1, 2) for hour in (9, 15, 21)
+                ],
+            }
+
+        return StructuredTool.from_function(coroutine=get_forecast, name="get_forecast", description="Stub of the 'get_forecast' tool.")
+
+
+def write_travel_assets(path: Path) -> list[tuple[str, str]]:
+    # TravelProfileAgent 가 읽는 CSV 와 같은 모양의 작은 데이터셋을 만든다.
+    path.mkdir(parents=True, exist_ok=True)
+    tables = {
+        "Hotels": "hotel_id,name,city,stars\n1,Ocean View,부산,4\n2,Jeju Stay,제주,3\n3,Seoul Central,서울,5\n",
+        "User-Hotel-Activities": "user_id,hotel_id,rating,review\n1,1,5,좋아요\n1,2,4,깨끗해요\n2,3,3,보통\n",
+        "Users": "user_id,name,age\n1,김여행,34\n2,이휴가,41\n",
+    }
+    assets = []
+    for tablename, content in tables.items():
+        filename = path / f"{tablename.lower()}.csv"
+        filename.write_text(content, encoding="utf-8")
+        assets.append((str(filename), tablename))
+    return assets
@@ -0,0 +1,256 @@
+from collections import OrderedDict
+import hashlib
+import json
+import math
+from pathlib import Path
+import time
+from typing import Any, Optional
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.embeddings import Embeddings
+
+from common import settings
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire after a fixed time-to-live."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self.evictions: int = 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] < time.monotonic():
+            del self.entries[key]
+            self.evictions += 1
+            return default
+        self.entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: Any, value: Any) -> None:
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        self.entries.pop(key, None)
+
+    def values(self) -> list[Any]:
+        now = time.monotonic()
+        return [value for expires_at, value in self.entries.values() if expires_at >= now]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _cosine_similarity(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache(BaseCache):
+    """LLM response cache used by agents that opt in through `AgentProfile.enable_response_cache`.
+
+    Responses are looked up by an exact hash of the rendered prompt and the model parameters
+    (deployment, response format, tools). With embeddings, a miss falls back to comparing the
+    last user message against cached ones that share the same system prompt and history.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        embeddings: Embeddings | None = None,
+        similarity_threshold: float = 0.95,
+    ) -> None:
+        self.entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.embeddings = embeddings
+        self.similarity_threshold = similarity_threshold
+        self.lookups: int = 0
+        self.exact_hits: int = 0
+        self.semantic_hits: int = 0
+
+    @staticmethod
+    def split_prompt(prompt: str) -> tuple[str, str]:
+        # chat model 의 prompt 는 직렬화된 메시지 리스트이다. 마지막 메시지를 질의로, 나머지를 문맥으로 쓴다.
+        try:
+            messages = json.loads(prompt)
+            return json.dumps(messages[:-1], sort_keys=True), str(messages[-1]["kwargs"]["content"])
+        except (ValueError, LookupError, TypeError):
+            return "", prompt
+
+    @staticmethod
+    def get_key(*parts: str) -> str:
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        self.lookups += 1
+        if entry := self.entries.get(self.get_key(llm_string, prompt)):
+            self.exact_hits += 1
+            return entry["return_val"]
+        if self.embeddings:
+            context, query = self.split_prompt(prompt)
+            return self._lookup_similar(llm_string, context, self.embeddings.embed_query(query))
+        return None
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        self.lookups += 1
+        if entry := self.entries.get(self.get_key(llm_string, prompt)):
+            self.exact_hits += 1
+            return entry["return_val"]
+        if self.embeddings:
+            context, query = self.split_prompt(prompt)
+            return self._lookup_similar(llm_string, context, await self.embeddings.aembed_query(query))
+        return None
+
+    def _lookup_similar(self, llm_string: str, context: str, embedding: list[float]) -> Optional[RETURN_VAL_TYPE]:
+        scope = self.get_key(llm_string, context)
+        best, best_score = None, self.similarity_threshold
+        for entry in self.entries.values():
+            if entry["scope"] != scope:
+                continue
+            score = _cosine_similarity(embedding, entry["embedding"])
+            if score >= best_score:
+                best, best_score = entry, score
+        if best:
+            self.semantic_hits += 1
+            return best["return_val"]
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        entry = {"return_val": return_val, "scope": None, "embedding": None}
+        if self.embeddings:
+            context, query = self.split_prompt(prompt)
+            entry.update(scope=self.get_key(llm_string, context), embedding=self.embeddings.embed_query(query))
+        self.entries.set(self.get_key(llm_string, prompt), entry)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        entry = {"return_val": return_val, "scope": None, "embedding": None}
+        if self.embeddings:
+            context, query = self.split_prompt(prompt)
+            entry.update(scope=self.get_key(llm_string, context), embedding=await self.embeddings.aembed_query(query))
+        self.entries.set(self.get_key(llm_string, prompt), entry)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.entries.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "entries": len(self.entries),
+            "lookups": self.lookups,
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.lookups - hits,
+            "hit_rate": hits / self.lookups if self.lookups else 0.0,
+            "evictions": self.entries.evictions,
+        }
+
+
+response_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    global response_cache
+    if response_cache is None:
+        embeddings = None
+        if settings.RESPONSE_CACHE_SEMANTIC and settings.LLM_BACKEND == "replay":
+            from capabilities.routing import HashedTrigramEmbeddings
+
+            embeddings = HashedTrigramEmbeddings()
+        elif settings.RESPONSE_CACHE_SEMANTIC:
+            from langchain_openai import AzureOpenAIEmbeddings
+
+            embeddings = AzureOpenAIEmbeddings(
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                openai_api_version=settings.AZURE_OPENAI_API_VERSION,
+                azure_deployment=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            )
+        response_cache = ResponseCache(
+            max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+            embeddings=embeddings,
+            similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+        )
+    return response_cache
+
+
+class ProfileCache:
+    """Caches computed user profiles per user, valid only for the dataset version they were built from.
+
+    The dataset version is derived from the size and mtime of the source files, so editing
+    any of them (e.g. `user_hotel_activity.csv`) drops every cached profile.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 1800) -> None:
+        self.entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.version: str | None = None
+        self.hits: int = 0
+        self.misses: int = 0
+        self.invalidations: int = 0
+
+    @staticmethod
+    def get_dataset_version(paths: list[str | Path]) -> str:
+        stamps = []
+        for path in map(Path, paths):
+            stat = path.stat() if path.exists() else None
+            stamps.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}" if stat else f"{path}:missing")
+        return hashlib.sha256("\x00".join(stamps).encode("utf-8")).hexdigest()
+
+    def refresh(self, version: str) -> None:
+        if self.version != version:
+            if self.version is not None:
+                self.invalidations += 1
+                self.entries.clear()
+            self.version = version
+
+    def get(self, user_key: str, version: str) -> Optional[str]:
+        self.refresh(version)
+        if (profile := self.entries.get(user_key)) is not None:
+            self.hits += 1
+            return profile
+        self.misses += 1
+        return None
+
+    def set(self, user_key: str, version: str, profile: str) -> None:
+        self.refresh(version)
+        self.entries.set(user_key, profile)
+
+    def delete(self, user_key: str) -> None:
+        self.entries.delete(user_key)
+
+    def get_stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.entries.evictions,
+        }
+
+
+profile_cache: ProfileCache | None = None
+
+
+def get_profile_cache() -> ProfileCache:
+    global profile_cache
+    if profile_cache is None:
+        profile_cache = ProfileCache(
+            max_entries=settings.PROFILE_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PROFILE_CACHE_TTL_SECONDS,
+        )
+    return profile_cache
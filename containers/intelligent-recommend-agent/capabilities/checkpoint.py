@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.state import CompiledStateGraph
+from pydantic import BaseModel
+
+from common import console, settings
+
+
+def mark_fields_set(model: BaseModel) -> BaseModel:
+    # langgraph 는 입력 model 에서 설정된 필드만 state 에 쓰므로, 이전 실행의 값이 남지 않도록 모든 필드를 설정된 것으로 만든다.
+    values = {}
+    for name in type(model).model_fields:
+        value = getattr(model, name)
+        values[name] = mark_fields_set(value) if isinstance(value, BaseModel) else value
+    return type(model).model_construct(**values)
+
+
+class GraphCheckpointer:
+    """Persists graph state per thread so that a failed run resumes from the last completed node."""
+
+    def __init__(self, saver: Optional[BaseCheckpointSaver] = None) -> None:
+        self.saver = saver
+        self.started: int = 0
+        self.resumed: int = 0
+        self.completed: int = 0
+
+    @staticmethod
+    def get_config(thread_id: str, **configurable: Any) -> RunnableConfig:
+        return {"configurable": {"thread_id": thread_id, **configurable}}
+
+    async def get_input(self, graph: CompiledStateGraph, config: RunnableConfig, state: BaseModel) -> Optional[BaseModel]:
+        """Returns None to resume an unfinished run of the same question, otherwise a fresh input state."""
+        self.started += 1
+        if self.saver is None:
+            return state
+
+        snapshot = await graph.aget_state(config)
+        if snapshot.next and snapshot.values.get("question") == state.question:
+            self.resumed += 1
+            console.log(
+                f"♻️ Resuming '{config['configurable']['thread_id']}' from {', '.join(snapshot.next)}"
+            )
+            return None
+        return mark_fields_set(state)
+
+    async def complete(self, config: RunnableConfig) -> None:
+        # 끝까지 실행된 thread 는 다시 이어서 실행할 일이 없으므로 checkpoint 를 지워 DB 가 계속 커지지 않게 한다.
+        self.completed += 1
+        if self.saver is not None:
+            await self.saver.adelete_thread(config["configurable"]["thread_id"])
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": type(self.saver).__name__ if self.saver else "disabled",
+            "started": self.started,
+            "resumed": self.resumed,
+            "completed": self.completed,
+        }
+
+
+checkpointer = GraphCheckpointer()
+
+
+async def init_module() -> None:
+    if settings.CHECKPOINT_BACKEND != "sqlite":
+        return
+
+    import aiosqlite
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    path = Path(settings.CHECKPOINT_SQLITE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpointer.saver = AsyncSqliteSaver(aiosqlite.connect(path))
+    await checkpointer.saver.setup()
+    console.print(f"✅ SQLite graph checkpointer is ready at {settings.CHECKPOINT_SQLITE_PATH}")
+
+
+async def close_module() -> None:
+    # aiosqlite 의 worker thread 는 daemon 이 아니므로 명시적으로 닫아야 프로세스가 종료된다.
+    if checkpointer.saver is not None and hasattr(checkpointer.saver, "conn"):
+        await checkpointer.saver.conn.close()
+        checkpointer.saver = None
+
+
+def get_checkpointer() -> GraphCheckpointer:
+    return checkpointer
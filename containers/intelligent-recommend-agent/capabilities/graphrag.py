@@ -90,9 +90,9 @@ class GraphRAG:
                 "model": "${AZURE_OPENAI_CHAT_DEPLOYMENT}",
                 "model_provider": "azure",
                 "model_supports_json": True,
-                "requests_per_minute": None,
+                "requests_per_minute": settings.AZURE_OPENAI_REQUESTS_PER_MINUTE,
                 "retry_strategy": "exponential_backoff",
-                "tokens_per_minute": None,
+                "tokens_per_minute": settings.AZURE_OPENAI_TOKENS_PER_MINUTE,
                 "type": "chat",
             },
             "default_embedding_model": {
@@ -106,9 +106,9 @@ class GraphRAG:
                 "max_retries": 10,
                 "model": "${AZURE_OPENAI_EMBEDDING_DEPLOYMENT}",
                 "model_provider": "azure",
-                "requests_per_minute": None,
+                "requests_per_minute": settings.AZURE_OPENAI_REQUESTS_PER_MINUTE,
                 "retry_strategy": "exponential_backoff",
-                "tokens_per_minute": None,
+                "tokens_per_minute": settings.AZURE_OPENAI_TOKENS_PER_MINUTE,
                 "type": "embedding",
             },
         },
@@ -0,0 +1,384 @@
+import asyncio
+import atexit
+import contextvars
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, message_to_dict, messages_from_dict
+from langchain_core.messages.utils import count_tokens_approximately
+
+from common import console, settings
+
+
+HistorySummarizer = Callable[[list[BaseMessage], Optional[str]], Awaitable[str]]
+
+
+def is_pinned(message: BaseMessage) -> bool:
+    return isinstance(message, SystemMessage) or bool(message.additional_kwargs.get("pinned"))
+
+
+def pin(message: BaseMessage) -> BaseMessage:
+    message.additional_kwargs["pinned"] = True
+    return message
+
+
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    """Chat history that keeps only the most recent turns within a token budget.
+
+    Pinned messages (system messages or messages marked with `pin`) are never evicted.
+    Evicted turns are folded into a rolling summary when a summarizer is given; the summary
+    is written in the background, off the response path.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        max_messages: int | None = None,
+        summarizer: HistorySummarizer | None = None,
+    ) -> None:
+        self.max_tokens = max_tokens if max_tokens is not None else settings.HISTORY_MAX_TOKENS
+        self.max_messages = max_messages if max_messages is not None else settings.HISTORY_MAX_MESSAGES
+        self.summarizer = summarizer
+        self.stored: list[BaseMessage] = []
+        self.summary: str | None = None
+        self.summary_task: asyncio.Task | None = None
+        self.evicted_messages: int = 0
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        if self.summary:
+            return [SystemMessage(content=f"이전 대화 요약:\n{self.summary}"), *self.stored]
+        return list(self.stored)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.stored.extend(messages)
+        self.evict()
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.stored.extend(messages)
+        if (evicted := self.evict()) and self.summarizer:
+            # 답변 run 의 callback 을 물려받으면 요약 LLM 의 token 이 답변 스트림에 섞이므로 빈 context 의 background task 로 요약한다.
+            self.summary_task = asyncio.create_task(
+                self.summarize(evicted, self.summary_task), context=contextvars.Context(),
+            )
+
+    async def summarize(self, evicted: list[BaseMessage], previous: asyncio.Task | None) -> None:
+        # 앞선 요약이 끝나야 그 결과에 이어서 요약할 수 있다.
+        if previous:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            self.summary = await self.summarizer(evicted, self.summary)
+        except Exception as e:
+            console.log(f"⚠️ Failed to summarize evicted chat history: {type(e).__name__}: {e}")
+            return
+        await self.save_summary()
+
+    async def save_summary(self) -> None:
+        pass
+
+    async def wait_for_summary(self) -> None:
+        if self.summary_task:
+            await asyncio.gather(self.summary_task, return_exceptions=True)
+
+    def clear(self) -> None:
+        if self.summary_task:
+            self.summary_task.cancel()
+        self.stored = []
+        self.summary = None
+
+    def is_over_budget(self) -> bool:
+        unpinned = [m for m in self.stored if not is_pinned(m)]
+        return len(unpinned) > self.max_messages or count_tokens_approximately(unpinned) > self.max_tokens
+
+    def evict(self) -> list[BaseMessage]:
+        evicted = []
+        while self.is_over_budget() or (evicted and self._starts_with_orphan()):
+            index = next((i for i, m in enumerate(self.stored) if not is_pinned(m)), None)
+            if index is None:
+                break
+            evicted.append(self.stored.pop(index))
+        self.evicted_messages += len(evicted)
+        return evicted
+
+    def _starts_with_orphan(self) -> bool:
+        # 윈도우가 AI 응답으로 시작하지 않도록 human 메시지 경계까지 함께 제거한다.
+        first = next((m for m in self.stored if not is_pinned(m)), None)
+        return first is not None and not isinstance(first, HumanMessage)
+
+
+class SQLiteHistoryStore:
+    """Durable chat history for every agent and session, kept in a single SQLite file (WAL mode).
+
+    WAL relies on shared memory between the processes of one host, so the file must be on a
+    local disk used by a single replica; it does not work on network shares such as Azure Files.
+    Writes are buffered and flushed in batches. A background task flushes on an interval,
+    trims each session to its most recent messages and evicts sessions idle longer than the TTL.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        batch_size: int = 20,
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_messages: int = 50,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.pending: list[tuple] = []
+        self.pending_sessions: dict[tuple[str, str], tuple] = {}
+        self.lock = threading.Lock()
+        self.flushes: int = 0
+        self.compactions: int = 0
+        self.evicted_sessions: int = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                message TEXT NOT NULL,
+                pinned INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_messages_session ON messages (session_id, namespace, id);
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                summary TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (session_id, namespace)
+            );
+            """
+        )
+        self.connection.commit()
+
+    def load(self, session_id: str, namespace: str) -> tuple[list[BaseMessage], str | None]:
+        self.flush()
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT message FROM messages WHERE session_id = ? AND namespace = ? ORDER BY id",
+                (session_id, namespace),
+            ).fetchall()
+            session = self.connection.execute(
+                "SELECT summary FROM sessions WHERE session_id = ? AND namespace = ?",
+                (session_id, namespace),
+            ).fetchone()
+        messages = messages_from_dict([json.loads(row[0]) for row in rows])
+        return messages, session[0] if session else None
+
+    def append(
+        self,
+        session_id: str,
+        namespace: str,
+        messages: Sequence[BaseMessage],
+        summary: str | None = None,
+    ) -> None:
+        now = time.time()
+        with self.lock:
+            self.pending.extend(
+                (session_id, namespace, json.dumps(message_to_dict(m), ensure_ascii=False), int(is_pinned(m)), now)
+                for m in messages
+            )
+            self.pending_sessions[(session_id, namespace)] = (session_id, namespace, summary, now)
+            should_flush = len(self.pending) >= self.batch_size
+        if should_flush:
+            self.flush()
+
+    def delete(self, session_id: str, namespace: str) -> None:
+        self.flush()
+        with self.lock:
+            self.connection.execute(
+                "DELETE FROM messages WHERE session_id = ? AND namespace = ?", (session_id, namespace),
+            )
+            self.connection.execute(
+                "DELETE FROM sessions WHERE session_id = ? AND namespace = ?", (session_id, namespace),
+            )
+            self.connection.commit()
+
+    def delete_session(self, session_id: str) -> None:
+        # workflow task 처럼 session id 에서 파생된 session(`{session_id}-...`)도 함께 지운다.
+        prefix = f"{session_id}-"
+        self.flush()
+        with self.lock, self.connection:
+            for table in ("messages", "sessions"):
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE session_id = ? OR substr(session_id, 1, ?) = ?",
+                    (session_id, len(prefix), prefix),
+                )
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.pending_sessions:
+                return
+            pending, self.pending = self.pending, []
+            pending_sessions, self.pending_sessions = self.pending_sessions, {}
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO messages (session_id, namespace, message, pinned, created_at) VALUES (?, ?, ?, ?, ?)",
+                    pending,
+                )
+                self.connection.executemany(
+                    "INSERT INTO sessions (session_id, namespace, summary, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (session_id, namespace) DO UPDATE SET "
+                    "summary = COALESCE(excluded.summary, sessions.summary), updated_at = excluded.updated_at",
+                    pending_sessions.values(),
+                )
+            self.flushes += 1
+
+    def compact(self) -> None:
+        self.flush()
+        expired_at = time.time() - self.ttl_seconds
+        with self.lock, self.connection:
+            expired = self.connection.execute(
+                "SELECT session_id, namespace FROM sessions WHERE updated_at < ?", (expired_at,),
+            ).fetchall()
+            self.connection.executemany(
+                "DELETE FROM messages WHERE session_id = ? AND namespace = ?", expired,
+            )
+            self.connection.execute("DELETE FROM sessions WHERE updated_at < ?", (expired_at,))
+            # 고정(pinned)되지 않은 메시지는 세션별로 최근 max_messages 개만 남긴다.
+            self.connection.execute(
+                """
+                DELETE FROM messages WHERE pinned = 0 AND id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (
+                            PARTITION BY session_id, namespace ORDER BY id DESC
+                        ) AS rank
+                        FROM messages WHERE pinned = 0
+                    ) WHERE rank > ?
+                )
+                """,
+                (self.max_messages,),
+            )
+            self.evicted_sessions += len(expired)
+            self.compactions += 1
+        with self.lock:
+            self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    async def run_background(self, flush_interval: float, compaction_interval: float) -> None:
+        last_compaction = time.monotonic()
+        while True:
+            await asyncio.sleep(flush_interval)
+            try:
+                if time.monotonic() - last_compaction >= compaction_interval:
+                    await asyncio.to_thread(self.compact)
+                    last_compaction = time.monotonic()
+                else:
+                    await asyncio.to_thread(self.flush)
+            except sqlite3.Error as e:
+                console.log(f"⚠️ Failed to persist chat history: {e}")
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            sessions = self.connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+            messages = self.connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+            pending = len(self.pending)
+        return {
+            "sessions": sessions,
+            "messages": messages,
+            "pending_writes": pending,
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+            "evicted_sessions": self.evicted_sessions,
+        }
+
+
+class SQLiteChatMessageHistory(BoundedChatMessageHistory):
+    """Bounded history for one (session, agent) pair, persisted through SQLiteHistoryStore."""
+
+    def __init__(self, store: SQLiteHistoryStore, session_id: str, namespace: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.store = store
+        self.session_id = session_id
+        self.namespace = namespace
+        # agent 는 event loop 위에서 만들어지므로 SQLite 조회는 처음 읽거나 쓸 때로 미루고, async 경로에서는 thread 에서 한다.
+        self.loaded: bool = False
+
+    def load(self) -> None:
+        if not self.loaded:
+            self.stored, self.summary = self.store.load(self.session_id, self.namespace)
+            self.loaded = True
+            self.evict()
+
+    @property
+    def messages(self) -> list[BaseMessage]:
+        self.load()
+        return super().messages
+
+    async def aget_messages(self) -> list[BaseMessage]:
+        await asyncio.to_thread(self.load)
+        return self.messages
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        self.load()
+        super().add_messages(messages)
+        self.store.append(self.session_id, self.namespace, messages, self.summary)
+
+    async def aadd_messages(self, messages: Sequence[BaseMessage]) -> None:
+        await asyncio.to_thread(self.load)
+        await super().aadd_messages(messages)
+        # batch 가 차면 append 가 commit 까지 하므로 event loop 밖에서 실행한다.
+        await asyncio.to_thread(self.store.append, self.session_id, self.namespace, messages, self.summary)
+
+    async def save_summary(self) -> None:
+        await asyncio.to_thread(self.store.append, self.session_id, self.namespace, [], self.summary)
+
+    def clear(self) -> None:
+        super().clear()
+        self.loaded = True
+        self.store.delete(self.session_id, self.namespace)
+
+
+sqlite_history_store: SQLiteHistoryStore | None = None
+_background_task: asyncio.Task | None = None
+
+
+async def init_module() -> None:
+    if settings.HISTORY_BACKEND != "sqlite":
+        return
+
+    global sqlite_history_store, _background_task
+    sqlite_history_store = SQLiteHistoryStore(
+        path=Path(settings.HISTORY_SQLITE_PATH),
+        batch_size=settings.HISTORY_FLUSH_BATCH_SIZE,
+        ttl_seconds=settings.HISTORY_SESSION_TTL_SECONDS,
+        max_messages=settings.HISTORY_MAX_MESSAGES,
+    )
+    _background_task = asyncio.create_task(
+        sqlite_history_store.run_background(
+            flush_interval=settings.HISTORY_FLUSH_INTERVAL_SECONDS,
+            compaction_interval=settings.HISTORY_COMPACTION_INTERVAL_SECONDS,
+        )
+    )
+    atexit.register(sqlite_history_store.close)
+    console.print(f"✅ SQLite chat history store is ready at {settings.HISTORY_SQLITE_PATH}")
+
+
+def get_sqlite_history_store() -> SQLiteHistoryStore | None:
+    return sqlite_history_store
+
+
+def create_history_store(
+    session_id: str,
+    namespace: str,
+    summarizer: HistorySummarizer | None = None,
+) -> BaseChatMessageHistory:
+    if sqlite_history_store:
+        return SQLiteChatMessageHistory(sqlite_history_store, session_id, namespace, summarizer=summarizer)
+    return BoundedChatMessageHistory(summarizer=summarizer)
@@ -0,0 +1,189 @@
+import asyncio
+import re
+import time
+from typing import Any, AsyncIterator
+
+import httpx
+
+from common import settings
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.available = per_minute
+        self.updated_at = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def get_delay(self, amount: float) -> float:
+        self.refill()
+        # capacity 보다 큰 요청은 가득 찼을 때 보내도록 해서 영원히 기다리지 않게 한다.
+        amount = min(amount, self.capacity)
+        return 0.0 if self.available >= amount else (amount - self.available) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+
+class DeploymentScheduler:
+    """Token-bucket (RPM/TPM) and AIMD concurrency control for one Azure OpenAI deployment."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_concurrency: int) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit: float = max_concurrency
+        self.in_flight: int = 0
+        self.paused_until: float = 0.0
+        self.condition: asyncio.Condition | None = None
+        self.total_requests: int = 0
+        self.throttled_requests: int = 0
+        self.total_wait_seconds: float = 0.0
+        self.max_wait_seconds: float = 0.0
+
+    async def acquire(self, tokens: int) -> float:
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+
+        start_time = time.monotonic()
+        async with self.condition:
+            while True:
+                delay = max(
+                    self.paused_until - time.monotonic(),
+                    self.requests.get_delay(1),
+                    self.tokens.get_delay(tokens),
+                    0.0,
+                )
+                if delay == 0.0 and self.in_flight < int(self.concurrency_limit):
+                    break
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout=delay or None)
+                except asyncio.TimeoutError:
+                    pass
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.in_flight += 1
+
+        wait_seconds = time.monotonic() - start_time
+        self.total_requests += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        return wait_seconds
+
+    async def release(self, status_code: int, retry_after: float | None = None) -> None:
+        async with self.condition:
+            self.in_flight -= 1
+            if status_code == 429:
+                # multiplicative decrease: 429 를 받으면 동시 요청 수를 절반으로 줄이고 Retry-After 동안 멈춘다.
+                self.throttled_requests += 1
+                self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                self.paused_until = max(self.paused_until, time.monotonic() + (retry_after or 1.0))
+            elif status_code < 500:
+                # additive increase: 성공할 때마다 조금씩 한도를 되돌린다.
+                self.concurrency_limit = min(
+                    float(self.max_concurrency), self.concurrency_limit + 1.0 / self.concurrency_limit,
+                )
+            self.condition.notify_all()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "concurrency_limit": int(self.concurrency_limit),
+            "in_flight": self.in_flight,
+            "requests": self.total_requests,
+            "throttled": self.throttled_requests,
+            "avg_wait_ms": self.total_wait_seconds * 1000 / self.total_requests if self.total_requests else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
+
+
+class RateScheduler:
+    def __init__(self) -> None:
+        self.deployments: dict[str, DeploymentScheduler] = {}
+
+    def get_deployment(self, deployment_name: str) -> DeploymentScheduler:
+        if deployment_name not in self.deployments:
+            limits = settings.AZURE_OPENAI_DEPLOYMENT_LIMITS.get(deployment_name, {})
+            self.deployments[deployment_name] = DeploymentScheduler(
+                requests_per_minute=limits.get("rpm", settings.AZURE_OPENAI_REQUESTS_PER_MINUTE),
+                tokens_per_minute=limits.get("tpm", settings.AZURE_OPENAI_TOKENS_PER_MINUTE),
+                max_concurrency=limits.get("concurrency", settings.AZURE_OPENAI_MAX_CONCURRENCY),
+            )
+        return self.deployments[deployment_name]
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return {name: deployment.get_stats() for name, deployment in self.deployments.items()}
+
+
+rate_scheduler = RateScheduler()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release) -> None:
+        self.stream = stream
+        self.release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            await self.release()
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """httpx transport that schedules Azure OpenAI deployment calls through the RateScheduler."""
+
+    deployment_pattern = re.compile(r"/openai/deployments/([^/]+)/")
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, scheduler: RateScheduler = rate_scheduler) -> None:
+        self.transport = transport
+        self.scheduler = scheduler
+
+    @staticmethod
+    def estimate_tokens(request: httpx.Request) -> int:
+        # 정확한 토크나이저 대신 요청 본문 크기(약 4 bytes/token)와 응답 예상 길이로 추정한다.
+        return len(request.content) // 4 + settings.AZURE_OPENAI_ESTIMATED_COMPLETION_TOKENS
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        match = self.deployment_pattern.search(request.url.path)
+        if not match:
+            return await self.transport.handle_async_request(request)
+
+        deployment = self.scheduler.get_deployment(match.group(1))
+        await deployment.acquire(self.estimate_tokens(request))
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            await deployment.release(status_code=599)
+            raise
+
+        retry_after = response.headers.get("retry-after")
+        released = False
+
+        async def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                await deployment.release(
+                    response.status_code,
+                    float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None,
+                )
+
+        # 스트리밍 응답은 본문을 다 읽을 때까지 in-flight 로 센다.
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,231 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+import re
+from typing import Any, AsyncIterator, Optional, Sequence
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, BaseCallbackHandler, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult, LLMResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from common import console, settings
+
+
+def get_messages_key(messages: Sequence[BaseMessage]) -> str:
+    # 같은 대화라면 record 와 replay 에서 같은 key 가 나오도록 type, content, tool call 만 사용한다.
+    payload = [
+        {
+            "type": message.type,
+            "content": message.content,
+            "tool_calls": [
+                {"name": call["name"], "args": call["args"]} for call in getattr(message, "tool_calls", None) or []
+            ],
+        }
+        for message in messages
+    ]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ReplayStore:
+    """Recorded LLM responses, stored as one JSON object per line.
+
+    Each entry has a `response` (`content` and optional `tool_calls`) and is selected either by
+    `key` (hash of the exact conversation, written by record mode) or by optional criteria:
+    `match` (regex over the last human message), `response_format` (class name), `tool`
+    (name of a bound tool) and `after_tool` (whether the last message is a tool result).
+    Entries without any criteria act as a catch-all.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.keyed: dict[str, dict] = {}
+        self.rules: list[dict] = []
+        self.hits: int = 0
+        self.misses: int = 0
+        self.recorded: int = 0
+        self.load()
+
+    def load(self) -> None:
+        self.keyed.clear()
+        self.rules.clear()
+        if not self.path.exists():
+            return
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                self.add(json.loads(line))
+
+    def add(self, entry: dict) -> None:
+        if "key" in entry:
+            self.keyed[entry["key"]] = entry
+        else:
+            self.rules.append(entry)
+
+    def find(
+        self,
+        messages: Sequence[BaseMessage],
+        response_format: Any = None,
+        tools: Sequence[dict] = (),
+    ) -> dict | None:
+        if entry := self.keyed.get(get_messages_key(messages)):
+            self.hits += 1
+            return entry["response"]
+
+        question = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        format_name = getattr(response_format, "__name__", None)
+        tool_names = {tool["function"]["name"] for tool in tools}
+        after_tool = bool(messages) and isinstance(messages[-1], ToolMessage)
+        for entry in self.rules:
+            if "match" in entry and not re.search(entry["match"], str(question), re.IGNORECASE | re.DOTALL):
+                continue
+            if "response_format" in entry and entry["response_format"] != format_name:
+                continue
+            if "tool" in entry and entry["tool"] not in tool_names:
+                continue
+            if "after_tool" in entry and entry["after_tool"] != after_tool:
+                continue
+            self.hits += 1
+            return entry["response"]
+
+        self.misses += 1
+        return None
+
+    def record(self, messages: Sequence[BaseMessage], message: BaseMessage) -> None:
+        entry = {
+            "key": get_messages_key(messages),
+            "response": {
+                "content": message.content,
+                "tool_calls": [
+                    {"name": call["name"], "args": call["args"]} for call in getattr(message, "tool_calls", None) or []
+                ],
+            },
+        }
+        self.add(entry)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.recorded += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "keyed_entries": len(self.keyed),
+            "rule_entries": len(self.rules),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+class ReplayRecorder(BaseCallbackHandler):
+    """Callback that writes every live chat model response into the ReplayStore."""
+
+    def __init__(self, store: ReplayStore) -> None:
+        self.store = store
+        self.pending: dict[UUID, list[BaseMessage]] = {}
+
+    def on_chat_model_start(self, serialized: dict, messages: list[list[BaseMessage]], *, run_id: UUID, **kwargs: Any) -> None:
+        self.pending[run_id] = messages[0]
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        if (messages := self.pending.pop(run_id, None)) is not None:
+            self.store.record(messages, response.generations[0][0].message)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self.pending.pop(run_id, None)
+
+
+class ReplayChatModel(BaseChatModel):
+    """Offline chat model that answers from a ReplayStore with synthetic latency."""
+
+    deployment_name: str = "replay"
+    response_format: Any = None
+    store: Any = None
+    latency_seconds: float = 0.0
+    token_latency_seconds: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"deployment_name": self.deployment_name}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _get_message(self, messages: list[BaseMessage], tools: Sequence[dict] = ()) -> AIMessage:
+        response = self.store.find(messages, response_format=self.response_format, tools=tools)
+        if response is None:
+            return AIMessage(content=f"[replay] no recorded response for deployment '{self.deployment_name}'")
+        return AIMessage(
+            content=response.get("content") or "",
+            tool_calls=[
+                {"name": call["name"], "args": call.get("args", {}), "id": f"call_{uuid4().hex[:24]}"}
+                for call in response.get("tool_calls") or []
+            ],
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._get_message(messages, kwargs.get("tools", ())))])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._get_message(messages, kwargs.get("tools", ()))
+        await asyncio.sleep(self.latency_seconds + self.token_latency_seconds * len(message.content.split()))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._get_message(messages, kwargs.get("tools", ()))
+        await asyncio.sleep(self.latency_seconds)
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=message.content,
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"], ensure_ascii=False), "id": call["id"], "index": i}
+                    for i, call in enumerate(message.tool_calls)
+                ],
+            ))
+            return
+
+        for token in re.findall(r"\S+\s*|\s+", message.content):
+            await asyncio.sleep(self.token_latency_seconds)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+replay_store: ReplayStore | None = None
+
+
+def get_replay_store() -> ReplayStore:
+    global replay_store
+    if replay_store is None:
+        replay_store = ReplayStore(settings.LLM_REPLAY_PATH)
+        console.log(
+            f"📼 LLM {settings.LLM_BACKEND} backend using '{replay_store.path}' "
+            f"({len(replay_store.keyed) + len(replay_store.rules)} entries)"
+        )
+    return replay_store
@@ -0,0 +1,562 @@
+import asyncio
+from collections import OrderedDict, defaultdict, deque
+import hashlib
+import json
+import math
+from pathlib import Path
+import re
+import time
+from typing import Any, AsyncIterator, Collection, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langchain_openai import AzureChatOpenAI
+import openai
+from pydantic import Field
+
+from common import console, percentile, settings
+
+
+# timeout, 429, 5xx, 연결 오류는 다른 deployment 로 넘겨도 되는 오류로 본다.
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class DeploymentRouter:
+    """Tracks per-deployment latency and how often requests were hedged or failed over."""
+
+    def __init__(self, window: int = 200) -> None:
+        self.latencies: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self.hedged: int = 0
+        self.hedge_wins: int = 0
+        self.failovers: int = 0
+        self.served_by: dict[str, int] = defaultdict(int)
+
+    def record(self, deployment_name: str, seconds: float) -> None:
+        self.latencies[deployment_name].append(seconds)
+
+    def get_p95(self, deployment_name: str) -> float | None:
+        if len(self.latencies[deployment_name]) < settings.HEDGE_MIN_SAMPLES:
+            return None
+        return percentile(self.latencies[deployment_name], 0.95)
+
+    def get_hedge_delay(self, deployment_name: str) -> float:
+        p95 = self.get_p95(deployment_name)
+        if p95 is None:
+            return settings.HEDGE_DEFAULT_DELAY_SECONDS
+        return max(settings.HEDGE_MIN_DELAY_SECONDS, p95)
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = {
+            "hedged_requests": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+        }
+        for deployment_name, count in self.served_by.items():
+            p95 = self.get_p95(deployment_name)
+            stats[f"served_by[{deployment_name}]"] = count
+            stats[f"p95_ms[{deployment_name}]"] = p95 * 1000 if p95 is not None else "-"
+        return stats
+
+
+deployment_router = DeploymentRouter()
+
+
+class HedgedAzureChatOpenAI(AzureChatOpenAI):
+    """AzureChatOpenAI that fails over to alternate deployments and optionally hedges slow calls.
+
+    With `hedge` enabled, a second request is sent to the next deployment once the primary
+    has been running longer than its observed p95 latency, and whichever finishes first wins.
+    Streaming calls only fail over, and only before the first chunk has been received.
+    """
+
+    alternates: list[AzureChatOpenAI] = Field(default_factory=list)
+    hedge: bool = False
+    attempt_timeout: Optional[float] = None
+
+    async def _attempt(
+        self,
+        model: AzureChatOpenAI,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]],
+        run_manager: Optional[AsyncCallbackManagerForLLMRun],
+        **kwargs: Any,
+    ) -> ChatResult:
+        start_time = time.monotonic()
+        if model is self:
+            call = AzureChatOpenAI._agenerate(self, messages, stop=stop, run_manager=run_manager, **kwargs)
+        else:
+            call = model._agenerate(messages, stop=stop, **kwargs)
+        result = await asyncio.wait_for(call, timeout=self.attempt_timeout)
+        deployment_router.record(model.deployment_name, time.monotonic() - start_time)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        candidates = [self, *self.alternates]
+        pending: dict[asyncio.Task, AzureChatOpenAI] = {}
+
+        def launch() -> None:
+            model = candidates[len(launched)]
+            launched.append(model)
+            task = asyncio.create_task(self._attempt(model, messages, stop, run_manager, **kwargs))
+            pending[task] = model
+
+        launched: list[AzureChatOpenAI] = []
+        launch()
+        last_error = None
+        try:
+            while pending:
+                can_hedge = self.hedge and len(launched) < len(candidates)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=deployment_router.get_hedge_delay(launched[-1].deployment_name) if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    deployment_router.hedged += 1
+                    launch()
+                    continue
+
+                for task in done:
+                    model = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except RETRYABLE_ERRORS as e:
+                        last_error = e
+                        if not pending and len(launched) < len(candidates):
+                            deployment_router.failovers += 1
+                            launch()
+                        continue
+
+                    deployment_router.served_by[model.deployment_name] += 1
+                    if model is not self and len(launched) > 1 and self.hedge:
+                        deployment_router.hedge_wins += 1
+                    return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    async def _astream(self, *args: Any, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        candidates = [self, *self.alternates]
+        for index, model in enumerate(candidates):
+            started = False
+            try:
+                if model is self:
+                    stream = AzureChatOpenAI._astream(self, *args, **kwargs)
+                else:
+                    stream = model._astream(*args, **{k: v for k, v in kwargs.items() if k != "run_manager"})
+                async for chunk in stream:
+                    started = True
+                    yield chunk
+                deployment_router.served_by[model.deployment_name] += 1
+                return
+            except RETRYABLE_ERRORS:
+                if started or index == len(candidates) - 1:
+                    raise
+                deployment_router.failovers += 1
+
+
+class ComplexityRouter:
+    """Picks a deployment tier per request from cheap heuristics and the triage decision.
+
+    Requests are classified as `simple` (greetings, chitchat, short questions), `complex`
+    (multi-step planning, comparisons, long requests) or `standard`, and each agent maps
+    those tiers to deployments through `AgentProfile.routed_deployments`.
+    """
+
+    # 영어 단어는 단어 경계로 감싸야 "Hilton", "explanation" 같은 단어 안에서 잘못 걸리지 않는다.
+    chitchat_pattern = re.compile(
+        r"^\s*(안녕|고마워|감사|반가워|좋은 ?아침|잘 ?자|ㅎㅇ|(하이|헬로)(?=[\s!?.~]|$)"
+        r"|\b(hi|hello|hey|thanks|thank you|good (morning|night))\b)",
+        re.IGNORECASE,
+    )
+    complex_pattern = re.compile(
+        r"(일정|계획|코스|비교|분석|추천해|단계|여러\s*(개|곳|가지|군데|도시|나라)|각각|장단점"
+        r"|\b(itinerar(y|ies)|plan(s|ning)?|compare|comparison|analy[sz](e|is)|step[- ]by[- ]step)\b)",
+        re.IGNORECASE,
+    )
+
+    def __init__(self) -> None:
+        self.served: dict[tuple[str, str], int] = defaultdict(int)
+        self.latency_seconds: dict[tuple[str, str], float] = defaultdict(float)
+        self.tiers: dict[str, int] = defaultdict(int)
+
+    def classify(self, question: str, routed_agent: str | None = None) -> str:
+        question = question.strip()
+        if self.complex_pattern.search(question) or len(question) > settings.ROUTING_COMPLEX_MIN_CHARS:
+            tier = "complex"
+        elif self.chitchat_pattern.search(question) or len(question) <= settings.ROUTING_SIMPLE_MAX_CHARS:
+            tier = "simple"
+        else:
+            tier = "standard"
+
+        # triage 결과가 범용 대화(ChatbotAgent)라면 한 단계 가볍게, 여행(TravelAgent)이라면 한 단계 무겁게 본다.
+        if routed_agent == "ChatbotAgent" and tier == "standard":
+            tier = "simple"
+        elif routed_agent == "TravelAgent" and tier == "simple":
+            tier = "standard"
+        return tier
+
+    def select_deployment(
+        self,
+        routed_deployments: dict[str, str],
+        question: str,
+        routed_agent: str | None = None,
+    ) -> str | None:
+        if not routed_deployments:
+            return None
+        tier = self.classify(question, routed_agent)
+        self.tiers[tier] += 1
+        return routed_deployments.get(tier)
+
+    def record(self, agent_name: str, deployment_name: str, seconds: float) -> None:
+        self.served[(agent_name, deployment_name)] += 1
+        self.latency_seconds[(agent_name, deployment_name)] += seconds
+
+    def get_average_latency(self, agent_name: str, deployment_name: str) -> float | None:
+        if count := self.served.get((agent_name, deployment_name)):
+            return self.latency_seconds[(agent_name, deployment_name)] / count
+        return None
+
+    def get_stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {f"tier[{tier}]": count for tier, count in self.tiers.items()}
+        for (agent_name, deployment_name), count in sorted(self.served.items()):
+            stats[f"{agent_name}/{deployment_name}"] = count
+            stats[f"{agent_name}/{deployment_name} avg_ms"] = self.get_average_latency(agent_name, deployment_name) * 1000
+
+        # 같은 agent 의 가장 느린 deployment 평균을 기준으로, 더 빠른 deployment 가 처리해 아낀 시간을 추정한다.
+        for agent_name in {agent_name for agent_name, _ in self.served}:
+            averages = {
+                deployment_name: self.get_average_latency(agent_name, deployment_name)
+                for a, deployment_name in self.served if a == agent_name
+            }
+            baseline = max(averages.values())
+            saved = sum(
+                (baseline - average) * self.served[(agent_name, deployment_name)]
+                for deployment_name, average in averages.items()
+            )
+            stats[f"{agent_name} latency_saved_s"] = saved
+        return stats
+
+
+complexity_router = ComplexityRouter()
+
+
+class HashedTrigramEmbeddings(Embeddings):
+    """Deterministic, local embeddings built from hashed character trigrams.
+
+    Computed in microseconds without a network call, which is what a router placed in front of
+    the LLM needs; it also serves as the offline embedding model of the replay backend.
+    """
+
+    def __init__(self, dimensions: int = 256) -> None:
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = [0.0] * self.dimensions
+        text = f"  {text.lower()} "
+        for i in range(len(text) - 2):
+            digest = hashlib.md5(text[i:i + 3].encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+class PreRouter:
+    """Routes confidently classified utterances locally so the LLM triage call can be skipped.
+
+    Keyword rules handle the obvious cases (greetings, fully specified trips). Other questions
+    are embedded and compared against per-agent centroids built from the most recent logged
+    LLM triage decisions. Anything below the similarity or margin thresholds returns None and
+    goes to the LLM triage, whose decision is then logged as a new training sample.
+    """
+
+    greeting_pattern = re.compile(
+        r"^\s*(안녕(하세요|하십니까)?|하이|헬로|반가워(요)?|반갑습니다|고마워(요)?|감사(합니다|해요)?|ㅎㅇ"
+        r"|hi|hello|hey|thanks|thank you|good (morning|night))[\s!.~?ㅎㅋ^]*$",
+        re.IGNORECASE,
+    )
+    travel_pattern = re.compile(r"(여행|호텔|숙소|숙박|관광|일정)")
+    # 도시와 기간이 모두 있어야 triage 가 clarify 로 되묻지 않고 TravelAgent 로 보낸다.
+    destination_pattern = re.compile(
+        r"(서울|부산|제주|강릉|속초|경주|전주|여수|대구|인천|광주|대전|울산|춘천|통영|도쿄|오사카|후쿠오카|교토|방콕|다낭|파리|런던|뉴욕)"
+    )
+    duration_pattern = re.compile(r"(\d+\s*박|\d+\s*일|당일|주말|(다음|이번)\s*(주|달))")
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        log_path: Optional[Path] = None,
+        min_samples: int = 20,
+        min_similarity: float = 0.6,
+        min_margin: float = 0.15,
+        max_samples: int = 5000,
+    ) -> None:
+        self.embeddings = embeddings
+        self.log_path = log_path
+        self.min_samples = min_samples
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.max_samples = max_samples
+        # 최근 max_samples 개의 (question, label). label 은 agent 이름이거나, triage 가 되물은 경우 "clarify" 이다.
+        self.samples: deque[tuple[str, str]] = deque()
+        # label 별 임베딩 합과 개수
+        self.sums: dict[str, list[float]] = {}
+        self.counts: dict[str, int] = defaultdict(int)
+        # log 파일의 줄 수. max_samples 의 두 배를 넘으면 최근 sample 만 남기고 다시 쓴다.
+        self.logged: int = 0
+        self.loaded: bool = log_path is None
+        self.lock = asyncio.Lock()
+        self.lookups: int = 0
+        self.rule_hits: int = 0
+        self.centroid_hits: int = 0
+
+    def load_log(self) -> None:
+        lines = self.log_path.read_text(encoding="utf-8").splitlines() if self.log_path.exists() else []
+        decisions = [json.loads(line) for line in lines if line.strip()]
+        for decision in decisions[-self.max_samples:]:
+            self.add_sample(decision["question"], decision["label"])
+        self.logged = len(decisions)
+
+    async def load(self) -> None:
+        # log 를 읽고 sample 을 임베딩하는 동안 event loop 를 막지 않도록 thread 에서 한 번만 읽는다.
+        async with self.lock:
+            if not self.loaded:
+                await asyncio.to_thread(self.load_log)
+                self.loaded = True
+                console.log(f"🧭 Pre-router loaded {len(self.samples)} logged triage decisions.")
+
+    def add_vector(self, question: str, label: str, sign: float) -> None:
+        vector = self.embeddings.embed_query(question)
+        if label not in self.sums:
+            self.sums[label] = [0.0] * len(vector)
+        self.sums[label] = [a + sign * b for a, b in zip(self.sums[label], vector)]
+        self.counts[label] += int(sign)
+
+    def add_sample(self, question: str, label: str) -> None:
+        self.samples.append((question, label))
+        self.add_vector(question, label, 1.0)
+        if len(self.samples) > self.max_samples:
+            # 오래된 결정은 centroid 에서 빼서 최근 triage 경향을 따라가게 한다.
+            self.add_vector(*self.samples.popleft(), -1.0)
+
+    def write_log(self, question: str, label: str) -> None:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.logged >= self.max_samples * 2:
+            lines = [json.dumps({"question": q, "label": l}, ensure_ascii=False) for q, l in self.samples]
+            self.log_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            self.logged = len(lines)
+        else:
+            with self.log_path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps({"question": question, "label": label}, ensure_ascii=False) + "\n")
+            self.logged += 1
+
+    async def learn(self, question: str, label: str) -> None:
+        await self.load()
+        self.add_sample(question, label)
+        if self.log_path:
+            async with self.lock:
+                await asyncio.to_thread(self.write_log, question, label)
+
+    def match_rules(self, question: str) -> Optional[str]:
+        if self.greeting_pattern.search(question):
+            return "ChatbotAgent"
+        if all(pattern.search(question) for pattern in (self.travel_pattern, self.destination_pattern, self.duration_pattern)):
+            return "TravelAgent"
+        return None
+
+    def get_similarities(self, question: str) -> list[tuple[float, str]]:
+        vector = self.embeddings.embed_query(question)
+        similarities = []
+        for label, total in self.sums.items():
+            if self.counts[label] < self.min_samples:
+                continue
+            norm = math.sqrt(sum(v * v for v in total)) or 1.0
+            similarities.append((sum(a * b for a, b in zip(vector, total)) / norm, label))
+        return sorted(similarities, reverse=True)
+
+    async def route(self, question: str) -> Optional[str]:
+        self.lookups += 1
+        if agent_name := self.match_rules(question):
+            self.rule_hits += 1
+            return agent_name
+
+        await self.load()
+        similarities = self.get_similarities(question)
+        # 학습된 label 이 하나뿐이면 비교할 대상이 없어 margin 검사가 의미 없으므로 LLM triage 에 맡긴다.
+        if len(similarities) < 2:
+            return None
+        (best, label), (runner_up, _) = similarities[:2]
+        if label != "clarify" and best >= self.min_similarity and best - runner_up >= self.min_margin:
+            self.centroid_hits += 1
+            return label
+        return None
+
+    def get_stats(self) -> dict[str, Any]:
+        skipped = self.rule_hits + self.centroid_hits
+        stats: dict[str, Any] = {
+            "lookups": self.lookups,
+            "rule_hits": self.rule_hits,
+            "centroid_hits": self.centroid_hits,
+            "llm_fallbacks": self.lookups - skipped,
+            "llm_skip_rate": skipped / self.lookups if self.lookups else 0.0,
+        }
+        for label, count in sorted(self.counts.items()):
+            stats[f"samples[{label}]"] = count
+        return stats
+
+
+pre_router: PreRouter | None = None
+
+
+def get_pre_router() -> PreRouter:
+    global pre_router
+    if pre_router is None:
+        # LLM round trip 을 아끼는 것이 목적이므로 embedding 도 네트워크 없이 계산되는 hashed trigram 을 쓴다.
+        pre_router = PreRouter(
+            embeddings=HashedTrigramEmbeddings(),
+            log_path=Path(settings.PREROUTER_LOG_PATH),
+            min_samples=settings.PREROUTER_MIN_SAMPLES,
+            min_similarity=settings.PREROUTER_MIN_SIMILARITY,
+            min_margin=settings.PREROUTER_MIN_MARGIN,
+            max_samples=settings.PREROUTER_MAX_SAMPLES,
+        )
+    return pre_router
+
+
+class ToolSelector:
+    """Picks the tools most relevant to a request so that only their schemas are sent to the model.
+
+    Tool descriptions are embedded once per agent and tool set, and each question once for all
+    the agents it passes through. Pinned tools are always sent and the rest of the top_k slots
+    are filled by similarity. When no tool is similar enough to the request, the full tool set
+    is sent so the model never loses a tool it needs.
+    """
+
+    def __init__(self, embeddings: Embeddings, min_similarity: float = 0.3, max_queries: int = 256) -> None:
+        self.embeddings = embeddings
+        self.min_similarity = min_similarity
+        self.max_queries = max_queries
+        # (agent name, tool 이름들) -> (tool 설명 임베딩, tool 별 schema token 수)
+        self.indexes: dict[tuple[str, tuple[str, ...]], tuple[list[list[float]], list[int]]] = {}
+        # 한 요청의 질문이 여러 agent 를 거치므로 질문 임베딩을 LRU 로 보관한다.
+        self.queries: OrderedDict[str, list[float]] = OrderedDict()
+        self.query_hits: int = 0
+        self.selections: int = 0
+        self.fallbacks: int = 0
+        self.schema_tokens_full: int = 0
+        self.schema_tokens_sent: int = 0
+
+    @staticmethod
+    def count_schema_tokens(tool: BaseTool) -> int:
+        # count_tokens_approximately 와 같은 기준(약 4 글자당 1 token)으로 model 에 보내는 tool schema 크기를 어림한다.
+        return math.ceil(len(json.dumps(convert_to_openai_tool(tool), ensure_ascii=False)) / 4)
+
+    @staticmethod
+    def get_similarity(a: list[float], b: list[float]) -> float:
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
+
+    async def get_index(self, agent_name: str, tools: list[BaseTool]) -> tuple[list[list[float]], list[int]]:
+        key = (agent_name, tuple(tool.name for tool in tools))
+        if (index := self.indexes.get(key)) is None:
+            vectors = await self.embeddings.aembed_documents([f"{tool.name}: {tool.description}" for tool in tools])
+            index = self.indexes[key] = (vectors, [self.count_schema_tokens(tool) for tool in tools])
+        return index
+
+    async def get_query_vector(self, question: str) -> list[float]:
+        if (vector := self.queries.get(question)) is not None:
+            self.queries.move_to_end(question)
+            self.query_hits += 1
+            return vector
+        vector = self.queries[question] = await self.embeddings.aembed_query(question)
+        while len(self.queries) > self.max_queries:
+            self.queries.popitem(last=False)
+        return vector
+
+    async def select(
+        self,
+        agent_name: str,
+        tools: list[BaseTool],
+        question: str,
+        top_k: int,
+        pinned: Collection[str] = (),
+    ) -> list[BaseTool]:
+        self.selections += 1
+        try:
+            vectors, tokens = await self.get_index(agent_name, tools)
+            query = await self.get_query_vector(question) if len(tools) > top_k else None
+        except Exception as e:
+            # tool 선택은 최적화일 뿐이므로 embedding 호출이 실패하면 전체 tool 을 보낸다.
+            console.log(f"⚠️ [{agent_name}] Tool selection failed, sending every tool: {type(e).__name__}: {e}")
+            self.fallbacks += 1
+            tokens = [self.count_schema_tokens(tool) for tool in tools]
+            self.schema_tokens_full += sum(tokens)
+            self.schema_tokens_sent += sum(tokens)
+            return tools
+        self.schema_tokens_full += sum(tokens)
+        selected = list(range(len(tools)))
+        if query is not None:
+            scores = [self.get_similarity(query, vector) for vector in vectors]
+            if max(scores) >= self.min_similarity:
+                pinned_indexes = [i for i, tool in enumerate(tools) if tool.name in pinned]
+                ranked = sorted((i for i in selected if i not in pinned_indexes), key=lambda i: scores[i], reverse=True)
+                # 선택된 tool 의 순서를 원래대로 두어야 같은 subset 의 prompt 가 요청마다 같아진다.
+                selected = sorted(pinned_indexes + ranked[:max(0, top_k - len(pinned_indexes))])
+            else:
+                self.fallbacks += 1
+        self.schema_tokens_sent += sum(tokens[i] for i in selected)
+        return [tools[i] for i in selected]
+
+    def get_stats(self) -> dict[str, Any]:
+        saved = self.schema_tokens_full - self.schema_tokens_sent
+        return {
+            "selections": self.selections,
+            "fallbacks": self.fallbacks,
+            "indexed_tool_sets": len(self.indexes),
+            "query_embedding_hits": self.query_hits,
+            "schema_tokens_full": self.schema_tokens_full,
+            "schema_tokens_sent": self.schema_tokens_sent,
+            "schema_tokens_saved": saved,
+            "saved_rate": saved / self.schema_tokens_full if self.schema_tokens_full else 0.0,
+        }
+
+
+tool_selector: ToolSelector | None = None
+
+
+def get_tool_selector() -> ToolSelector:
+    global tool_selector
+    if tool_selector is None:
+        if settings.LLM_BACKEND == "replay":
+            embeddings = HashedTrigramEmbeddings()
+        else:
+            from langchain_openai import AzureOpenAIEmbeddings
+
+            embeddings = AzureOpenAIEmbeddings(
+                azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                api_key=settings.AZURE_OPENAI_API_KEY,
+                openai_api_version=settings.AZURE_OPENAI_API_VERSION,
+                azure_deployment=settings.AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
+            )
+        tool_selector = ToolSelector(embeddings=embeddings, min_similarity=settings.TOOL_SELECTION_MIN_SIMILARITY)
+    return tool_selector
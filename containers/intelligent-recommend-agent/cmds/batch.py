@@ -0,0 +1,177 @@
+import asyncio
+import csv
+import datetime
+import json
+from pathlib import Path
+import time
+from typing import Any, Iterator, Optional
+
+from rich.table import Table
+
+from agents import load_agents
+from capabilities.checkpoint import close_module as close_checkpoint_module, init_module as init_checkpoint_module
+from capabilities.history import init_module as init_history_module
+from capabilities.mcp import init_module as init_mcp_module
+from common import console, settings, summarize
+
+
+def iter_questions(input_path: Path, question_field: str = "question", id_field: str = "id") -> Iterator[tuple[str, str]]:
+    """Yields (id, question) pairs from a JSONL or CSV file without loading it into memory."""
+    with open(input_path, encoding="utf-8", newline="") as f:
+        if input_path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for index, row in enumerate(rows, start=1):
+            # JSONL 은 {"id": ..., "question": ...} 객체 또는 질문 문자열 한 줄을 모두 받는다.
+            if isinstance(row, str):
+                row = {question_field: row}
+            if question := (row.get(question_field) or "").strip():
+                yield str(row.get(id_field) or index), question
+
+
+def load_completed_ids(output_path: Path) -> set[str]:
+    # 이미 성공한 질문은 다시 실행하지 않고, 실패한 질문만 이어서 다시 실행한다.
+    completed = set()
+    if output_path.exists():
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 중간에 끊긴 마지막 줄
+                    continue
+                if record.get("error") is None:
+                    completed.add(record["id"])
+    return completed
+
+
+class BatchRunner:
+    """Runs questions through TriageAgentGraph with a bounded pool of workers, one session per question."""
+
+    def __init__(self, output_path: Path, concurrency: int) -> None:
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.latencies: list[float] = []
+        self.succeeded: int = 0
+        self.failed: int = 0
+        self.skipped: int = 0
+
+    async def run_question(self, question_id: str, question: str) -> dict[str, Any]:
+        from agents.triage import TriageAgentGraph
+
+        start_time = time.perf_counter()
+        record = {"id": question_id, "question": question, "answer": None, "error": None}
+        try:
+            # 질문마다 session 을 분리해 history 가 섞이지 않게 하고, 같은 id 를 다시 실행하면 checkpoint 에서 이어간다.
+            record["answer"] = await TriageAgentGraph(session_id=f"batch-{question_id}").run(question)
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["latency_s"] = time.perf_counter() - start_time
+        record["finished_at"] = datetime.datetime.now().isoformat()
+        return record
+
+    async def worker(self, queue: asyncio.Queue, output) -> None:
+        while (item := await queue.get()) is not None:
+            record = await self.run_question(*item)
+            # 중단되더라도 끝난 결과는 남도록 한 줄씩 바로 기록한다.
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            if record["error"] is None:
+                self.succeeded += 1
+                self.latencies.append(record["latency_s"])
+            else:
+                self.failed += 1
+            self.show_progress()
+
+    def show_progress(self, every: int = 100) -> None:
+        done = self.succeeded + self.failed
+        if done % every == 0:
+            quiet, console.quiet = console.quiet, False
+            console.print(f"[blue]⏳ {done} question(s) processed ({self.failed} failed)[/]")
+            console.quiet = quiet
+
+    async def run(self, questions: Iterator[tuple[str, str]], limit: Optional[int] = None) -> dict[str, Any]:
+        completed = load_completed_ids(self.output_path)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        # 파일 전체를 읽지 않도록 queue 크기를 제한해 worker 가 처리하는 만큼만 읽어 들인다.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        start_time = time.perf_counter()
+        with open(self.output_path, "a", encoding="utf-8") as output:
+            workers = [asyncio.create_task(self.worker(queue, output)) for _ in range(self.concurrency)]
+            try:
+                queued = 0
+                for question_id, question in questions:
+                    if question_id in completed:
+                        self.skipped += 1
+                        continue
+                    if limit is not None and queued >= limit:
+                        break
+                    await queue.put((question_id, question))
+                    queued += 1
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+        wall_seconds = time.perf_counter() - start_time
+
+        processed = self.succeeded + self.failed
+        return {
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "concurrency": self.concurrency,
+            "wall_s": wall_seconds,
+            "throughput_qps": processed / wall_seconds if wall_seconds else 0.0,
+            "latency": summarize(self.latencies),
+        }
+
+
+def _show_report(report: dict[str, Any]) -> None:
+    table = Table(title="📦 Batch run", show_lines=False)
+    table.add_column("Metric", style="magenta")
+    table.add_column("Value", style="cyan", justify="right")
+    for key, value in report.items():
+        if key == "latency":
+            for name in ("p50_ms", "p95_ms", "max_ms"):
+                table.add_row(f"latency {name}", f"{value[name]:.2f}")
+        else:
+            table.add_row(key, f"{value:.2f}" if isinstance(value, float) else str(value))
+    console.print(table)
+
+
+async def main(
+    input_path: Path,
+    output_path: Path,
+    concurrency: int = 8,
+    question_field: str = "question",
+    id_field: str = "id",
+    limit: Optional[int] = None,
+    verbose: bool = False,
+) -> dict[str, Any]:
+    # 대량의 batch 질문이 session history 로 남거나 pre-router 의 triage 학습 데이터를 치우치게 하지 않도록 한다.
+    settings.HISTORY_BACKEND = "memory"
+    settings.PREROUTER_LEARNING_ENABLED = False
+    try:
+        await init_mcp_module()
+        await init_history_module()
+        await init_checkpoint_module()
+        await load_agents()
+
+        console.print(f"[blue]📦 Running '{input_path}' with {concurrency} worker(s), writing to '{output_path}'...[/]")
+        # 동시에 실행되는 질문들의 node 로그가 섞이므로 기본으로는 진행 상황과 결과만 출력한다.
+        quiet, console.quiet = console.quiet, not verbose
+        try:
+            report = await BatchRunner(output_path, concurrency).run(
+                iter_questions(input_path, question_field, id_field), limit=limit,
+            )
+        finally:
+            console.quiet = quiet
+        _show_report(report)
+        return report
+    except KeyboardInterrupt:
+        console.print(f"\n[red]Interrupted by user. Finished results are kept in '{output_path}'.[/]")
+    finally:
+        await close_checkpoint_module()
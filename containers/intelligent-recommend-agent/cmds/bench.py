@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+from rich.table import Table
+
+from bench import run_benchmark
+from common import console
+
+
+def _format_delta(value: float, baseline: float | None) -> str:
+    if not baseline:
+        return "-"
+    delta = (value - baseline) / baseline * 100
+    color = "red" if delta > 10 else "green" if delta < -10 else "white"
+    return f"[{color}]{delta:+.1f}%[/]"
+
+
+def _show_latency_table(title: str, rows: dict[str, dict], baseline_rows: dict[str, dict]) -> None:
+    table = Table(title=title, show_lines=False)
+    table.add_column("Name", style="magenta")
+    for column in ("count", "mean_ms", "p50_ms", "p95_ms", "max_ms"):
+        table.add_column(column, style="cyan", justify="right")
+    table.add_column("p50 vs baseline", justify="right")
+    for name, stats in rows.items():
+        baseline = baseline_rows.get(name, {}).get("p50_ms")
+        table.add_row(
+            name,
+            str(stats["count"]),
+            *[f"{stats[k]:.2f}" for k in ("mean_ms", "p50_ms", "p95_ms", "max_ms")],
+            _format_delta(stats["p50_ms"], baseline),
+        )
+    console.print(table)
+
+
+async def main(
+    iterations: int = 5,
+    warmup: int = 1,
+    llm_latency: float = 0.0,
+    token_latency: float = 0.0,
+    tool_latency: float = 0.0,
+    cold_start_runs: int = 3,
+    output: Path | None = None,
+    baseline: Path | None = None,
+    speculative_profile: bool = False,
+) -> dict:
+    console.print(f"[blue]⏱️ Running benchmark ({iterations} iterations, {warmup} warmup)...[/]")
+    report = await run_benchmark(
+        iterations=iterations,
+        warmup=warmup,
+        llm_latency_seconds=llm_latency,
+        token_latency_seconds=token_latency,
+        tool_latency_seconds=tool_latency,
+        cold_start_runs=cold_start_runs,
+        speculative_profile=speculative_profile,
+    )
+    previous = json.loads(baseline.read_text(encoding="utf-8")) if baseline else {}
+
+    graph_rows, baseline_graph_rows = {}, {}
+    for name, stats in report["graphs"].items():
+        graph_rows[f"{name}.build"], graph_rows[f"{name}.run"] = stats["build"], stats["run"]
+        if name in previous.get("graphs", {}):
+            baseline_graph_rows[f"{name}.build"] = previous["graphs"][name]["build"]
+            baseline_graph_rows[f"{name}.run"] = previous["graphs"][name]["run"]
+    _show_latency_table("📊 Graph latency", graph_rows, baseline_graph_rows)
+    _show_latency_table("📊 Node latency (TaskOperator.run_node)", report["nodes"], previous.get("nodes", {}))
+
+    if cold_start := report["cold_start"]:
+        previous_wall = (previous.get("cold_start") or {}).get("wall_s")
+        color = "green" if cold_start["within_budget"] else "red"
+        console.print(
+            f"[{color}]🚀 Cold start {cold_start['wall_s']:.2f}s "
+            f"(imports {cold_start['import_s']:.2f}s, budget {cold_start['budget_s']:.2f}s, "
+            f"median of {cold_start['runs']})[/] {_format_delta(cold_start['wall_s'], previous_wall)}"
+        )
+
+    if speculation := report["speculation"]:
+        console.print(
+            f"[cyan]🔮 Speculative profile: {speculation['hits']} hit(s), {speculation['misses']} miss(es), "
+            f"{speculation['saved_seconds']:.2f}s saved, {speculation['wasted_tokens']} token(s) wasted[/]"
+        )
+
+    memory = report["memory"]
+    table = Table(title="🧠 Memory", show_lines=False)
+    table.add_column("Metric", style="magenta")
+    table.add_column("Value", style="cyan", justify="right")
+    table.add_row("wall time (s)", f"{report['wall_s']:.2f}")
+    table.add_row("traced current (MB)", f"{memory['traced_current_mb']:.2f}")
+    table.add_row("traced peak (MB)", f"{memory['traced_peak_mb']:.2f}")
+    table.add_row("allocated blocks", str(memory["allocated_blocks"]))
+    table.add_row("peak RSS (MB)", f"{memory['peak_rss_mb']:.2f}")
+    for allocation in memory["top_allocations"]:
+        table.add_row(allocation["location"], f"{allocation['size_kb']:.1f} KB / {allocation['count']}")
+    console.print(table)
+
+    if output:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        console.print(f"[green]✅ Benchmark report has been written to '{output}'[/]")
+    return report
@@ -3,13 +3,19 @@ from uuid import uuid4
 
 from rich.markup import escape
 from rich.rule import Rule
-from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.table import Table
 
-from agents.base import agent_manager
+from agents.base import TaskOperator, agent_manager, model_pool, prompt_registry, tool_call_stats
+from agents.travel import TravelAgentGraph
 from agents.triage import TriageAgentGraph
+from capabilities.cache import get_profile_cache, get_response_cache
+from capabilities.checkpoint import get_checkpointer
+from capabilities.history import get_sqlite_history_store
 from capabilities.mcp import get_mcp_client
+from capabilities.ratelimit import rate_scheduler
+from capabilities.replay import get_replay_store
+from capabilities.routing import complexity_router, deployment_router, get_pre_router, get_tool_selector
 from common import console, settings
 
 
@@ -54,6 +60,7 @@ async def _execute_agent_prompts_interactive_shell(agent_class, input_cb: callab
                 p.selected = False
             var = prompts[int(number) - 1]
             var.selected = True
+            agent_class.profile.touch()
             console.print(f"[green]✅ {role} prompt '{var.filename}' has been selected.[/]")
             continue
 
@@ -80,6 +87,47 @@ async def _execute_agent_chat_interactive_shell(agent_class, input_cb: callable)
         console.print(f"[yellow]🤖 Assistant({elapsed_time.total_seconds():.2f}s)> {answer}[/]")
 
 
+def _show_stats_table(title: str, stats: dict) -> None:
+    table = Table(title=title, show_lines=False)
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="yellow", justify="right")
+    for key, value in stats.items():
+        table.add_row(key, f"{value:.2f}" if isinstance(value, float) else str(value))
+    console.print(table)
+
+
+def _show_stats():
+    _show_stats_table("Agent registry", agent_manager.get_startup_report())
+    _show_stats_table("Session operators (live / created / evicted)", {
+        name: "{sessions} / {created} / {evictions}".format(**dispatcher.get_stats())
+        for graph_cls in (TriageAgentGraph, TravelAgentGraph) for name, dispatcher in graph_cls.dispatchers.items()
+    })
+    _show_stats_table("Model client pool", model_pool.get_stats())
+    _show_stats_table("Prompt registry", prompt_registry.get_stats())
+    _show_stats_table("Response cache", get_response_cache().get_stats())
+    _show_stats_table("Travel profile cache", get_profile_cache().get_stats())
+    _show_stats_table("Deployment routing", deployment_router.get_stats())
+    if settings.LLM_BACKEND != "azure":
+        _show_stats_table(f"LLM {settings.LLM_BACKEND} backend", get_replay_store().get_stats())
+    _show_stats_table("Complexity routing", complexity_router.get_stats())
+    if settings.PREROUTER_ENABLED:
+        _show_stats_table("Triage pre-router", get_pre_router().get_stats())
+    if settings.SPECULATIVE_PROFILE_ENABLED:
+        from agents.travel_profile import get_profile_speculator
+
+        _show_stats_table("Speculative profile retrieval", get_profile_speculator().get_stats())
+    for deployment_name, stats in rate_scheduler.get_stats().items():
+        _show_stats_table(f"Rate scheduler ({deployment_name})", stats)
+    _show_stats_table("Graph checkpoints", get_checkpointer().get_stats())
+    _show_stats_table("Tool selection", get_tool_selector().get_stats())
+    for agent_name, stats in tool_call_stats.get_stats().items():
+        _show_stats_table(f"Tool calls ({agent_name})", stats)
+    if TaskOperator.timeouts:
+        _show_stats_table("Node timeouts", TaskOperator.timeouts)
+    if history_store := get_sqlite_history_store():
+        _show_stats_table("Chat history store", history_store.get_stats())
+
+
 def _control_mcp_properties():
     for key, value in get_mcp_client().connections.items():
         console.print(f"[cyan]{key}[/]: [yellow]{value}[/]")
@@ -151,6 +199,8 @@ async def _control_agent_properties(input_cb: callable):
             if deployment_number.strip():
                 deployment_name = available_deployments[int(deployment_number) - 1].strip()
                 agent_class.profile.deployment_name = deployment_name
+                # 직접 고른 deployment 가 complexity routing 보다 우선하도록 routing 을 끈다.
+                agent_class.profile.routed_deployments = {}
                 console.print(f"[green]✅ deployment name has been updated to '{deployment_name}'[/]")
             else:
                 console.print("[red]❌ deployment name cannot be empty.[/]")
@@ -180,8 +230,8 @@ async def _control_agent_properties(input_cb: callable):
             continue
 
 
-async def execute_interactive_shell(input_cb: callable):
-    triage_agent = TriageAgentGraph()
+async def execute_interactive_shell(input_cb: callable, session_id: str = None):
+    triage_agent = TriageAgentGraph(session_id)
     while True:
         try:
             console.print(
@@ -198,6 +248,7 @@ async def execute_interactive_shell(input_cb: callable):
             console.print("Type '/agents' to list available sub-agents.")
             console.print("Type '/mcp' to view MCP server properties.")
             console.print("Type '/settings' to view or change settings.")
+            console.print("Type '/stats' to view runtime statistics.")
             console.print("Type '/reset' to reset the conversation.\n")
             console.print("")
             console.print(
@@ -219,8 +270,10 @@ async def execute_interactive_shell(input_cb: callable):
                 _control_mcp_properties()
             elif user_input.startswith("/settings"):
                 settings.show()
+            elif user_input.startswith("/stats"):
+                _show_stats()
             elif user_input.startswith("/reset"):
-                triage_agent = TriageAgentGraph()
+                await triage_agent.reset()
                 console.print("[green]✅ Conversation has been reset.[/]")
             else:
                 console.print("")
@@ -232,9 +285,16 @@ async def execute_interactive_shell(input_cb: callable):
                         characters="-",
                     )
                 )
-                answer = await triage_agent.run(user_input)
-
-                console.print(Panel(f"[yellow]🤖 Assistant> {answer}[/]"))
+                console.print("[yellow]🤖 Assistant> [/]")
+                try:
+                    async for token in triage_agent.run_stream(user_input):
+                        console.out(token, end="", style="yellow", highlight=False)
+                except Exception as e:
+                    console.print(f"\n[red]❌ {type(e).__name__}: {e}[/]")
+                    # checkpoint 가 남아 있으므로 같은 질문을 다시 보내면 마지막으로 완료된 node 이후부터 실행된다.
+                    if get_checkpointer().saver:
+                        console.print("[yellow]🔁 Send the same message again to resume from the last completed step.[/]")
+                console.print("")
                 console.print(Rule(style="bold yellow", characters="-"))
         except (EOFError, KeyboardInterrupt):
             break
\ No newline at end of file
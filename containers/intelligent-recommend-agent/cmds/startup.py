@@ -0,0 +1,109 @@
+import importlib.abc
+import sys
+import time
+from typing import Any
+
+# 이 module 은 측정 대상이 되는 무거운 의존성보다 먼저 import 되므로 표준 라이브러리만 사용한다.
+
+
+class _TimedLoader:
+    def __init__(self, loader: Any, fullname: str, profiler: "StartupProfiler") -> None:
+        self._loader = loader
+        self._fullname = fullname
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec) -> Any:
+        create_module = getattr(self._loader, "create_module", None)
+        return create_module(spec) if create_module else None
+
+    def exec_module(self, module) -> None:
+        self._profiler.stack.append(0.0)
+        start_time = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            cumulative = time.perf_counter() - start_time
+            children = self._profiler.stack.pop()
+            self._profiler.modules[self._fullname] = (cumulative - children, cumulative)
+            if self._profiler.stack:
+                self._profiler.stack[-1] += cumulative
+            else:
+                self._profiler.import_seconds += cumulative
+
+
+class StartupProfiler(importlib.abc.MetaPathFinder):
+    """Records self and cumulative import time per module, like `python -X importtime`."""
+
+    def __init__(self) -> None:
+        self.started_at: float | None = None
+        self.ready_at: float | None = None
+        self.modules: dict[str, tuple[float, float]] = {}
+        self.stack: list[float] = []
+        self.import_seconds: float = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.started_at is not None
+
+    def install(self) -> None:
+        if not self.enabled:
+            self.started_at = time.perf_counter()
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, fullname, self)
+            return spec
+        return None
+
+    def mark_ready(self) -> None:
+        if self.enabled and self.ready_at is None:
+            self.ready_at = time.perf_counter()
+            self.uninstall()
+            self.report()
+
+    def get_stats(self, top: int = 25) -> dict[str, Any]:
+        top_modules = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        return {
+            "ready_s": (self.ready_at or time.perf_counter()) - self.started_at,
+            "imported_modules": len(self.modules),
+            "import_s": self.import_seconds,
+            "top_modules": [
+                {"module": name, "self_ms": self_time * 1000, "cumulative_ms": cumulative * 1000}
+                for name, (self_time, cumulative) in top_modules
+            ],
+        }
+
+    def report(self, top: int = 25) -> None:
+        from rich.table import Table
+
+        from common import console
+
+        stats = self.get_stats(top)
+        table = Table(title=f"⏱️ Startup imports (top {top} by self time)", show_lines=False)
+        table.add_column("Module", style="magenta")
+        table.add_column("self_ms", style="cyan", justify="right")
+        table.add_column("cumulative_ms", style="cyan", justify="right")
+        for module in stats["top_modules"]:
+            table.add_row(module["module"], f"{module['self_ms']:.1f}", f"{module['cumulative_ms']:.1f}")
+        console.print(table)
+        console.print(
+            f"[green]✅ Ready in {stats['ready_s']:.2f}s "
+            f"({stats['imported_modules']} modules, {stats['import_s']:.2f}s importing)[/]"
+        )
+
+
+startup_profiler = StartupProfiler()
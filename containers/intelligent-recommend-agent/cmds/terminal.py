@@ -1,13 +1,21 @@
 from agents import load_agents
+from capabilities.checkpoint import close_module as close_checkpoint_module, init_module as init_checkpoint_module
+from capabilities.history import init_module as init_history_module
 from capabilities.mcp import init_module as init_mcp_module
 from common import console, init_ms_foundry_monitoring_module
 from cmds.common import execute_interactive_shell
+from cmds.startup import startup_profiler
 
 async def main():
     try:
         await init_ms_foundry_monitoring_module()
         await init_mcp_module()
+        await init_history_module()
+        await init_checkpoint_module()
         await load_agents()
+        startup_profiler.mark_ready()
         await execute_interactive_shell(input_cb=lambda: console.input("[blue]😊 User> "))
     except KeyboardInterrupt:
         console.print("\n[red]Interrupted by user. Exiting...[/]")
+    finally:
+        await close_checkpoint_module()
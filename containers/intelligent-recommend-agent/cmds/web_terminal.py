@@ -9,8 +9,11 @@ from starlette.websockets import WebSocketDisconnect
 import uvicorn
 
 from agents import load_agents
+from capabilities.checkpoint import close_module as close_checkpoint_module, init_module as init_checkpoint_module
+from capabilities.history import init_module as init_history_module
 from capabilities.mcp import init_module as init_mcp_module
 from cmds.common import execute_interactive_shell
+from cmds.startup import startup_profiler
 from common import console, init_ms_foundry_monitoring_module
 
 
@@ -62,7 +65,8 @@ async def ws_endpoint(ws: WebSocket):
             await ws.send_json({"type": "prompt", "text": "😊 User > "})
             return await input_queue.get()   # ✅ 여기서만 입력을 받는다
 
-        await execute_interactive_shell(input_cb=input_cb)
+        # 브라우저가 보관한 session_id 를 이어 쓰면 새로고침이나 재시작 이후에도 대화가 유지된다.
+        await execute_interactive_shell(input_cb=input_cb, session_id=ws.query_params.get("session_id"))
     except WebSocketDisconnect:
         print("WebSocket disconnected")
     finally:
@@ -85,7 +89,13 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 async def main():
     await init_ms_foundry_monitoring_module()
     await init_mcp_module()
+    await init_history_module()
+    await init_checkpoint_module()
     await load_agents()
-    await uvicorn.Server(
-        config=uvicorn.Config(app, host="0.0.0.0", port=8000),
-    ).serve()
\ No newline at end of file
+    startup_profiler.mark_ready()
+    try:
+        await uvicorn.Server(
+            config=uvicorn.Config(app, host="0.0.0.0", port=8000),
+        ).serve()
+    finally:
+        await close_checkpoint_module()
\ No newline at end of file
@@ -3,6 +3,7 @@ import asyncio
 from dotenv import load_dotenv
 from functools import lru_cache
 from pathlib import Path
+from typing import Iterable
 
 from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -84,6 +85,165 @@ class Settings(BaseSettings):
     OPENWEATHER_API_KEY: str = Field(
         ..., validation_alias=AliasChoices("OPENWEATHER_API_KEY")
     )
+    AZURE_OPENAI_MAX_CONNECTIONS: int = Field(
+        default=100, validation_alias=AliasChoices("AZURE_OPENAI_MAX_CONNECTIONS"),
+    )
+    AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=20, validation_alias=AliasChoices("AZURE_OPENAI_MAX_KEEPALIVE_CONNECTIONS"),
+    )
+    AZURE_OPENAI_KEEPALIVE_EXPIRY: float = Field(
+        default=60.0, validation_alias=AliasChoices("AZURE_OPENAI_KEEPALIVE_EXPIRY"),
+    )
+    AZURE_OPENAI_REQUESTS_PER_MINUTE: int = Field(
+        default=300, validation_alias=AliasChoices("AZURE_OPENAI_REQUESTS_PER_MINUTE"),
+    )
+    AZURE_OPENAI_TOKENS_PER_MINUTE: int = Field(
+        default=150_000, validation_alias=AliasChoices("AZURE_OPENAI_TOKENS_PER_MINUTE"),
+    )
+    AZURE_OPENAI_MAX_CONCURRENCY: int = Field(
+        default=16, validation_alias=AliasChoices("AZURE_OPENAI_MAX_CONCURRENCY"),
+    )
+    AZURE_OPENAI_ESTIMATED_COMPLETION_TOKENS: int = Field(
+        default=500, validation_alias=AliasChoices("AZURE_OPENAI_ESTIMATED_COMPLETION_TOKENS"),
+    )
+    HEDGE_DEFAULT_DELAY_SECONDS: float = Field(
+        default=8.0, validation_alias=AliasChoices("HEDGE_DEFAULT_DELAY_SECONDS"),
+    )
+    HEDGE_MIN_DELAY_SECONDS: float = Field(
+        default=1.0, validation_alias=AliasChoices("HEDGE_MIN_DELAY_SECONDS"),
+    )
+    HEDGE_MIN_SAMPLES: int = Field(
+        default=20, validation_alias=AliasChoices("HEDGE_MIN_SAMPLES"),
+    )
+    ROUTING_SIMPLE_MAX_CHARS: int = Field(
+        default=20, validation_alias=AliasChoices("ROUTING_SIMPLE_MAX_CHARS"),
+    )
+    ROUTING_COMPLEX_MIN_CHARS: int = Field(
+        default=300, validation_alias=AliasChoices("ROUTING_COMPLEX_MIN_CHARS"),
+    )
+    PREROUTER_ENABLED: bool = Field(
+        default=True, validation_alias=AliasChoices("PREROUTER_ENABLED"),
+    )
+    PREROUTER_LOG_PATH: str = Field(
+        default="./data/triage_decisions.jsonl", validation_alias=AliasChoices("PREROUTER_LOG_PATH"),
+    )
+    PREROUTER_MIN_SAMPLES: int = Field(
+        default=20, validation_alias=AliasChoices("PREROUTER_MIN_SAMPLES"),
+    )
+    PREROUTER_MIN_SIMILARITY: float = Field(
+        default=0.6, validation_alias=AliasChoices("PREROUTER_MIN_SIMILARITY"),
+    )
+    PREROUTER_MIN_MARGIN: float = Field(
+        default=0.15, validation_alias=AliasChoices("PREROUTER_MIN_MARGIN"),
+    )
+    # 최근 triage 결정만 centroid 에 반영하고, log 파일도 이 개수의 두 배를 넘으면 최근 것만 남긴다.
+    PREROUTER_MAX_SAMPLES: int = Field(
+        default=5000, validation_alias=AliasChoices("PREROUTER_MAX_SAMPLES"),
+    )
+    # batch 처럼 사용자 분포와 다른 질문을 대량으로 돌릴 때는 꺼서 triage 결정을 학습하지 않는다.
+    PREROUTER_LEARNING_ENABLED: bool = Field(
+        default=True, validation_alias=AliasChoices("PREROUTER_LEARNING_ENABLED"),
+    )
+    SPECULATIVE_PROFILE_ENABLED: bool = Field(
+        default=False, validation_alias=AliasChoices("SPECULATIVE_PROFILE_ENABLED"),
+    )
+    WORKFLOW_MAX_PARALLELISM: int = Field(
+        default=4, validation_alias=AliasChoices("WORKFLOW_MAX_PARALLELISM"),
+    )
+    WORKFLOW_DEADLINE_SECONDS: float = Field(
+        default=300.0, validation_alias=AliasChoices("WORKFLOW_DEADLINE_SECONDS"),
+    )
+    SESSION_OPERATOR_CACHE_SIZE: int = Field(
+        default=1024, validation_alias=AliasChoices("SESSION_OPERATOR_CACHE_SIZE"),
+    )
+    TOOL_SELECTION_MIN_SIMILARITY: float = Field(
+        default=0.3, validation_alias=AliasChoices("TOOL_SELECTION_MIN_SIMILARITY"),
+    )
+    TOOL_CALL_MAX_CONCURRENCY: int = Field(
+        default=4, validation_alias=AliasChoices("TOOL_CALL_MAX_CONCURRENCY"),
+    )
+    NODE_TIMEOUT_SECONDS: float = Field(
+        default=180.0, validation_alias=AliasChoices("NODE_TIMEOUT_SECONDS"),
+    )
+    REQUEST_TIMEOUT_SECONDS: float = Field(
+        default=600.0, validation_alias=AliasChoices("REQUEST_TIMEOUT_SECONDS"),
+    )
+    TRAVEL_PREFETCH_TIMEOUT_SECONDS: float = Field(
+        default=15.0, validation_alias=AliasChoices("TRAVEL_PREFETCH_TIMEOUT_SECONDS"),
+    )
+    AZURE_OPENAI_ATTEMPT_TIMEOUT_SECONDS: float = Field(
+        default=120.0, validation_alias=AliasChoices("AZURE_OPENAI_ATTEMPT_TIMEOUT_SECONDS"),
+    )
+    # 예: {"gpt-4o-mini": {"rpm": 1000, "tpm": 1000000, "concurrency": 32}}
+    AZURE_OPENAI_DEPLOYMENT_LIMITS: dict[str, dict[str, int]] = Field(
+        default_factory=dict, validation_alias=AliasChoices("AZURE_OPENAI_DEPLOYMENT_LIMITS"),
+    )
+    HISTORY_MAX_TOKENS: int = Field(
+        default=4000, validation_alias=AliasChoices("HISTORY_MAX_TOKENS"),
+    )
+    HISTORY_MAX_MESSAGES: int = Field(
+        default=50, validation_alias=AliasChoices("HISTORY_MAX_MESSAGES"),
+    )
+    HISTORY_BACKEND: str = Field(
+        default="memory", validation_alias=AliasChoices("HISTORY_BACKEND"),
+    )
+    # SQLite(WAL) 파일은 한 replica 의 로컬 디스크에 두어야 한다. Azure Files 같은 네트워크 공유에서는 동작하지 않는다.
+    HISTORY_SQLITE_PATH: str = Field(
+        default="./data/history.sqlite3", validation_alias=AliasChoices("HISTORY_SQLITE_PATH"),
+    )
+    HISTORY_FLUSH_BATCH_SIZE: int = Field(
+        default=20, validation_alias=AliasChoices("HISTORY_FLUSH_BATCH_SIZE"),
+    )
+    HISTORY_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=2.0, validation_alias=AliasChoices("HISTORY_FLUSH_INTERVAL_SECONDS"),
+    )
+    HISTORY_COMPACTION_INTERVAL_SECONDS: float = Field(
+        default=300.0, validation_alias=AliasChoices("HISTORY_COMPACTION_INTERVAL_SECONDS"),
+    )
+    HISTORY_SESSION_TTL_SECONDS: int = Field(
+        default=7 * 24 * 3600, validation_alias=AliasChoices("HISTORY_SESSION_TTL_SECONDS"),
+    )
+    CHECKPOINT_BACKEND: str = Field(
+        default="sqlite", validation_alias=AliasChoices("CHECKPOINT_BACKEND"),
+    )
+    CHECKPOINT_SQLITE_PATH: str = Field(
+        default="./data/checkpoints.sqlite3", validation_alias=AliasChoices("CHECKPOINT_SQLITE_PATH"),
+    )
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(
+        default=1024, validation_alias=AliasChoices("RESPONSE_CACHE_MAX_ENTRIES"),
+    )
+    RESPONSE_CACHE_TTL_SECONDS: float = Field(
+        default=3600.0, validation_alias=AliasChoices("RESPONSE_CACHE_TTL_SECONDS"),
+    )
+    RESPONSE_CACHE_SEMANTIC: bool = Field(
+        default=False, validation_alias=AliasChoices("RESPONSE_CACHE_SEMANTIC"),
+    )
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = Field(
+        default=0.95, validation_alias=AliasChoices("RESPONSE_CACHE_SIMILARITY_THRESHOLD"),
+    )
+    PROFILE_CACHE_MAX_ENTRIES: int = Field(
+        default=256, validation_alias=AliasChoices("PROFILE_CACHE_MAX_ENTRIES"),
+    )
+    PROFILE_CACHE_TTL_SECONDS: float = Field(
+        default=1800.0, validation_alias=AliasChoices("PROFILE_CACHE_TTL_SECONDS"),
+    )
+    # azure: Azure OpenAI 호출, replay: 기록된 응답으로 오프라인 실행, record: Azure OpenAI 응답을 기록
+    LLM_BACKEND: str = Field(
+        default="azure", validation_alias=AliasChoices("LLM_BACKEND"),
+    )
+    LLM_REPLAY_PATH: str = Field(
+        default="./data/llm_replay.jsonl", validation_alias=AliasChoices("LLM_REPLAY_PATH"),
+    )
+    LLM_REPLAY_LATENCY_SECONDS: float = Field(
+        default=0.0, validation_alias=AliasChoices("LLM_REPLAY_LATENCY_SECONDS"),
+    )
+    LLM_REPLAY_TOKEN_LATENCY_SECONDS: float = Field(
+        default=0.0, validation_alias=AliasChoices("LLM_REPLAY_TOKEN_LATENCY_SECONDS"),
+    )
+    # bench 에서 `cmds.terminal`, `cmds.web_terminal` import 까지 걸리는 cold start 목표 시간
+    STARTUP_BUDGET_SECONDS: float = Field(
+        default=6.0, validation_alias=AliasChoices("STARTUP_BUDGET_SECONDS"),
+    )
 
     def show(self):
         console.print(self)
@@ -102,6 +262,22 @@ def get_settings() -> Settings:
     return Settings()
 
 
+def percentile(samples: Iterable[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] if samples else 0.0
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency summary (count, mean, p50, p95, max in milliseconds) used by bench and batch reports."""
+    return {
+        "count": len(samples),
+        "mean_ms": sum(samples) * 1000 / len(samples) if samples else 0.0,
+        "p50_ms": percentile(samples, 0.5) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "max_ms": max(samples, default=0.0) * 1000,
+    }
+
+
 async def init_ms_foundry_monitoring_module():
     """
     import os
@@ -128,7 +304,8 @@ def init_console() -> Console:
     parser = argparse.ArgumentParser()
     parser.add_argument("cmd", nargs="?", default="terminal")
 
-    args = parser.parse_args()
+    # 나머지 옵션(예: bench 의 --iterations)은 typer 가 처리하도록 남겨둔다.
+    args, _ = parser.parse_known_args()
     if args.cmd == "web-terminal":
         class QueueWriter:
             def __init__(self):
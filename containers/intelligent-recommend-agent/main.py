@@ -1,4 +1,6 @@
 import asyncio
+from pathlib import Path
+from typing import Optional
 
 import typer
 
@@ -6,6 +8,16 @@ import typer
 app = typer.Typer(help="Intelligent Recommend Agent Application")
 
 
+@app.callback()
+def startup(
+    profile_startup: bool = typer.Option(False, "--profile-startup", help="Report per-module import time once the app is ready"),
+):
+    if profile_startup:
+        from cmds.startup import startup_profiler
+
+        startup_profiler.install()
+
+
 @app.command()
 def terminal():
     from cmds.terminal import main
@@ -20,5 +32,39 @@ def web_terminal():
     return asyncio.run(main())
 
 
+@app.command()
+def batch(
+    input: Path = typer.Argument(..., help="JSONL or CSV file with one question per line / row"),
+    output: Path = typer.Option(Path("./data/batch_results.jsonl"), help="JSONL file the results are appended to (resumable)"),
+    concurrency: int = typer.Option(8, help="Questions processed concurrently"),
+    question_field: str = typer.Option("question", help="Field / column holding the question"),
+    id_field: str = typer.Option("id", help="Field / column identifying the question (line number when missing)"),
+    limit: Optional[int] = typer.Option(None, help="Process at most this many new questions"),
+    verbose: bool = typer.Option(False, help="Show node logs of every question"),
+):
+    from cmds.batch import main
+
+    return asyncio.run(main(input, output, concurrency, question_field, id_field, limit, verbose))
+
+
+@app.command()
+def bench(
+    iterations: int = typer.Option(5, help="Measured iterations per graph"),
+    warmup: int = typer.Option(1, help="Warmup iterations excluded from the report"),
+    llm_latency: float = typer.Option(0.0, help="Synthetic LLM time-to-first-token in seconds"),
+    token_latency: float = typer.Option(0.0, help="Synthetic LLM latency per streamed token in seconds"),
+    tool_latency: float = typer.Option(0.0, help="Synthetic MCP / GraphRAG latency in seconds"),
+    cold_start_runs: int = typer.Option(3, help="Fresh interpreters used to measure cold start (0 to skip)"),
+    output: Optional[Path] = typer.Option(None, help="Write the JSON report to this path"),
+    baseline: Optional[Path] = typer.Option(None, help="Compare against a previous JSON report"),
+    speculative_profile: bool = typer.Option(False, help="Retrieve travel profiles speculatively during triage"),
+):
+    from cmds.bench import main
+
+    return asyncio.run(main(
+        iterations, warmup, llm_latency, token_latency, tool_latency, cold_start_runs, output, baseline, speculative_profile,
+    ))
+
+
 if __name__ == "__main__":
     app()
\ No newline at end of file
@@ -0,0 +1,164 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from agents.base import ConcurrentAgentExecutor, SessionDispatcher, TaskOperator, agent_manager, request_deadline_scope, tool_call_stats
+from agents.schema import AgentGraphStateBase, TravelAgentContext
+
+
+class FieldOperator(TaskOperator):
+    def __init__(self, field: str, delay: float, timeout_seconds: float = None) -> None:
+        super().__init__(SimpleNamespace(profile=SimpleNamespace(name=field, timeout_seconds=timeout_seconds)))
+        self.field = field
+        self.delay = delay
+
+    async def exec(self, state: AgentGraphStateBase) -> None:
+        await asyncio.sleep(self.delay)
+        setattr(state.context, self.field, f"{self.field} for {state.question}")
+
+
+def test_get_updates_returns_only_changed_fields():
+    before = AgentGraphStateBase(question="q", context=TravelAgentContext(profile="p"))
+    after = before.model_copy(deep=True)
+    after.context.searched_data = "s"
+
+    updates = TaskOperator.get_updates(before, after)
+
+    assert list(updates) == ["context"]
+    assert updates["context"].model_fields_set == {"searched_data"}
+
+
+@pytest.mark.asyncio
+async def test_parallel_branches_merge_context_at_join():
+    graph = StateGraph(AgentGraphStateBase)
+    for field in ("profile", "searched_data", "itinerary_suggestion"):
+        graph.add_node(field, FieldOperator(field, delay=0.2).run_node)
+    graph.add_edge(START, "profile")
+    graph.add_edge(START, "searched_data")
+    graph.add_edge(["profile", "searched_data"], "itinerary_suggestion")
+    graph.add_edge("itinerary_suggestion", END)
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    response = await graph.compile().ainvoke(AgentGraphStateBase(question="제주", context=TravelAgentContext()))
+
+    assert loop.time() - start_time < 0.55
+    context = response["context"]
+    assert context.profile == "profile for 제주"
+    assert context.searched_data == "searched_data for 제주"
+    assert context.itinerary_suggestion == "itinerary_suggestion for 제주"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_node_degrades_and_graph_continues():
+    graph = StateGraph(AgentGraphStateBase)
+    graph.add_node("recommendations", FieldOperator("recommendations", delay=1.0, timeout_seconds=0.1).run_node)
+    graph.add_node("itinerary_suggestion", FieldOperator("itinerary_suggestion", delay=1.0).run_node)
+    graph.add_node("profile", FieldOperator("profile", delay=0.0).run_node)
+    graph.add_edge(START, "recommendations")
+    graph.add_edge("recommendations", "itinerary_suggestion")
+    graph.add_edge("itinerary_suggestion", "profile")
+    graph.add_edge("profile", END)
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    # 두 번째 node 는 자기 budget 이 아니라 남은 요청 budget 에서 잘린다.
+    with request_deadline_scope(0.3):
+        response = await graph.compile().ainvoke(AgentGraphStateBase(question="제주", context=TravelAgentContext()))
+
+    assert loop.time() - start_time < 0.5
+    context = response["context"]
+    assert context.recommendations is None and context.itinerary_suggestion is None
+    assert context.profile is None
+    assert TaskOperator.timeouts["recommendations"] >= 1 and TaskOperator.timeouts["profile"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_session_dispatcher_keeps_one_operator_per_session(monkeypatch):
+    class SessionOperator(TaskOperator):
+        async def exec(self, state: AgentGraphStateBase) -> None:
+            state.answer = f"{self.agent.session_id}: {state.question}"
+
+    class SessionAgent:
+        profile = SimpleNamespace(name="SessionAgent", task_operator=SessionOperator, timeout_seconds=None)
+
+        def __init__(self, session_id: str) -> None:
+            self.session_id = session_id
+
+    monkeypatch.setattr(agent_manager, "get_agent_class", lambda name: SessionAgent)
+    dispatcher = SessionDispatcher("SessionAgent", max_sessions=2)
+    graph = StateGraph(AgentGraphStateBase)
+    graph.add_node("SessionAgent", dispatcher)
+    graph.add_edge(START, "SessionAgent")
+    graph.add_edge("SessionAgent", END)
+    compiled = graph.compile()
+
+    for session_id in ("a", "b", "a", "c"):
+        response = await compiled.ainvoke(
+            AgentGraphStateBase(question="q"), {"configurable": {"session_id": session_id}},
+        )
+        assert response["answer"] == f"{session_id}: q"
+
+    assert list(dispatcher.operators) == ["a", "c"]
+    assert dispatcher.get_stats() == {"sessions": 2, "created": 3, "evictions": 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_agent_executor_caps_tool_calls_and_keeps_order():
+    running, peak = 0, 0
+
+    @tool
+    async def lookup(place: str) -> str:
+        """Looks up a place."""
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # 먼저 요청된 호출이 늦게 끝나도 결과 순서는 요청 순서를 따라야 한다.
+        await asyncio.sleep(0.25 - len(place) * 0.05)
+        running -= 1
+        return f"result of {place}"
+
+    def plan(inputs: dict):
+        if inputs["intermediate_steps"]:
+            return AgentFinish({"output": [observation for _, observation in inputs["intermediate_steps"]]}, "")
+        return [AgentAction("lookup", {"place": "x" * i}, "") for i in range(1, 5)]
+
+    executor = ConcurrentAgentExecutor(agent=RunnableLambda(plan), tools=[lookup], name="LookupAgent", max_concurrency=2)
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    response = await executor.ainvoke({"input": "q"})
+
+    assert loop.time() - start_time < 0.6
+    assert peak == 2
+    assert response["output"] == [f"result of {'x' * i}" for i in range(1, 5)]
+    stats = tool_call_stats.get_stats()["LookupAgent"]
+    assert (stats["steps"], stats["parallel_steps"], stats["tool_calls"]) == (1, 1, 4)
+    assert stats["saved_s"] > 0.2
+
+
+@pytest.mark.asyncio
+async def test_initialize_picks_up_edited_system_prompt(tmp_path, monkeypatch):
+    from agents.base import prompt_registry
+    from agents.travel_summary import TravelSummaryAgent
+
+    filename = TravelSummaryAgent.profile.prompts.get_selected_prompt("system").filename
+    (tmp_path / filename).write_text("original", encoding="utf-8")
+    monkeypatch.setattr(prompt_registry, "path", tmp_path)
+    monkeypatch.setattr(prompt_registry, "templates", {})
+    agent = TravelSummaryAgent("s")
+
+    assert await agent.initialize() is True
+    assert await agent.initialize() is False
+    (tmp_path / filename).write_text("edited", encoding="utf-8")
+    stat = (tmp_path / filename).stat()
+    os.utime(tmp_path / filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert await agent.initialize() is True
+    assert agent.system_prompt == "edited"
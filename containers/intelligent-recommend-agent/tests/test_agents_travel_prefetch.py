@@ -0,0 +1,46 @@
+import pytest
+
+import capabilities.mcp
+from agents.travel_prefetch import TravelPrefetchAgent, find_destination
+from bench.stubs import StubMCPClient, StubWeather
+
+
+@pytest.fixture
+def stub_tools(monkeypatch):
+    mcp_client, weather = StubMCPClient(), StubWeather()
+    monkeypatch.setattr(capabilities.mcp, "mcp_client", mcp_client)
+    monkeypatch.setattr(TravelPrefetchAgent, "forecast_tool", weather.make_tool())
+    return mcp_client, weather
+
+
+def test_find_destination_matches_korean_and_english_names():
+    assert find_destination("제주도 3박 4일 여행 일정을 추천해줘") == ("제주", "Jeju,KR")
+    assert find_destination("Weekend trip to Osaka") == ("오사카", "Osaka,JP")
+    assert find_destination("다음 주에 여행 가고 싶어") is None
+
+
+def test_find_destination_picks_the_trip_city_or_gives_up():
+    assert find_destination("서울 사는데 제주도 여행 일정 짜줘") == ("제주", "Jeju,KR")
+    assert find_destination("도쿄 말고 오사카로 여행") == ("오사카", "Osaka,JP")
+    assert find_destination("도쿄에서 오사카로 가는 여행") == ("오사카", "Osaka,JP")
+    assert find_destination("서울이랑 부산 중에 어디가 좋아?") is None
+
+
+@pytest.mark.asyncio
+async def test_prefetch_calls_tools_directly_without_llm(stub_tools):
+    mcp_client, weather = stub_tools
+
+    searched_data, prefetched_tools = await TravelPrefetchAgent("s").prefetch("부산 2박 3일 가족 여행")
+
+    assert (weather.calls, mcp_client.calls) == (1, 3)
+    assert prefetched_tools == ["get_forecast", "search_places"]
+    assert "- 2026-01-01: " in searched_data
+    assert "부산 호텔 결과 0" in searched_data
+
+
+@pytest.mark.asyncio
+async def test_prefetch_skips_unknown_destinations(stub_tools):
+    mcp_client, weather = stub_tools
+
+    assert await TravelPrefetchAgent("s").prefetch("여행 일정 짜줘") is None
+    assert (weather.calls, mcp_client.calls) == (0, 0)
@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agents.travel_profile import ProfileSpeculator, TravelProfileAgent
+from bench.stubs import write_travel_assets
+
+
+class SlowProfileOperator:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+        self.agent = SimpleNamespace(history=InMemoryChatMessageHistory())
+
+    async def get_profile(self, question: str, history=None) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        profile = f"profile for {question}"
+        (history or self.agent.history).add_messages([HumanMessage(content=question), AIMessage(content=profile)])
+        return profile
+
+
+@pytest.mark.asyncio
+async def test_speculation_is_claimed_by_travel_route_and_cancelled_otherwise():
+    speculator = ProfileSpeculator()
+    operator = SlowProfileOperator(delay=0.1)
+
+    speculator.start("s", "제주 여행", operator)
+    await asyncio.sleep(0.05)
+    assert await speculator.claim("s", "제주 여행") == "profile for 제주 여행"
+    assert await speculator.claim("s", "제주 여행") is None
+
+    speculator.start("s", "오늘 뉴스", operator)
+    await asyncio.sleep(0.01)
+    await speculator.discard("s", "오늘 뉴스")
+
+    speculator.start("s", "파이썬 질문", operator)
+    await asyncio.sleep(0.15)
+    await speculator.discard("s", "파이썬 질문")
+
+    # 취소된 추측 실행의 대화는 남지 않고, claim 된 대화만 세션 history 에 기록된다.
+    assert [message.content for message in operator.agent.history.messages] == ["제주 여행", "profile for 제주 여행"]
+
+    stats = speculator.get_stats()
+    assert operator.calls == 3
+    assert (stats["hits"], stats["misses"], stats["cancelled"]) == (1, 2, 1)
+    assert stats["saved_seconds"] >= 0.05
+
+
+def test_find_user_id_needs_a_name_or_an_explicit_user_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(TravelProfileAgent, "assets", write_travel_assets(tmp_path))
+    monkeypatch.setattr(TravelProfileAgent, "users", None)
+
+    assert TravelProfileAgent.find_user_id("부산 2박 3일 가족 여행") is None
+    assert TravelProfileAgent.find_user_id("제주도 1박 여행") is None
+    assert TravelProfileAgent.find_user_id("사용자 2 의 취향에 맞는 호텔") == "2"
+    assert TravelProfileAgent.find_user_id("user_id: 1 제주 여행") == "1"
+    assert TravelProfileAgent.find_user_id("사용자 9 의 여행") is None
+    assert TravelProfileAgent.find_user_id("김여행 님의 2박 3일 여행") == "1"
+    assert TravelProfileAgent.find_user_id("김여행, 이휴가 둘이 가는 여행") is None
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents.base import TaskOperator, agent_manager
+from agents.schema import AgentGraphStateBase, Task, Workflow
+from agents.workflow import WorkflowExecutor
+
+
+class EchoOperator(TaskOperator):
+    delay = 0.2
+
+    async def exec(self, state: AgentGraphStateBase) -> None:
+        await asyncio.sleep(self.delay)
+        state.answer = f"answer to {state.question}"
+
+
+class EchoAgent:
+    profile = SimpleNamespace(name="EchoAgent", task_operator=EchoOperator, timeout_seconds=None)
+    session_ids: list[str] = []
+
+    def __init__(self, session_id: str) -> None:
+        self.session_id = session_id
+        self.session_ids.append(session_id)
+
+
+@pytest.fixture(autouse=True)
+def echo_agent(monkeypatch):
+    monkeypatch.setattr(agent_manager, "get_agent_class", lambda name: EchoAgent)
+
+
+def make_workflow(*use_answers_from: list[int]) -> Workflow:
+    return Workflow(tasks=[
+        Task(title=f"step {i}", description="", agent="EchoAgent", question=f"q{i}", use_answers_from=refs)
+        for i, refs in enumerate(use_answers_from)
+    ])
+
+
+@pytest.mark.asyncio
+async def test_independent_tasks_run_concurrently_and_answers_feed_forward():
+    workflow = make_workflow([], [], [0, 1])
+
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    await WorkflowExecutor("s", max_parallelism=4).run(workflow)
+
+    assert loop.time() - start_time < 0.55
+    first, second, last = workflow.tasks
+    assert last.started_at >= max(first.finished_at, second.finished_at)
+    assert "answer to q0" in last.answer and "answer to q1" in last.answer
+    assert WorkflowExecutor.get_final_answer(workflow) == last.answer
+
+
+@pytest.mark.asyncio
+async def test_max_parallelism_and_deadline_are_enforced():
+    workflow = make_workflow([], [], [], [2])
+
+    await WorkflowExecutor("s", max_parallelism=2, deadline_seconds=0.3).run(workflow)
+
+    finished = [task for task in workflow.tasks if task.answer]
+    assert len(finished) == 2
+    assert workflow.tasks[2].error.startswith("Cancelled")
+    assert workflow.tasks[3].error.startswith("Skipped") and workflow.tasks[3].started_at is None
+
+
+@pytest.mark.asyncio
+async def test_circular_dependencies_are_skipped():
+    workflow = make_workflow([1], [0], [])
+
+    await WorkflowExecutor("s").run(workflow)
+
+    assert workflow.tasks[2].answer == "answer to q2"
+    assert all("circular" in task.error for task in workflow.tasks[:2])
+
+
+@pytest.mark.asyncio
+async def test_each_run_uses_fresh_task_sessions(monkeypatch):
+    monkeypatch.setattr(EchoAgent, "session_ids", [])
+    executor = WorkflowExecutor("s")
+
+    await executor.run(make_workflow([]))
+    await executor.run(make_workflow([]))
+
+    first, second = EchoAgent.session_ids
+    assert first != second
+    assert first.startswith("s-task-") and second.startswith("s-task-")
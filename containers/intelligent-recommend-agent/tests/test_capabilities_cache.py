@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from capabilities.cache import ProfileCache, ResponseCache, TTLCache
+
+
+class KeywordEmbeddings(Embeddings):
+    keywords = ["안녕", "날씨", "여행"]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(keyword in text) for keyword in self.keywords]
+
+
+def test_ttl_cache_evicts_least_recently_used_and_expired():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    cache.ttl_seconds = 0
+    cache.set("d", 4)
+    time.sleep(0.01)
+    assert cache.get("d") is None
+
+
+@pytest.mark.asyncio
+async def test_response_cache_exact_match():
+    cache = ResponseCache()
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="first"), AIMessage(content="second")]), cache=cache)
+
+    assert (await model.ainvoke("hello")).content == "first"
+    assert (await model.ainvoke("hello")).content == "first"
+    assert (await model.ainvoke("bye")).content == "second"
+    assert cache.get_stats()["exact_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_response_cache_semantic_match_requires_same_context():
+    cache = ResponseCache(embeddings=KeywordEmbeddings(), similarity_threshold=0.99)
+    model = GenericFakeChatModel(messages=iter([AIMessage(content=f"answer {i}") for i in range(3)]), cache=cache)
+    system = SystemMessage(content="triage")
+
+    assert (await model.ainvoke([system, HumanMessage(content="안녕하세요")])).content == "answer 0"
+    assert (await model.ainvoke([system, HumanMessage(content="안녕!")])).content == "answer 0"
+    assert (await model.ainvoke([SystemMessage(content="other"), HumanMessage(content="안녕!")])).content == "answer 1"
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+def test_profile_cache_is_invalidated_when_dataset_changes(tmp_path):
+    activity = tmp_path / "user_hotel_activity.csv"
+    activity.write_text("user_id,hotel_id\n1,1\n", encoding="utf-8")
+    cache = ProfileCache()
+    version = cache.get_dataset_version([activity])
+    cache.set("user:1", version, "부산 바다 선호")
+
+    assert cache.get("user:1", cache.get_dataset_version([activity])) == "부산 바다 선호"
+    assert cache.get("user:2", version) is None
+
+    activity.write_text("user_id,hotel_id\n1,1\n1,2\n", encoding="utf-8")
+    assert cache.get("user:1", cache.get_dataset_version([activity])) is None
+    stats = cache.get_stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["invalidations"]) == (0, 1, 2, 1)
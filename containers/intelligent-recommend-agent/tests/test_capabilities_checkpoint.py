@@ -0,0 +1,71 @@
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import END, START, StateGraph
+import pytest
+
+from agents.schema import AgentGraphStateBase, TravelAgentContext
+from capabilities.checkpoint import GraphCheckpointer
+
+
+def build_graph(checkpointer: GraphCheckpointer, calls: list[str], failing: set[str]):
+    def make_node(field: str):
+        async def node(state: AgentGraphStateBase) -> dict:
+            calls.append(field)
+            if field in failing:
+                raise RuntimeError(f"{field} failed")
+            return {"context": TravelAgentContext.model_construct(**{field: f"{field} for {state.question}"})}
+        return node
+
+    graph = StateGraph(AgentGraphStateBase)
+    fields = ["profile", "itinerary_suggestion", "recommendations"]
+    for field in fields:
+        graph.add_node(field, make_node(field))
+    graph.add_edge(START, fields[0])
+    for previous, field in zip(fields, fields[1:]):
+        graph.add_edge(previous, field)
+    graph.add_edge(fields[-1], END)
+    return graph.compile(checkpointer=checkpointer.saver)
+
+
+async def run(graph, checkpointer: GraphCheckpointer, question: str) -> dict:
+    config = checkpointer.get_config("session")
+    response = await graph.ainvoke(
+        await checkpointer.get_input(graph, config, AgentGraphStateBase(question=question, context=TravelAgentContext())),
+        config,
+    )
+    await checkpointer.complete(config)
+    return response
+
+
+@pytest.mark.asyncio
+async def test_failed_run_resumes_from_last_completed_node(tmp_path):
+    async with aiosqlite.connect(tmp_path / "checkpoints.sqlite3") as conn:
+        checkpointer = GraphCheckpointer(AsyncSqliteSaver(conn))
+        calls, failing = [], {"recommendations"}
+        graph = build_graph(checkpointer, calls, failing)
+
+        with pytest.raises(RuntimeError):
+            await run(graph, checkpointer, "제주")
+        failing.clear()
+        response = await run(graph, checkpointer, "제주")
+
+    assert calls == ["profile", "itinerary_suggestion", "recommendations", "recommendations"]
+    assert response["context"].recommendations == "recommendations for 제주"
+    assert checkpointer.get_stats()["resumed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_new_question_does_not_reuse_state_of_failed_run(tmp_path):
+    async with aiosqlite.connect(tmp_path / "checkpoints.sqlite3") as conn:
+        checkpointer = GraphCheckpointer(AsyncSqliteSaver(conn))
+        calls, failing = [], {"itinerary_suggestion"}
+        graph = build_graph(checkpointer, calls, failing)
+
+        with pytest.raises(RuntimeError):
+            await run(graph, checkpointer, "제주")
+        failing.clear()
+        response = await run(graph, checkpointer, "부산")
+
+    assert calls.count("profile") == 2
+    assert response["context"].profile == "profile for 부산"
+    assert checkpointer.get_stats()["resumed"] == 0
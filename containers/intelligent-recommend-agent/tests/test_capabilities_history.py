@@ -0,0 +1,133 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables.history import RunnableWithMessageHistory
+
+from capabilities.history import BoundedChatMessageHistory, SQLiteChatMessageHistory, SQLiteHistoryStore, pin
+
+
+def _turns(count: int) -> list:
+    messages = []
+    for i in range(count):
+        messages.extend([HumanMessage(content=f"question {i}"), AIMessage(content=f"answer {i}")])
+    return messages
+
+
+def test_history_keeps_recent_turns_within_message_cap():
+    history = BoundedChatMessageHistory(max_tokens=10_000, max_messages=4)
+    history.add_messages(_turns(5))
+
+    assert [m.content for m in history.messages] == ["question 3", "answer 3", "question 4", "answer 4"]
+    assert history.evicted_messages == 6
+
+
+def test_history_keeps_pinned_messages_and_starts_on_human_turn():
+    history = BoundedChatMessageHistory(max_tokens=10_000, max_messages=3)
+    history.add_messages([pin(HumanMessage(content="I travel with two kids")), AIMessage(content="noted")])
+    history.add_messages(_turns(2))
+
+    contents = [m.content for m in history.messages]
+    assert contents[0] == "I travel with two kids"
+    assert contents[1:] == ["question 1", "answer 1"]
+
+
+def test_history_token_budget():
+    history = BoundedChatMessageHistory(max_tokens=40, max_messages=100)
+    history.add_messages([HumanMessage(content="x" * 100), AIMessage(content="y" * 100)])
+    history.add_messages(_turns(1))
+
+    assert [m.content for m in history.messages] == ["question 0", "answer 0"]
+
+
+@pytest.mark.asyncio
+async def test_history_summarizes_evicted_turns():
+    async def summarizer(messages, summary):
+        return (summary or "") + "|".join(m.content for m in messages)
+
+    history = BoundedChatMessageHistory(max_tokens=10_000, max_messages=2, summarizer=summarizer)
+    await history.aadd_messages(_turns(2))
+    await history.wait_for_summary()
+
+    assert history.summary == "question 0|answer 0"
+    assert history.messages[0].type == "system"
+    assert [m.content for m in history.messages[1:]] == ["question 1", "answer 1"]
+
+
+@pytest.mark.asyncio
+async def test_history_summary_tokens_do_not_leak_into_streamed_answer():
+    summary_model = GenericFakeChatModel(messages=iter([AIMessage(content="SUMMARY TOKENS LEAK")]))
+
+    async def summarizer(messages, summary):
+        return (await summary_model.ainvoke("summarize")).content
+
+    history = BoundedChatMessageHistory(max_tokens=10_000, max_messages=2, summarizer=summarizer)
+    answer_model = GenericFakeChatModel(messages=iter([AIMessage(content="answer one"), AIMessage(content="answer two")]))
+    chain = RunnableWithMessageHistory(
+        ChatPromptTemplate.from_messages([MessagesPlaceholder("history"), ("human", "{input}")]) | answer_model,
+        lambda session_id: history,
+        input_messages_key="input",
+        history_messages_key="history",
+    )
+
+    streamed = []
+    for question in ("question one", "question two"):
+        tokens = []
+        async for event in chain.astream_events(
+            {"input": question}, config={"configurable": {"session_id": "s"}}, version="v2",
+        ):
+            if event["event"] == "on_chat_model_stream":
+                tokens.append(event["data"]["chunk"].content)
+        streamed.append("".join(tokens))
+    await history.wait_for_summary()
+
+    assert streamed == ["answer one", "answer two"]
+    assert history.summary == "SUMMARY TOKENS LEAK"
+
+
+def test_sqlite_history_survives_reload(tmp_path):
+    store = SQLiteHistoryStore(path=tmp_path / "history.sqlite3", batch_size=100)
+    history = SQLiteChatMessageHistory(store, "session", "ChatbotAgent", max_tokens=10_000, max_messages=10)
+    history.add_messages(_turns(2))
+    store.close()
+
+    store = SQLiteHistoryStore(path=tmp_path / "history.sqlite3")
+    history = SQLiteChatMessageHistory(store, "session", "ChatbotAgent", max_tokens=10_000, max_messages=10)
+    other = SQLiteChatMessageHistory(store, "session", "TriageAgent", max_tokens=10_000, max_messages=10)
+
+    assert [m.content for m in history.messages] == ["question 0", "answer 0", "question 1", "answer 1"]
+    assert other.messages == []
+
+
+def test_sqlite_history_compaction_trims_and_expires(tmp_path):
+    store = SQLiteHistoryStore(path=tmp_path / "history.sqlite3", max_messages=2, ttl_seconds=3600)
+    store.append("active", "ChatbotAgent", _turns(3))
+    store.append("idle", "ChatbotAgent", _turns(1))
+    store.flush()
+    store.connection.execute("UPDATE sessions SET updated_at = 0 WHERE session_id = 'idle'")
+    store.connection.commit()
+
+    store.compact()
+
+    messages, _ = store.load("active", "ChatbotAgent")
+    assert [m.content for m in messages] == ["question 2", "answer 2"]
+    assert store.load("idle", "ChatbotAgent") == ([], None)
+    assert store.get_stats()["evicted_sessions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_history_loads_lazily_and_deletes_whole_session(tmp_path):
+    store = SQLiteHistoryStore(path=tmp_path / "history.sqlite3")
+    for session_id in ("session", "session-task-0", "session2"):
+        store.append(session_id, "ChatbotAgent", _turns(1))
+    store.flush()
+
+    history = SQLiteChatMessageHistory(store, "session", "ChatbotAgent", max_tokens=10_000, max_messages=10)
+    assert not history.loaded
+    assert [m.content for m in await history.aget_messages()] == ["question 0", "answer 0"]
+
+    store.delete_session("session")
+
+    assert store.load("session", "ChatbotAgent") == ([], None)
+    assert store.load("session-task-0", "ChatbotAgent") == ([], None)
+    assert len(store.load("session2", "ChatbotAgent")[0]) == 2
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+
+from capabilities.ratelimit import DeploymentScheduler, RateLimitedTransport, RateScheduler, TokenBucket
+
+
+def test_token_bucket_delay():
+    bucket = TokenBucket(per_minute=60)
+    bucket.consume(60)
+
+    assert bucket.get_delay(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.get_delay(600) == pytest.approx(60.0, abs=0.5)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_backs_off_on_throttling_and_recovers():
+    scheduler = DeploymentScheduler(requests_per_minute=6000, tokens_per_minute=1_000_000, max_concurrency=8)
+
+    await scheduler.acquire(tokens=10)
+    await scheduler.release(status_code=429, retry_after=0.01)
+    assert scheduler.get_stats()["concurrency_limit"] == 4
+    assert scheduler.get_stats()["throttled"] == 1
+
+    for _ in range(40):
+        await scheduler.acquire(tokens=10)
+        await scheduler.release(status_code=200)
+    assert scheduler.get_stats()["concurrency_limit"] == 8
+    assert scheduler.get_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_transport_schedules_only_deployment_calls():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429 if "throttled" in request.url.path else 200, headers={"retry-after": "0"})
+
+    scheduler = RateScheduler()
+    transport = RateLimitedTransport(httpx.MockTransport(handler), scheduler=scheduler)
+    async with httpx.AsyncClient(transport=transport, base_url="https://example.openai.azure.com") as client:
+        await client.post("/openai/deployments/gpt-4o/chat/completions", json={"messages": []})
+        await client.post("/openai/deployments/throttled/chat/completions", json={"messages": []})
+        await client.get("/healthz")
+
+    stats = scheduler.get_stats()
+    assert set(stats) == {"gpt-4o", "throttled"}
+    assert stats["gpt-4o"]["requests"] == 1 and stats["gpt-4o"]["in_flight"] == 0
+    assert stats["throttled"]["throttled"] == 1
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.tools import tool
+from pydantic import BaseModel
+
+from capabilities.replay import ReplayChatModel, ReplayRecorder, ReplayStore
+
+
+class TriageAgentOutput(BaseModel):
+    action: str
+    agent: str
+
+
+def _write_entries(path, entries):
+    path.write_text("\n".join(json.dumps(entry, ensure_ascii=False) for entry in entries), encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_replay_structured_output_by_response_format(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    _write_entries(path, [
+        {"response_format": "TriageAgentOutput", "match": "여행", "response": {"content": '{"action": "route", "agent": "TravelAgent"}'}},
+        {"response_format": "TriageAgentOutput", "response": {"content": '{"action": "route", "agent": "ChatbotAgent"}'}},
+        {"response": {"content": "안녕하세요!"}},
+    ])
+    store = ReplayStore(path)
+    triage = ReplayChatModel(response_format=TriageAgentOutput, store=store)
+    chatbot = ReplayChatModel(store=store)
+
+    assert json.loads((await triage.ainvoke("부산 여행 추천해줘")).content)["agent"] == "TravelAgent"
+    assert json.loads((await triage.ainvoke("안녕")).content)["agent"] == "ChatbotAgent"
+    assert [chunk.content async for chunk in chatbot.astream("안녕")] == ["안녕하세요!"]
+    assert store.get_stats()["hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_tool_calls_drive_agent_executor(tmp_path):
+    @tool
+    def get_weather(city: str) -> str:
+        """Get the weather of a city."""
+        return f"{city}: 맑음"
+
+    path = tmp_path / "replay.jsonl"
+    _write_entries(path, [
+        {"tool": "get_weather", "after_tool": False, "response": {"tool_calls": [{"name": "get_weather", "args": {"city": "서울"}}]}},
+        {"after_tool": True, "response": {"content": "서울은 맑습니다."}},
+    ])
+    model = ReplayChatModel(store=ReplayStore(path))
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", "weather bot"), ("human", "{input}"), MessagesPlaceholder("agent_scratchpad"),
+    ])
+    executor = AgentExecutor(agent=create_openai_tools_agent(model, [get_weather], prompt), tools=[get_weather])
+
+    response = await executor.ainvoke({"input": "서울 날씨 알려줘"})
+
+    assert response["output"] == "서울은 맑습니다."
+
+
+@pytest.mark.asyncio
+async def test_recorded_responses_replay_by_conversation(tmp_path):
+    path = tmp_path / "replay.jsonl"
+    recorder = ReplayRecorder(ReplayStore(path))
+    live = GenericFakeChatModel(messages=iter([AIMessage(content="recorded answer")]), callbacks=[recorder])
+    messages = [SystemMessage(content="system"), HumanMessage(content="질문")]
+    await live.ainvoke(messages)
+
+    replay = ReplayChatModel(store=ReplayStore(path))
+
+    assert (await replay.ainvoke(messages)).content == "recorded answer"
+    assert (await replay.ainvoke([HumanMessage(content="다른 질문")])).content.startswith("[replay]")
@@ -0,0 +1,215 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+from langchain_openai import AzureChatOpenAI
+
+from capabilities.routing import (
+    ComplexityRouter, HashedTrigramEmbeddings, HedgedAzureChatOpenAI, PreRouter, ToolSelector, deployment_router,
+)
+
+
+def _model(cls, deployment_name: str, **kwargs):
+    return cls(
+        azure_endpoint="https://example.openai.azure.com",
+        api_key="key",
+        api_version="2024-10-21",
+        deployment_name=deployment_name,
+        **kwargs,
+    )
+
+
+@pytest.fixture()
+def fake_deployments(monkeypatch):
+    behaviours = {}
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay, error = behaviours[self.deployment_name]
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.deployment_name))])
+
+    monkeypatch.setattr(AzureChatOpenAI, "_agenerate", _agenerate)
+    return behaviours
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_takes_the_faster_deployment(fake_deployments, monkeypatch):
+    monkeypatch.setattr(deployment_router, "get_hedge_delay", lambda deployment_name: 0.05)
+    fake_deployments.update({"slow": (1.0, None), "fast": (0.01, None)})
+    model = _model(HedgedAzureChatOpenAI, "slow", alternates=[_model(AzureChatOpenAI, "fast")], hedge=True)
+
+    hedged = deployment_router.hedged
+    response = await asyncio.wait_for(model.ainvoke([HumanMessage(content="hi")]), timeout=0.5)
+
+    assert response.content == "fast"
+    assert deployment_router.hedged == hedged + 1
+
+
+@pytest.mark.asyncio
+async def test_failover_on_throttling(fake_deployments):
+    throttled = openai.RateLimitError(
+        "throttled",
+        response=httpx.Response(429, request=httpx.Request("POST", "https://example.openai.azure.com")),
+        body=None,
+    )
+    fake_deployments.update({"primary": (0.0, throttled), "secondary": (0.0, None)})
+    model = _model(HedgedAzureChatOpenAI, "primary", alternates=[_model(AzureChatOpenAI, "secondary")])
+
+    failovers = deployment_router.failovers
+    response = await model.ainvoke([HumanMessage(content="hi")])
+
+    assert response.content == "secondary"
+    assert deployment_router.failovers == failovers + 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_raised(fake_deployments):
+    fake_deployments.update({"primary": (0.0, ValueError("bad request")), "secondary": (0.0, None)})
+    model = _model(HedgedAzureChatOpenAI, "primary", alternates=[_model(AzureChatOpenAI, "secondary")])
+
+    with pytest.raises(ValueError):
+        await model.ainvoke([HumanMessage(content="hi")])
+
+
+def test_complexity_router_uses_heuristics_and_triage_result():
+    router = ComplexityRouter()
+    routed_deployments = {"simple": "mini", "standard": "full", "complex": "full"}
+
+    assert router.select_deployment(routed_deployments, "안녕!") == "mini"
+    assert router.select_deployment(routed_deployments, "제주도 3박 4일 여행 일정을 짜줘") == "full"
+    assert router.classify("파이썬에서 리스트와 튜플은 어떻게 다른가요?") == "standard"
+    assert router.classify("파이썬에서 리스트와 튜플은 어떻게 다른가요?", routed_agent="ChatbotAgent") == "simple"
+    assert router.select_deployment({}, "안녕!") is None
+
+    router.record("ChatbotAgent", "full", 3.0)
+    router.record("ChatbotAgent", "mini", 1.0)
+    router.record("ChatbotAgent", "mini", 1.0)
+    assert router.get_stats()["ChatbotAgent latency_saved_s"] == pytest.approx(4.0)
+
+
+def test_complexity_router_patterns_do_not_match_inside_words():
+    router = ComplexityRouter()
+
+    assert router.classify("Can you give me an explanation of how the Python GIL works?") == "standard"
+    assert router.classify("여러분 파이썬 GIL 이 정확히 뭔지 알려주세요") == "standard"
+    assert router.classify("Hilton hotel near Gangnam station, is parking free there?") == "standard"
+    assert router.classify("Please plan a trip to Busan for my family next weekend") == "complex"
+    assert router.classify("부산에서 가볼 만한 곳 여러 곳 알려줘") == "complex"
+    assert router.classify("hi there") == "simple"
+
+
+def test_hashed_trigram_embeddings_are_deterministic():
+    embeddings = HashedTrigramEmbeddings()
+    first, second, other = embeddings.embed_documents(["서울 날씨", "서울 날씨", "부산 맛집"])
+
+    assert first == second
+    assert sum(a * b for a, b in zip(first, other)) < 0.5
+
+
+@pytest.mark.asyncio
+async def test_pre_router_rules_and_centroids_skip_llm_triage(tmp_path):
+    log_path = tmp_path / "triage_decisions.jsonl"
+    router = PreRouter(HashedTrigramEmbeddings(), log_path=log_path, min_samples=2, min_similarity=0.3, min_margin=0.05)
+
+    assert await router.route("안녕하세요!") == "ChatbotAgent"
+    assert await router.route("부산으로 2박 3일 가족 여행 일정 짜줘") == "TravelAgent"
+    assert await router.route("파이썬 리스트와 튜플 차이 설명해줘") is None
+
+    for question in ("파이썬 리스트 정렬 방법 설명해줘", "파이썬 튜플과 리스트의 차이 알려줘"):
+        await router.learn(question, "ChatbotAgent")
+    for question in ("여행 갈 만한 곳 추천해줘", "여행 가고 싶은데 어디가 좋을까"):
+        await router.learn(question, "clarify")
+
+    reloaded = PreRouter(HashedTrigramEmbeddings(), log_path=log_path, min_samples=2, min_similarity=0.3, min_margin=0.05)
+    assert not reloaded.loaded
+    assert await reloaded.route("파이썬 리스트와 튜플 차이 설명해줘") == "ChatbotAgent"
+    assert await reloaded.route("여행 가고 싶은 곳 추천해줘") is None
+    assert reloaded.get_stats()["centroid_hits"] == 1
+    assert router.get_stats()["llm_skip_rate"] == 2 / 3
+
+
+@pytest.mark.asyncio
+async def test_pre_router_needs_two_trained_labels_for_a_centroid_decision(tmp_path):
+    router = PreRouter(HashedTrigramEmbeddings(), log_path=tmp_path / "triage_decisions.jsonl", min_samples=2, min_similarity=0.3)
+
+    for question in ("파이썬 리스트 정렬 방법 설명해줘", "파이썬 튜플과 리스트의 차이 알려줘"):
+        await router.learn(question, "ChatbotAgent")
+    await router.learn("제주 여행 일정 짜줘", "TravelAgent")
+    assert await router.route("파이썬 리스트와 튜플 차이 설명해줘") is None
+
+    await router.learn("부산 여행 일정 짜줘", "TravelAgent")
+    assert await router.route("파이썬 리스트와 튜플 차이 설명해줘") == "ChatbotAgent"
+
+
+@pytest.mark.asyncio
+async def test_pre_router_keeps_only_recent_samples(tmp_path):
+    log_path = tmp_path / "triage_decisions.jsonl"
+    router = PreRouter(HashedTrigramEmbeddings(), log_path=log_path, max_samples=3)
+
+    for i in range(7):
+        await router.learn(f"질문 {i}", "ChatbotAgent" if i < 4 else "TravelAgent")
+
+    assert [question for question, _ in router.samples] == ["질문 4", "질문 5", "질문 6"]
+    assert dict(router.counts) == {"ChatbotAgent": 0, "TravelAgent": 3}
+    # log 가 max_samples 의 두 배(6 줄)에 이른 뒤의 기록에서 최근 sample 만 남기고 다시 쓴다.
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 3
+
+    reloaded = PreRouter(HashedTrigramEmbeddings(), log_path=log_path, max_samples=3)
+    await reloaded.load()
+    assert list(reloaded.samples) == list(router.samples)
+
+
+@pytest.mark.asyncio
+async def test_tool_selector_sends_relevant_tools_or_falls_back_to_all():
+    async def call(query: str) -> str:
+        return query
+
+    tools = [
+        StructuredTool.from_function(coroutine=call, name=name, description=description)
+        for name, description in [
+            ("search_places", "search places restaurants hotels nearby"),
+            ("get_directions", "get driving directions between two places"),
+            ("get_weather", "get the weather forecast of a city"),
+            ("search_web", "search web documents and blogs"),
+        ]
+    ]
+    selector = ToolSelector(HashedTrigramEmbeddings(), min_similarity=0.3)
+
+    selected = await selector.select("Agent", tools, "weather forecast", top_k=2)
+    pinned = await selector.select("Agent", tools, "weather forecast", top_k=2, pinned=["search_web"])
+    fallback = await selector.select("Agent", tools, "zzz", top_k=2)
+
+    # 임계값을 넘는 tool 이 하나뿐이어도 순위대로 top_k 개를 채운다.
+    assert "get_weather" in [tool.name for tool in selected] and len(selected) == 2
+    assert [tool.name for tool in pinned] == ["get_weather", "search_web"]
+    assert fallback == tools
+    stats = selector.get_stats()
+    assert (stats["selections"], stats["fallbacks"], stats["indexed_tool_sets"]) == (3, 1, 1)
+    assert stats["query_embedding_hits"] == 1
+    assert 0 < stats["schema_tokens_saved"] < stats["schema_tokens_full"]
+
+
+@pytest.mark.asyncio
+async def test_tool_selector_sends_every_tool_when_embedding_fails():
+    class FailingEmbeddings(HashedTrigramEmbeddings):
+        async def aembed_query(self, text: str) -> list[float]:
+            raise ConnectionError("embedding endpoint is down")
+
+    async def call(query: str) -> str:
+        return query
+
+    tools = [
+        StructuredTool.from_function(coroutine=call, name=name, description=f"{name} tool")
+        for name in ("search_places", "get_directions", "get_weather")
+    ]
+    selector = ToolSelector(FailingEmbeddings())
+
+    assert await selector.select("Agent", tools, "weather forecast", top_k=2) == tools
+    stats = selector.get_stats()
+    assert (stats["selections"], stats["fallbacks"], stats["schema_tokens_saved"]) == (1, 1, 0)
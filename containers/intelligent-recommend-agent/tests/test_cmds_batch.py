@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from cmds.batch import BatchRunner, iter_questions
+
+
+def test_iter_questions_reads_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "questions.jsonl"
+    jsonl.write_text('{"id": "a", "question": "제주 여행"}\n"부산 맛집"\n\n{"id": "c", "question": " "}\n', encoding="utf-8")
+    csv = tmp_path / "questions.csv"
+    csv.write_text("qid,text\nx,안녕\ny,날씨\n", encoding="utf-8")
+
+    assert list(iter_questions(jsonl)) == [("a", "제주 여행"), ("2", "부산 맛집")]
+    assert list(iter_questions(csv, question_field="text", id_field="qid")) == [("x", "안녕"), ("y", "날씨")]
+
+
+@pytest.mark.asyncio
+async def test_batch_runner_resumes_from_failed_and_pending_questions(tmp_path, monkeypatch):
+    output = tmp_path / "results.jsonl"
+    questions = [(str(i), f"q{i}") for i in range(5)]
+    calls = []
+
+    async def run_question(self, question_id: str, question: str) -> dict:
+        calls.append(question_id)
+        error = "RuntimeError: boom" if question_id == "1" and len(calls) <= 3 else None
+        return {"id": question_id, "question": question, "answer": f"a{question_id}", "error": error, "latency_s": 0.01}
+
+    monkeypatch.setattr(BatchRunner, "run_question", run_question)
+    first = await BatchRunner(output, concurrency=2).run(iter(questions), limit=3)
+    second = await BatchRunner(output, concurrency=2).run(iter(questions))
+
+    assert (first["succeeded"], first["failed"]) == (2, 1)
+    assert (second["succeeded"], second["skipped"]) == (3, 2)
+    assert sorted(calls[3:]) == ["1", "3", "4"]
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert {record["id"] for record in records if record["error"] is None} == {"0", "1", "2", "3", "4"}
@@ -1,5 +1,4 @@
 from langchain.tools import tool
-import investpy
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -38,6 +37,8 @@ def stock_history(stock: str, country: str, from_date: str, to_date: str) -> str
         to_date: End date (YYYY-MM-DD or dd/mm/YYYY).
     Returns: Head of dataframe as string plus row count.
     """
+    import investpy  # investpy 는 pandas 등을 끌어오므로 tool 을 실제로 호출할 때 로드한다.
+
     fd, td = _validate_date_range(from_date, to_date)
     df = investpy.get_stock_historical_data(
         stock=stock, country=country, from_date=fd, to_date=td
@@ -56,6 +57,8 @@ def index_history(index: str, country: str, from_date: str, to_date: str) -> str
         to_date: End date.
     Returns: Summary string.
     """
+    import investpy
+
     fd, td = _validate_date_range(from_date, to_date)
     df = investpy.get_index_historical_data(
         index=index, country=country, from_date=fd, to_date=td
@@ -71,6 +74,8 @@ def search_assets(query: str, products: Optional[List[str]] = None) -> str:
         products: List of product types to include. Default selects all.
     Returns: Aggregated matches as string tables.
     """
+    import investpy
+
     if not products:
         products = ["stocks", "etfs", "funds", "indices", "currency_crosses", "cryptos"]
     output_parts = []
@@ -95,6 +100,8 @@ def stock_overview(stock: str, country: str) -> str:
         country: Listing country.
     Returns: Combined overview string.
     """
+    import investpy
+
     try:
         recent = investpy.get_stock_recent_data(stock=stock, country=country)
     except Exception as e:  # noqa: BLE001
@@ -130,6 +137,8 @@ def economic_calendar(
         importance: Optional list of importance levels (e.g. ['low','medium','high']).
     Returns: First rows summary.
     """
+    import investpy
+
     fd, td = _validate_date_range(from_date, to_date)
     df = investpy.economic_calendar(
         from_date=fd, to_date=td, countries=countries, importance=importance